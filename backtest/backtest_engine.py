@@ -7,13 +7,173 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from backtest.metrics import MetricsAccumulator
+from compact import price_column
+
+
+def simulate_single_position(signals, exec_prices, mark_prices, initial_capital=100000,
+                             position_size_pct=0.95, lag=1, position=0, entry_price=0.0):
+    """
+    Resolve the single-position BUY/SELL state machine with array operations.
+    
+    A BUY signal (1) opens a position only when flat, a SELL signal (-1)
+    closes it only when long. The signal on bar t fills at exec_prices[t+lag]
+    and the portfolio is marked at mark_prices on every bar. Python only
+    iterates over executed trades, never over bars.
+    
+    Parameters:
+    -----------
+    signals : array-like
+        1 (buy), -1 (sell) or 0 (hold) per bar
+    exec_prices : array-like
+        Fill price per bar (open for next-bar execution)
+    mark_prices : array-like
+        Price used to value holdings per bar (close)
+    initial_capital : float
+        Starting capital in INR
+    position_size_pct : float
+        Fraction of cash committed on each BUY
+    lag : int
+        Bars between signal and fill (1 = next bar, 0 = same bar)
+    position, entry_price : int, float
+        Shares already held at bar 0 and their entry price, to resume a
+        run (initial_capital is then the cash left at bar 0)
+    
+    Returns:
+    --------
+    dict with 'position', 'cash', 'holdings', 'total' arrays and a
+    'trades' list of fill events
+    """
+    signals = np.asarray(signals)
+    exec_prices = np.asarray(exec_prices, dtype=float)
+    mark_prices = np.asarray(mark_prices, dtype=float)
+    n = len(signals)
+    
+    # Only signals with a bar left to fill on can trade
+    tradable = signals[:max(n - lag, 0)]
+    buy_bars = np.flatnonzero(tradable == 1)
+    sell_bars = np.flatnonzero(tradable == -1)
+    buy_prices = exec_prices[buy_bars + lag]
+    
+    capital = initial_capital
+    trades = []
+    change_bars = []
+    cash_after = []
+    position_after = []
+    
+    # A carried-in position is closed by the first SELL from bar 0 on
+    shares = int(position)
+    i = -1
+    
+    cursor = 0
+    while True:
+        if shares == 0:
+            k = np.searchsorted(buy_bars, cursor)
+            if k == len(buy_bars):
+                break
+            
+            # Cash is constant while flat, so the first affordable BUY fills
+            budget = capital * position_size_pct
+            if int(budget / buy_prices[k]) <= 0:
+                affordable = np.flatnonzero((budget / buy_prices[k:]).astype(np.int64) > 0)
+                if len(affordable) == 0:
+                    break
+                k += affordable[0]
+            
+            i = buy_bars[k]
+            entry_price = buy_prices[k]
+            shares = int(budget / entry_price)
+            cost = shares * entry_price
+            capital -= cost
+            
+            trades.append({
+                'signal_bar': i,
+                'exec_bar': i + lag,
+                'type': 'BUY',
+                'price': entry_price,
+                'shares': shares,
+                'value': cost
+            })
+            change_bars.append(i + lag)
+            cash_after.append(capital)
+            position_after.append(shares)
+        
+        s = np.searchsorted(sell_bars, i, side='right')
+        if s == len(sell_bars):
+            break
+        
+        j = sell_bars[s]
+        exit_price = exec_prices[j + lag]
+        revenue = shares * exit_price
+        profit = (exit_price - entry_price) * shares
+        profit_pct = (profit / (shares * entry_price)) * 100
+        capital += revenue
+        
+        trades.append({
+            'signal_bar': j,
+            'exec_bar': j + lag,
+            'type': 'SELL',
+            'price': exit_price,
+            'shares': shares,
+            'value': revenue,
+            'profit': profit,
+            'profit_pct': profit_pct
+        })
+        change_bars.append(j + lag)
+        cash_after.append(capital)
+        position_after.append(0)
+        
+        shares = 0
+        cursor = j + 1
+    
+    # Broadcast the state after each fill forward to the following bars
+    last_change = np.searchsorted(np.asarray(change_bars, dtype=np.int64), np.arange(n), side='right') - 1
+    has_changed = last_change >= 0
+    safe = np.where(has_changed, last_change, 0)
+    
+    cash_levels = np.asarray(cash_after + [0.0], dtype=float)
+    position_levels = np.asarray(position_after + [0], dtype=np.int64)
+    cash = np.where(has_changed, cash_levels[safe], float(initial_capital))
+    positions = np.where(has_changed, position_levels[safe], int(position))
+    holdings = positions * mark_prices
+    if not position:
+        holdings[:lag] = 0.0
+    total = cash + holdings
+    
+    return {
+        'position': positions,
+        'cash': cash,
+        'holdings': holdings,
+        'total': total,
+        'trades': trades
+    }
+
+def trade_records(events, index, percent_b):
+    """Engine trade dicts from simulate_single_position fill events"""
+    trades = []
+    for event in events:
+        trade = {
+            'Signal_Date': index[event['signal_bar']],
+            'Execution_Date': index[event['exec_bar']],
+            'Type': event['type'],
+            'Price': event['price'],
+            'Shares': event['shares'],
+            'Value': event['value']
+        }
+        if event['type'] == 'SELL':
+            trade['Profit'] = event['profit']
+            trade['Profit_Pct'] = event['profit_pct']
+        trade['Percent_B'] = percent_b[event['signal_bar']]
+        trades.append(trade)
+    return trades
+
 class BacktestEngine:
     """
     Walk-forward backtest engine with proper execution logic.
     Executes at open of t+1 based on signal at close of t.
     """
     
-    def __init__(self, strategy, initial_capital=100000, position_size_pct=0.95):
+    def __init__(self, strategy, initial_capital=100000, position_size_pct=0.95, mode='vectorized'):
         """
         Initialize backtest engine.
         
@@ -25,12 +185,19 @@ class BacktestEngine:
             Starting capital in INR (default: 100,000)
         position_size_pct : float
             Percentage of capital to use per trade (default: 0.95)
+        mode : str
+            'vectorized' (default) resolves trades with NumPy arrays,
+            'loop' walks the frame bar by bar (reference implementation)
         """
+        if mode not in ('vectorized', 'loop'):
+            raise ValueError(f"Unknown backtest mode: {mode}")
+        
         self.strategy = strategy
         self.initial_capital = initial_capital
         self.position_size_pct = position_size_pct
+        self.mode = mode
         
-    def run(self, df):
+    def run(self, df, copy=True):
         """
         Execute backtest with no look-ahead bias.
         
@@ -39,17 +206,47 @@ class BacktestEngine:
         2. Generate signal at end of day t
         3. Execute trade at open of day t+1
         
+        With copy=False indicator, signal and portfolio columns are written
+        into df itself instead of a copy.
+        
         Returns:
         --------
         df_result : DataFrame with portfolio values
         trades : List of trade dictionaries
         """
-        df = df.copy()
+        if copy:
+            df = df.copy()
+        for col in ('open', 'close'):
+            df[col] = price_column(df, col)
         
         # Calculate indicators and signals
         df = self.strategy.calculate_indicators(df)
         df = self.strategy.generate_signals(df)
         
+        if self.mode == 'loop':
+            return self._run_loop(df)
+        return self._run_vectorized(df)
+    
+    def _run_vectorized(self, df):
+        """Resolve fills with array operations instead of per-row access"""
+        result = simulate_single_position(
+            df['Signal'].to_numpy(),
+            df['open'].to_numpy(dtype=float),
+            df['close'].to_numpy(dtype=float),
+            self.initial_capital,
+            self.position_size_pct
+        )
+        
+        df['Position'] = result['position']
+        df['Cash'] = result['cash']
+        df['Holdings'] = result['holdings']
+        df['Total'] = result['total']
+        
+        trades = trade_records(result['trades'], df.index, df['Percent_B'].to_numpy())
+        return df, trades
+    
+    def _run_loop(self, df):
+        """Reference implementation: walk the frame one bar at a time"""
         # Initialize portfolio tracking
         capital = self.initial_capital
         position = 0  # shares held
@@ -58,9 +255,9 @@ class BacktestEngine:
         
         # Add portfolio tracking columns
         df['Position'] = 0
-        df['Cash'] = self.initial_capital
+        df['Cash'] = float(self.initial_capital)
         df['Holdings'] = 0.0
-        df['Total'] = self.initial_capital
+        df['Total'] = float(self.initial_capital)
         
         # Walk forward through history
         for i in range(len(df) - 1):  # Stop at -1 to avoid index error
@@ -133,44 +330,7 @@ class BacktestEngine:
         - Win Rate
         - Average Win/Loss
         """
-        initial_capital = self.initial_capital
-        final_value = df['Total'].iloc[-1]
-        total_return = ((final_value - initial_capital) / initial_capital) * 100
-        
-        # Maximum Drawdown
-        rolling_max = df['Total'].expanding().max()
-        drawdown = (df['Total'] - rolling_max) / rolling_max
-        max_drawdown = drawdown.min() * 100
-        
-        # Sharpe Ratio (annualized)
-        returns = df['Total'].pct_change().dropna()
-        if len(returns) > 1 and returns.std() != 0:
-            sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252)
-        else:
-            sharpe_ratio = 0
-        
-        # Trade statistics
-        sell_trades = [t for t in trades if t['Type'] == 'SELL']
-        
-        if len(sell_trades) > 0:
-            winning_trades = [t for t in sell_trades if t['Profit'] > 0]
-            win_rate = (len(winning_trades) / len(sell_trades)) * 100
-            avg_win = np.mean([t['Profit'] for t in winning_trades]) if winning_trades else 0
-            
-            losing_trades = [t for t in sell_trades if t['Profit'] <= 0]
-            avg_loss = np.mean([abs(t['Profit']) for t in losing_trades]) if losing_trades else 0
-        else:
-            win_rate = avg_win = avg_loss = 0
-        
-        return {
-            'Initial_Capital': initial_capital,
-            'Final_Value': final_value,
-            'Net_Profit': final_value - initial_capital,
-            'Total_Return_Pct': total_return,
-            'Max_Drawdown_Pct': max_drawdown,
-            'Sharpe_Ratio': sharpe_ratio,
-            'Total_Trades': len(trades),
-            'Win_Rate_Pct': win_rate,
-            'Avg_Win': avg_win,
-            'Avg_Loss': avg_loss
-        }
+        metrics = MetricsAccumulator(self.initial_capital)
+        metrics.update_many(df['Total'].to_numpy(dtype=float))
+        metrics.add_trades(trades)
+        return metrics.summary()
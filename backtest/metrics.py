@@ -0,0 +1,176 @@
+"""
+Single-Pass Performance Metrics
+One accumulator behind every backtest, sweep and live metrics report
+"""
+
+import numpy as np
+
+
+class MetricsAccumulator:
+    """
+    Performance metrics updated in O(1) per equity value and per trade.
+
+    Keeps the running peak and worst drawdown, Welford mean/variance of the
+    bar-to-bar returns, and win/loss counts and sums of closed trades, so
+    nothing needs the full equity curve or trade list.
+
+    update(value) takes one equity value (live monitoring); update_many(values)
+    takes a block (streaming chunks, whole in-memory runs) and merges its
+    moments in one vectorized pass. A single update_many over a whole curve
+    reproduces pandas' pct_change / mean / std exactly.
+    """
+
+    def __init__(self, initial_capital=None, periods_per_year=252):
+        self.initial_capital = initial_capital
+        self.periods_per_year = periods_per_year
+
+        self.bars = 0
+        self.first_value = None
+        self.last_value = None
+        self.peak = -np.inf
+        self.min_drawdown = np.inf
+
+        self.n_returns = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+        self.n_trades = 0
+        self.n_buys = 0
+        self.n_sells = 0
+        self.n_wins = 0
+        self.n_losses = 0
+        self.win_sum = 0.0
+        self.loss_sum = 0.0
+
+    # Equity curve
+
+    def update(self, value):
+        """Add one equity value"""
+        if self.last_value is not None:
+            r = value / self.last_value - 1
+            if r == r:
+                self.n_returns += 1
+                delta = r - self.mean
+                self.mean += delta / self.n_returns
+                self.m2 += delta * (r - self.mean)
+        else:
+            self.first_value = value
+
+        if value > self.peak:
+            self.peak = value
+        drawdown = (value - self.peak) / self.peak
+        if drawdown < self.min_drawdown:
+            self.min_drawdown = drawdown
+
+        self.last_value = value
+        self.bars += 1
+
+    def update_many(self, values):
+        """Add a block of equity values in order"""
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return
+
+        running_max = np.maximum.accumulate(np.concatenate([[self.peak], values]))[1:]
+        self.min_drawdown = min(self.min_drawdown, ((values - running_max) / running_max).min())
+        self.peak = running_max[-1]
+
+        if self.last_value is None:
+            self.first_value = values[0]
+            returns = values[1:] / values[:-1] - 1
+        else:
+            returns = values / np.concatenate([[self.last_value], values[:-1]]) - 1
+        returns = returns[~np.isnan(returns)]
+        self._merge_returns(returns)
+
+        self.last_value = values[-1]
+        self.bars += len(values)
+
+    def _merge_returns(self, returns):
+        n = len(returns)
+        if n == 0:
+            return
+        block_mean = returns.sum() / n
+        block_m2 = ((returns - block_mean) ** 2).sum()
+
+        if self.n_returns == 0:
+            self.n_returns, self.mean, self.m2 = n, block_mean, block_m2
+            return
+
+        # Chan et al. pairwise merge of (count, mean, M2)
+        total = self.n_returns + n
+        delta = block_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += block_m2 + delta * delta * self.n_returns * n / total
+        self.n_returns = total
+
+    # Trades
+
+    def add_trade(self, side, profit=None):
+        """Count a BUY/SELL fill; a SELL with a profit is scored as a win (> 0) or loss (<= 0)"""
+        self.n_trades += 1
+        if side == 'BUY':
+            self.n_buys += 1
+        elif side == 'SELL':
+            self.n_sells += 1
+            if profit is not None and profit == profit:
+                if profit > 0:
+                    self.n_wins += 1
+                    self.win_sum += profit
+                else:
+                    self.n_losses += 1
+                    self.loss_sum += abs(profit)
+
+    def add_trades(self, trades, side_key='Type', profit_key='Profit'):
+        for trade in trades:
+            self.add_trade(trade[side_key], trade.get(profit_key))
+
+    # Results
+
+    @property
+    def return_std(self):
+        return np.sqrt(self.m2 / (self.n_returns - 1)) if self.n_returns > 1 else np.nan
+
+    def sharpe_ratio(self):
+        std = self.return_std
+        if self.n_returns > 1 and std != 0:
+            return (self.mean / std) * np.sqrt(self.periods_per_year)
+        return 0
+
+    def max_drawdown_pct(self):
+        """Worst peak-to-trough move in percent (<= 0)"""
+        return self.min_drawdown * 100 if self.bars else 0
+
+    def total_return_pct(self):
+        start = self.initial_capital if self.initial_capital is not None else self.first_value
+        return ((self.last_value - start) / start) * 100
+
+    def win_rate_pct(self):
+        closed = self.n_wins + self.n_losses
+        return (self.n_wins / closed) * 100 if closed else 0
+
+    def avg_win(self):
+        return self.win_sum / self.n_wins if self.n_wins else 0
+
+    def avg_loss(self):
+        """Mean absolute loss of losing trades"""
+        return self.loss_sum / self.n_losses if self.n_losses else 0
+
+    def profit_factor(self):
+        return self.win_sum / self.loss_sum if self.loss_sum > 0 else 0
+
+    def summary(self):
+        """Metrics under the BacktestEngine.calculate_metrics keys"""
+        initial_capital = self.initial_capital if self.initial_capital is not None else self.first_value
+        return {
+            'Initial_Capital': initial_capital,
+            'Final_Value': self.last_value,
+            'Net_Profit': self.last_value - initial_capital,
+            'Total_Return_Pct': self.total_return_pct(),
+            'Max_Drawdown_Pct': self.max_drawdown_pct(),
+            'Sharpe_Ratio': self.sharpe_ratio(),
+            'Total_Trades': self.n_trades,
+            'Win_Rate_Pct': self.win_rate_pct(),
+            'Avg_Win': self.avg_win(),
+            'Avg_Loss': self.avg_loss()
+        }
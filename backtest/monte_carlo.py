@@ -0,0 +1,175 @@
+"""
+Monte Carlo Trade-Sequence Analysis
+Bootstrap / reshuffle a backtest's closed trades to get confidence intervals
+"""
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+
+def trade_returns(trades, side_key='Type', return_key='Profit_Pct'):
+    """Per-trade returns (fractions) of the closing SELL trades of a backtest"""
+    return np.array([trade[return_key] / 100 for trade in trades
+                     if trade[side_key] == 'SELL' and trade.get(return_key) is not None],
+                    dtype=float)
+
+
+def resample_returns(returns, n_paths, rng, method='bootstrap'):
+    """
+    n_paths x n_trades matrix of resampled trade sequences.
+
+    'bootstrap' draws trades with replacement; 'shuffle' permutes the
+    original trades in each row (same final return, different path).
+    """
+    n = len(returns)
+    if method == 'bootstrap':
+        return returns[rng.integers(0, n, size=(n_paths, n))]
+    if method == 'shuffle':
+        return returns[np.argsort(rng.random((n_paths, n)), axis=1)]
+    raise ValueError(f"Unknown resampling method: {method}")
+
+
+def path_statistics(sequences, position_size_pct=0.95, ruin_level=0.5):
+    """
+    Total return, max drawdown, per-trade Sharpe and ruin flag of each row.
+
+    Each trade compounds `position_size_pct` of equity at its return, as
+    BacktestEngine does; equity is in units of initial capital.
+    """
+    step_returns = sequences * position_size_pct
+    n = step_returns.shape[1]
+    mean = step_returns.mean(axis=1)
+    std = step_returns.std(axis=1, ddof=1) if n > 1 else np.zeros(len(step_returns))
+    sharpe = np.divide(mean, std, out=np.zeros_like(mean), where=std > 0)
+
+    equity = np.cumprod(step_returns + 1, axis=1)
+    ruined = equity.min(axis=1) <= ruin_level
+
+    drawdown = np.maximum.accumulate(equity, axis=1)
+    np.maximum(drawdown, 1.0, out=drawdown)  # the starting capital is the first peak
+    np.divide(equity, drawdown, out=drawdown)
+    max_drawdown = drawdown.min(axis=1) - 1
+
+    return equity[:, -1] - 1, max_drawdown, sharpe, ruined
+
+
+def _simulate_batch(returns, n_paths, seed, method, position_size_pct, ruin_level):
+    rng = np.random.default_rng(seed)
+    sequences = resample_returns(returns, n_paths, rng, method)
+    return path_statistics(sequences, position_size_pct, ruin_level)
+
+
+class MonteCarloAnalysis:
+    """
+    Confidence intervals for a strategy's results from its trade list.
+
+    All resamples of a batch are one n_paths x n_trades NumPy computation;
+    batches run on a process pool. Every batch gets its own child of one
+    SeedSequence, so results depend on the seed and batch_size but not on
+    the number of workers.
+    """
+
+    def __init__(self, n_resamples=10000, method='bootstrap', position_size_pct=0.95,
+                 confidence=0.95, ruin_threshold=0.5, trades_per_year=None,
+                 n_workers=None, batch_size=2000, seed=42):
+        """
+        Parameters:
+        -----------
+        n_resamples : int
+            Number of simulated trade sequences
+        method : str
+            'bootstrap' (draw with replacement) or 'shuffle' (reorder)
+        position_size_pct : float
+            Fraction of equity committed per trade
+        confidence : float
+            Width of the reported intervals
+        ruin_threshold : float
+            Equity, as a fraction of initial capital, counted as ruin
+        trades_per_year : float
+            Annualises the per-trade Sharpe ratio (default: not annualised)
+        n_workers : int
+            Pool size (default: CPU count; 1 runs in-process)
+        batch_size : int
+            Resamples per task; small enough that a batch's working arrays
+            stay in cache for typical trade counts
+        """
+        self.n_resamples = n_resamples
+        self.method = method
+        self.position_size_pct = position_size_pct
+        self.confidence = confidence
+        self.ruin_threshold = ruin_threshold
+        self.trades_per_year = trades_per_year
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.seed = seed
+
+    def simulate(self, returns):
+        """Raw per-path (total_return, max_drawdown, sharpe, ruined) arrays"""
+        returns = np.asarray(returns, dtype=float)
+        sizes = [min(self.batch_size, self.n_resamples - k)
+                 for k in range(0, self.n_resamples, self.batch_size)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        args = (self.method, self.position_size_pct, self.ruin_threshold)
+
+        if self.n_workers == 1 or len(sizes) == 1:
+            parts = [_simulate_batch(returns, size, seed, *args) for size, seed in zip(sizes, seeds)]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.n_workers, len(sizes))) as pool:
+                futures = [pool.submit(_simulate_batch, returns, size, seed, *args)
+                           for size, seed in zip(sizes, seeds)]
+                parts = [future.result() for future in futures]
+
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    def _interval(self, values, scale=1.0):
+        tail = (1 - self.confidence) / 2 * 100
+        low, median, high = np.percentile(values, [tail, 50, 100 - tail])
+        return {
+            'Mean': values.mean() * scale,
+            'Median': median * scale,
+            'Lower': low * scale,
+            'Upper': high * scale
+        }
+
+    def run(self, trades):
+        """
+        Parameters:
+        -----------
+        trades : list of dict or array
+            BacktestEngine trade list, or per-trade returns as fractions
+
+        Returns:
+        --------
+        results : dict of Mean/Median/Lower/Upper per metric, plus the
+            probability of ruin
+        """
+        if len(trades) and isinstance(trades[0], dict):
+            returns = trade_returns(trades)
+        else:
+            returns = np.asarray(trades, dtype=float)
+        if len(returns) == 0:
+            raise ValueError("No closed trades to resample")
+
+        total_return, max_drawdown, sharpe, ruined = self.simulate(returns)
+        if self.trades_per_year:
+            sharpe = sharpe * np.sqrt(self.trades_per_year)
+
+        return {
+            'Resamples': self.n_resamples,
+            'Trades': len(returns),
+            'Method': self.method,
+            'Confidence': self.confidence,
+            'Total_Return_Pct': self._interval(total_return, 100),
+            'Max_Drawdown_Pct': self._interval(max_drawdown, 100),
+            'Sharpe_Ratio': self._interval(sharpe),
+            'Probability_Of_Ruin': ruined.mean()
+        }
+
+    def print_report(self, results):
+        print(f"Monte Carlo ({results['Method']}, {results['Resamples']:,} resamples "
+              f"of {results['Trades']} trades, {results['Confidence']:.0%} intervals)")
+        for key in ('Total_Return_Pct', 'Max_Drawdown_Pct', 'Sharpe_Ratio'):
+            stats = results[key]
+            print(f"  {key:<18}{stats['Median']:>10.2f}  [{stats['Lower']:.2f}, {stats['Upper']:.2f}]")
+        print(f"  {'Probability_Of_Ruin':<18}{results['Probability_Of_Ruin']:>10.2%}")
@@ -0,0 +1,188 @@
+"""
+Multi-Symbol Portfolio Backtest
+Many symbols trading against one cash pool, on aligned dates x symbols arrays
+"""
+
+import numpy as np
+import pandas as pd
+
+from backtest.metrics import MetricsAccumulator
+from strategy.panel import calculate_bollinger_panel
+
+
+class PortfolioBacktest:
+    """
+    Shared-capital version of BacktestEngine for a watchlist.
+
+    Signals come from one Bollinger panel over all symbols. Each bar, the
+    previous bar's signals fill at this bar's open: SELLs first, which frees
+    cash, then BUYs in priority order (most oversold Percent_B first) while
+    position slots and cash last. Holdings are marked at the last known
+    close. The loop runs over dates only; every step is an array operation
+    across symbols, and Python never touches individual symbols.
+
+    Allocation rules (position value as a fraction of the previous bar's
+    equity, never above max_position_pct):
+        'equal'              1 / max_positions per position
+        'inverse_volatility' scaled by the symbol's inverse band STD / close,
+                             so the average candidate still gets 1 / max_positions
+    """
+
+    def __init__(self, strategy, initial_capital=1000000, max_positions=20,
+                 max_position_pct=0.10, allocation='equal'):
+        """
+        Parameters:
+        -----------
+        strategy : BollingerBandsStrategy
+            Supplies window, num_std, oversold and overbought
+        initial_capital : float
+            Starting capital in INR shared by all symbols
+        max_positions : int
+            Most positions open at once
+        max_position_pct : float
+            Cap on a single new position as a fraction of equity
+        allocation : str
+            'equal' or 'inverse_volatility'
+        """
+        if allocation not in ('equal', 'inverse_volatility'):
+            raise ValueError(f"Unknown allocation rule: {allocation}")
+
+        self.strategy = strategy
+        self.initial_capital = initial_capital
+        self.max_positions = max_positions
+        self.max_position_pct = max_position_pct
+        self.allocation = allocation
+
+    def signals(self, panel):
+        """int8 BUY (1) / SELL (-1) / HOLD (0) dates x symbols matrix"""
+        percent_b = panel['Percent_B']
+        signals = np.zeros(percent_b.shape, dtype=np.int8)
+        with np.errstate(invalid='ignore'):
+            signals[percent_b < self.strategy.oversold] = 1
+            signals[percent_b > self.strategy.overbought] = -1
+        return signals
+
+    def weights(self, panel):
+        """Target position size per (date, symbol), as a fraction of equity"""
+        base = 1.0 / self.max_positions
+        if self.allocation == 'equal':
+            return np.full(panel['close'].shape, min(base, self.max_position_pct))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse_vol = panel['close'] / panel['STD']
+        valid = np.isfinite(inverse_vol)
+        inverse_vol[~valid] = np.nan
+        count = valid.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scale = np.where(valid, inverse_vol, 0.0).sum(axis=1, keepdims=True) / count
+            return np.minimum(base * inverse_vol / scale, self.max_position_pct)
+
+    def run(self, opens, closes):
+        """
+        Backtest the watchlist.
+
+        Parameters:
+        -----------
+        opens, closes : DataFrame (dates x symbols)
+            Aligned fill and close prices; NaN where a symbol has no bar
+
+        Returns:
+        --------
+        portfolio : DataFrame with Cash, Holdings, Total and Open_Positions per date
+        trades : List of trade dictionaries (BacktestEngine keys plus Symbol)
+        """
+        dates = closes.index
+        symbols = closes.columns
+        opens = opens.reindex(index=dates, columns=symbols).to_numpy(dtype=float)
+        close_values = closes.to_numpy(dtype=float)
+
+        panel = calculate_bollinger_panel(close_values, self.strategy.window, self.strategy.num_std)
+        signals = self.signals(panel)
+        weights = self.weights(panel)
+        priority = np.where(np.isnan(panel['Percent_B']), np.inf, panel['Percent_B'])
+        marks = np.nan_to_num(closes.ffill().to_numpy(dtype=float))
+
+        n_dates, n_symbols = close_values.shape
+        cash = float(self.initial_capital)
+        shares = np.zeros(n_symbols, dtype=np.int64)
+        entry = np.zeros(n_symbols)
+
+        cash_curve = np.empty(n_dates)
+        holdings_curve = np.empty(n_dates)
+        open_curve = np.empty(n_dates, dtype=np.int64)
+        cash_curve[0], holdings_curve[0], open_curve[0] = cash, 0.0, 0
+        equity = cash
+
+        fills = []  # (exec_bar, symbol indices, type, prices, shares, entry prices)
+        for t in range(1, n_dates):
+            signal = signals[t - 1]
+            price = opens[t]
+            tradable = ~np.isnan(price)
+
+            sell = np.flatnonzero((signal == -1) & (shares > 0) & tradable)
+            if len(sell):
+                exit_price = price[sell]
+                held = shares[sell]
+                cash += float(held @ exit_price)
+                fills.append((t, sell, 'SELL', exit_price, held, entry[sell]))
+                shares[sell] = 0
+
+            slots = self.max_positions - np.count_nonzero(shares)
+            buy = np.flatnonzero((signal == 1) & (shares == 0) & tradable)
+            if len(buy) and slots > 0:
+                buy = buy[np.argsort(priority[t - 1, buy], kind='stable')][:slots]
+                fill = price[buy]
+                target = equity * weights[t - 1, buy]
+                quantity = np.nan_to_num(target / fill).astype(np.int64)
+                keep = quantity > 0
+                buy, fill, quantity = buy[keep], fill[keep], quantity[keep]
+
+                # Fill in priority order until the next BUY no longer fits the cash
+                affordable = np.cumsum(quantity * fill) <= cash
+                n_filled = len(affordable) if affordable.all() else int(np.argmin(affordable))
+                if n_filled:
+                    buy, fill, quantity = buy[:n_filled], fill[:n_filled], quantity[:n_filled]
+                    cash -= float(quantity @ fill)
+                    shares[buy] = quantity
+                    entry[buy] = fill
+                    fills.append((t, buy, 'BUY', fill, quantity, None))
+
+            holdings = float(shares @ marks[t])
+            equity = cash + holdings
+            cash_curve[t] = cash
+            holdings_curve[t] = holdings
+            open_curve[t] = np.count_nonzero(shares)
+
+        portfolio = pd.DataFrame({
+            'Cash': cash_curve,
+            'Holdings': holdings_curve,
+            'Total': cash_curve + holdings_curve,
+            'Open_Positions': open_curve
+        }, index=dates)
+
+        trades = []
+        for t, columns, side, prices, quantities, entries in fills:
+            for k, column in enumerate(columns):
+                trade = {
+                    'Signal_Date': dates[t - 1],
+                    'Execution_Date': dates[t],
+                    'Symbol': symbols[column],
+                    'Type': side,
+                    'Price': prices[k],
+                    'Shares': int(quantities[k]),
+                    'Value': quantities[k] * prices[k]
+                }
+                if side == 'SELL':
+                    profit = (prices[k] - entries[k]) * quantities[k]
+                    trade['Profit'] = profit
+                    trade['Profit_Pct'] = (profit / (quantities[k] * entries[k])) * 100
+                trade['Percent_B'] = panel['Percent_B'][t - 1, column]
+                trades.append(trade)
+        return portfolio, trades
+
+    def calculate_metrics(self, portfolio, trades):
+        """BacktestEngine.calculate_metrics over the combined equity curve"""
+        metrics = MetricsAccumulator(self.initial_capital)
+        metrics.update_many(portfolio['Total'].to_numpy(dtype=float))
+        metrics.add_trades(trades)
+        return metrics.summary()
@@ -0,0 +1,153 @@
+"""
+Out-of-Core Chunked Backtest
+Runs BacktestEngine's rules over data read chunk by chunk with bounded memory
+"""
+
+import numpy as np
+import pandas as pd
+
+from backtest.backtest_engine import simulate_single_position, trade_records
+from backtest.metrics import MetricsAccumulator
+
+
+class StreamingBacktest:
+    """
+    Chunked equivalent of BacktestEngine.run + calculate_metrics.
+
+    Each chunk is prefixed with the last `lookback` raw rows of the previous
+    one so rolling indicators continue across the boundary. The open
+    position, entry price, cash, the last bar's not-yet-filled signal and
+    the equity high-water mark are carried forward, so only one chunk (plus
+    the trade list) is ever held in memory.
+
+    Trades, positions, cash, equity and metrics match the in-memory engine
+    exactly, except that the Sharpe ratio is merged from per-chunk moments
+    (agreement ~1e-14) and indicator values differ at rounding level,
+    because pandas' rolling sums depend on where the series starts. A
+    signal can only differ if Percent_B sits within that rounding of a
+    threshold.
+    """
+
+    def __init__(self, strategy, initial_capital=100000, position_size_pct=0.95,
+                 chunksize=100_000, lookback=None):
+        """
+        Parameters:
+        -----------
+        strategy : Strategy object
+            Trading strategy with calculate_indicators() and generate_signals()
+        chunksize : int
+            Rows per chunk when reading a CSV
+        lookback : int
+            Raw rows carried into the next chunk (default: strategy.window - 1)
+        """
+        self.strategy = strategy
+        self.initial_capital = initial_capital
+        self.position_size_pct = position_size_pct
+        self.chunksize = chunksize
+        if lookback is None:
+            lookback = max(getattr(strategy, 'window', 1) - 1, 0)
+        self.lookback = lookback
+
+    def _chunks(self, source, read_csv_kwargs):
+        if isinstance(source, str):
+            return pd.read_csv(source, chunksize=self.chunksize, **read_csv_kwargs)
+        if isinstance(source, pd.DataFrame):
+            return (source.iloc[k:k + self.chunksize] for k in range(0, len(source), self.chunksize))
+        return source
+
+    def run(self, source, equity_path=None, **read_csv_kwargs):
+        """
+        Backtest a CSV path, a DataFrame or an iterable of DataFrame chunks.
+
+        Parameters:
+        -----------
+        source : str, DataFrame or iterable of DataFrames
+            Bars in time order with the columns the strategy needs plus open/close
+        equity_path : str
+            Optional CSV to which each chunk's Position/Cash/Holdings/Total rows
+            are appended
+        **read_csv_kwargs :
+            Passed to pd.read_csv (e.g. index_col='date', parse_dates=True)
+
+        Returns:
+        --------
+        metrics : dict with BacktestEngine.calculate_metrics keys
+        trades : List of trade dictionaries
+        """
+        cash = float(self.initial_capital)
+        position = 0
+        entry_price = 0.0
+        tail = None
+        previous = None  # last bar of the previous chunk: its signal fills on this chunk's first bar
+        trades = []
+        metrics = MetricsAccumulator(self.initial_capital)
+        first_write = True
+
+        for raw in self._chunks(source, read_csv_kwargs):
+            if len(raw) == 0:
+                continue
+
+            # Indicators over carried tail + chunk, then drop the tail rows
+            work = pd.concat([tail, raw]) if tail is not None and len(tail) else raw.copy()
+            work = self.strategy.calculate_indicators(work)
+            work = self.strategy.generate_signals(work)
+            carried = len(work) - len(raw)
+            work = work.iloc[carried:]
+
+            if self.lookback:
+                if len(raw) >= self.lookback or tail is None:
+                    tail = raw.iloc[-self.lookback:]
+                else:
+                    tail = pd.concat([tail, raw]).iloc[-self.lookback:]
+
+            signals = work['Signal'].to_numpy()
+            opens = work['open'].to_numpy(dtype=float)
+            closes = work['close'].to_numpy(dtype=float)
+            percent_b = work['Percent_B'].to_numpy()
+            index = work.index
+
+            if previous is not None:
+                signals = np.concatenate([[previous['signal']], signals])
+                opens = np.concatenate([[previous['open']], opens])
+                closes = np.concatenate([[previous['close']], closes])
+                percent_b = np.concatenate([[previous['percent_b']], percent_b])
+                index = index.insert(0, previous['label'])
+
+            result = simulate_single_position(signals, opens, closes, cash, self.position_size_pct,
+                                              lag=1, position=position, entry_price=entry_price)
+            chunk_trades = trade_records(result['trades'], index, percent_b)
+            metrics.add_trades(chunk_trades)
+            trades.extend(chunk_trades)
+
+            for event in result['trades']:
+                if event['type'] == 'BUY':
+                    entry_price = event['price']
+            start = 0 if previous is None else 1
+            cash = float(result['cash'][-1])
+            position = int(result['position'][-1])
+
+            total = result['total'][start:]
+            metrics.update_many(total)
+
+            if equity_path is not None:
+                equity = pd.DataFrame({
+                    'Signal': signals[start:],
+                    'Position': result['position'][start:],
+                    'Cash': result['cash'][start:],
+                    'Holdings': result['holdings'][start:],
+                    'Total': total
+                }, index=work.index)
+                equity.to_csv(equity_path, mode='w' if first_write else 'a', header=first_write)
+                first_write = False
+
+            previous = {
+                'signal': signals[-1],
+                'open': opens[-1],
+                'close': closes[-1],
+                'percent_b': percent_b[-1],
+                'label': index[-1]
+            }
+
+        if metrics.bars == 0:
+            metrics.update(float(self.initial_capital))
+        return metrics.summary(), trades
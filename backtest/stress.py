@@ -0,0 +1,274 @@
+"""
+Synthetic-Path Stress Testing
+Runs the Bollinger strategy and BacktestEngine's rules over thousands of
+simulated price paths at once
+"""
+
+import numpy as np
+import pandas as pd
+
+from strategy.panel import cumulative_sums, rolling_mean_std
+
+
+# Path generators: bars x paths close matrices, one column per path
+
+def gbm_paths(n_paths, n_bars, start_price=100.0, drift=0.0, volatility=0.02, rng=None):
+    """Geometric Brownian motion with per-bar drift and volatility"""
+    rng = rng if rng is not None else np.random.default_rng()
+    log_returns = rng.standard_normal((n_bars, n_paths))
+    log_returns *= volatility
+    log_returns += drift - volatility ** 2 / 2
+    return start_price * np.exp(np.cumsum(log_returns, axis=0))
+
+
+def bootstrap_paths(prices, n_paths, n_bars, start_price=None, block_size=5, rng=None):
+    """
+    Paths rebuilt from blocks of historical log returns drawn with replacement.
+
+    Blocks of `block_size` consecutive bars keep short-range volatility
+    clustering; block_size=1 is the plain i.i.d. bootstrap.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    prices = np.asarray(prices, dtype=float)
+    log_returns = np.diff(np.log(prices))
+    log_returns = log_returns[np.isfinite(log_returns)]
+    block_size = max(1, min(block_size, len(log_returns)))
+    if start_price is None:
+        start_price = prices[-1]
+
+    n_blocks = -(-n_bars // block_size)
+    starts = rng.integers(0, len(log_returns) - block_size + 1, size=(n_blocks, n_paths))
+    offsets = np.arange(block_size)[None, :, None]
+    index = (starts[:, None, :] + offsets).reshape(n_blocks * block_size, n_paths)[:n_bars]
+    return start_price * np.exp(np.cumsum(log_returns[index], axis=0))
+
+
+def regime_switching_paths(n_paths, n_bars, start_price=100.0, drifts=(0.0005, -0.001),
+                           volatilities=(0.01, 0.03), transition=((0.98, 0.02), (0.05, 0.95)),
+                           rng=None):
+    """
+    GBM whose drift and volatility follow a Markov chain of regimes.
+
+    transition[i][j] is the per-bar probability of moving from regime i to
+    j. Every path starts in regime 0; the chain is stepped for all paths
+    at once, one bar at a time.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    drifts = np.asarray(drifts, dtype=float)
+    volatilities = np.asarray(volatilities, dtype=float)
+    cumulative = np.cumsum(np.asarray(transition, dtype=float), axis=1)
+    last = len(drifts) - 1
+
+    regimes = np.empty((n_bars, n_paths), dtype=np.int8)
+    state = np.zeros(n_paths, dtype=np.int8)
+    draws = rng.random((n_bars, n_paths))
+    for t in range(n_bars):
+        state = np.minimum((draws[t][:, None] > cumulative[state]).sum(axis=1), last).astype(np.int8)
+        regimes[t] = state
+
+    sigma = volatilities[regimes]
+    log_returns = rng.standard_normal((n_bars, n_paths))
+    log_returns *= sigma
+    log_returns += drifts[regimes] - sigma ** 2 / 2
+    return start_price * np.exp(np.cumsum(log_returns, axis=0))
+
+
+def next_bar_opens(closes, start_price=None):
+    """Opens for close-only paths: each bar opens at the previous close"""
+    opens = np.empty_like(closes)
+    opens[1:] = closes[:-1]
+    opens[0] = closes[0] if start_price is None else start_price
+    return opens
+
+
+class StressTest:
+    """
+    Distribution of strategy metrics over many price paths.
+
+    Percent_B comes from strategy.panel's rolling moments, one column per
+    path. The single-position state machine of BacktestEngine (signal at
+    close t, fill at open t+1, whole shares, position_size_pct of cash) is
+    stepped over bars with every path updated at once, keeping only the
+    running cash, shares, drawdown and return moments per path.
+
+    Per-path metrics match BacktestEngine.run + calculate_metrics, up to
+    rolling-sum rounding of Percent_B right at a threshold.
+    """
+
+    def __init__(self, strategy, initial_capital=100000, position_size_pct=0.95,
+                 periods_per_year=252, batch_size=2000):
+        """
+        Parameters:
+        -----------
+        strategy : BollingerBandsStrategy
+            Supplies window, num_std, oversold and overbought
+        batch_size : int
+            Paths evaluated together; bounds memory at a few bars x batch_size
+            matrices
+        """
+        self.strategy = strategy
+        self.initial_capital = initial_capital
+        self.position_size_pct = position_size_pct
+        self.periods_per_year = periods_per_year
+        self.batch_size = batch_size
+
+    def signals(self, closes):
+        """int8 BUY (1) / SELL (-1) / HOLD (0) matrix for bars x paths closes"""
+        strategy = self.strategy
+        sma, std = rolling_mean_std(cumulative_sums(closes), strategy.window)
+        lower = sma - std * strategy.num_std
+        upper = sma + std * strategy.num_std
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percent_b = (closes - lower) / (upper - lower)
+
+        signals = np.zeros(closes.shape, dtype=np.int8)
+        signals[percent_b < strategy.oversold] = 1
+        signals[percent_b > strategy.overbought] = -1
+        return signals
+
+    def _simulate(self, signals, opens, closes):
+        n_bars, n_paths = closes.shape
+        initial = float(self.initial_capital)
+
+        cash = np.full(n_paths, initial)
+        shares = np.zeros(n_paths, dtype=np.int64)
+        entry = np.zeros(n_paths)
+
+        n_trades = np.zeros(n_paths, dtype=np.int64)
+        n_wins = np.zeros(n_paths, dtype=np.int64)
+        n_losses = np.zeros(n_paths, dtype=np.int64)
+        win_sum = np.zeros(n_paths)
+        loss_sum = np.zeros(n_paths)
+
+        # The first bar is marked flat at the initial capital
+        previous = np.full(n_paths, initial)
+        peak = previous.copy()
+        min_drawdown = np.zeros(n_paths)
+        mean = np.zeros(n_paths)
+        m2 = np.zeros(n_paths)
+
+        for t in range(1, n_bars):
+            signal = signals[t - 1]
+            price = opens[t]
+
+            sell = (signal == -1) & (shares > 0)
+            if sell.any():
+                held = shares[sell]
+                exit_price = price[sell]
+                profit = (exit_price - entry[sell]) * held
+                cash[sell] += held * exit_price
+                shares[sell] = 0
+                n_trades[sell] += 1
+                won = profit > 0
+                n_wins[sell] += won
+                n_losses[sell] += ~won
+                win_sum[sell] += np.where(won, profit, 0.0)
+                loss_sum[sell] += np.where(won, 0.0, -profit)
+
+            buy = (signal == 1) & (shares == 0)
+            if buy.any():
+                budget = cash[buy] * self.position_size_pct
+                fill = price[buy]
+                bought = (budget / fill).astype(np.int64)
+                filled = bought > 0
+                rows = np.flatnonzero(buy)[filled]
+                bought = bought[filled]
+                fill = fill[filled]
+                cash[rows] -= bought * fill
+                shares[rows] = bought
+                entry[rows] = fill
+                n_trades[rows] += 1
+
+            total = cash + shares * closes[t]
+
+            # Welford update of bar returns, running peak and drawdown
+            r = total / previous - 1
+            delta = r - mean
+            mean += delta / t
+            m2 += delta * (r - mean)
+            np.maximum(peak, total, out=peak)
+            np.minimum(min_drawdown, (total - peak) / peak, out=min_drawdown)
+            previous = total
+
+        n_returns = n_bars - 1
+        if n_returns > 1:
+            std = np.sqrt(m2 / (n_returns - 1))
+            sharpe = np.divide(mean, std, out=np.zeros(n_paths), where=std != 0)
+            sharpe *= np.sqrt(self.periods_per_year)
+        else:
+            sharpe = np.zeros(n_paths)
+
+        closed = n_wins + n_losses
+        return {
+            'Final_Value': previous,
+            'Total_Return_Pct': (previous - initial) / initial * 100,
+            'Max_Drawdown_Pct': min_drawdown * 100,
+            'Sharpe_Ratio': sharpe,
+            'Total_Trades': n_trades,
+            'Win_Rate_Pct': np.divide(n_wins, closed, out=np.zeros(n_paths), where=closed > 0) * 100,
+            'Avg_Win': np.divide(win_sum, n_wins, out=np.zeros(n_paths), where=n_wins > 0),
+            'Avg_Loss': np.divide(loss_sum, n_losses, out=np.zeros(n_paths), where=n_losses > 0)
+        }
+
+    def run(self, closes, opens=None):
+        """
+        Backtest every path.
+
+        Parameters:
+        -----------
+        closes : array (bars x paths)
+            Close prices, one column per path
+        opens : array (bars x paths)
+            Fill prices (default: the previous bar's close)
+
+        Returns:
+        --------
+        metrics : DataFrame with one row per path and
+            BacktestEngine.calculate_metrics columns
+        """
+        closes = np.asarray(closes, dtype=float)
+        if closes.ndim == 1:
+            closes = closes[:, None]
+        if opens is None:
+            opens = next_bar_opens(closes)
+        opens = np.asarray(opens, dtype=float).reshape(closes.shape)
+
+        batches = []
+        for k in range(0, closes.shape[1], self.batch_size):
+            batch_closes = np.ascontiguousarray(closes[:, k:k + self.batch_size])
+            batch_opens = np.ascontiguousarray(opens[:, k:k + self.batch_size])
+            signals = self.signals(batch_closes)
+            batches.append(pd.DataFrame(self._simulate(signals, batch_opens, batch_closes)))
+
+        metrics = pd.concat(batches, ignore_index=True)
+        metrics.index.name = 'path'
+        return metrics
+
+    @staticmethod
+    def summarize(metrics, percentiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        """Distribution of each metric across paths"""
+        return metrics.describe(percentiles=list(percentiles)).T
+
+
+def run_scenarios(strategy, n_paths=10000, n_bars=1000, historical_prices=None, seed=42,
+                  **kwargs):
+    """
+    Stress-test a strategy on GBM, regime-switching and (when historical
+    prices are given) block-bootstrapped paths.
+
+    Returns a dict of per-path metric frames keyed by scenario name.
+    """
+    rng = np.random.default_rng(seed)
+    stress = StressTest(strategy, **kwargs)
+
+    scenarios = {
+        'gbm': lambda: gbm_paths(n_paths, n_bars, rng=rng),
+        'regime_switching': lambda: regime_switching_paths(n_paths, n_bars, rng=rng)
+    }
+    if historical_prices is not None:
+        scenarios['bootstrap'] = lambda: bootstrap_paths(historical_prices, n_paths, n_bars, rng=rng)
+
+    results = {}
+    for name, generate in scenarios.items():
+        results[name] = stress.run(generate())
+    return results
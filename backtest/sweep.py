@@ -0,0 +1,84 @@
+"""
+Parameter Sweep for the Bollinger Bands Strategy
+Shares one set of cumulative sums across every grid point
+"""
+
+import itertools
+import numpy as np
+import pandas as pd
+
+from backtest.backtest_engine import simulate_single_position
+from backtest.metrics import MetricsAccumulator
+from strategy.panel import cumulative_sums, rolling_mean_std
+
+
+def equity_metrics(total, trades, initial_capital):
+    """Same metrics as BacktestEngine.calculate_metrics, from a Total array"""
+    metrics = MetricsAccumulator(initial_capital)
+    metrics.update_many(total)
+    metrics.add_trades(trades, side_key='type', profit_key='profit')
+    summary = metrics.summary()
+    del summary['Initial_Capital']
+    return summary
+
+
+class ParameterSweep:
+    """
+    Grid search over (window, num_std, oversold, overbought).
+
+    Cumulative sums of close and close^2 are built once; each window's SMA
+    and STD come out of them in O(n) and each num_std only rescales the
+    bands. Every grid point runs the vectorized backtest with next-open
+    execution, as BacktestEngine with BollingerBandsStrategy does. Metrics
+    match the engine's, up to rolling-sum rounding of Percent_B right at a
+    threshold.
+    """
+
+    def __init__(self, df, initial_capital=100000, position_size_pct=0.95):
+        self.opens = df['open'].to_numpy(dtype=float)
+        self.closes = df['close'].to_numpy(dtype=float)
+        self.initial_capital = initial_capital
+        self.position_size_pct = position_size_pct
+        self.sums = cumulative_sums(self.closes)
+
+    def evaluate(self, percent_b, oversold, overbought):
+        signals = np.zeros(len(percent_b), dtype=np.int8)
+        signals[percent_b < oversold] = 1
+        signals[percent_b > overbought] = -1
+
+        result = simulate_single_position(signals, self.opens, self.closes,
+                                          self.initial_capital, self.position_size_pct)
+        return equity_metrics(result['total'], result['trades'], self.initial_capital)
+
+    def run(self, windows=(20,), num_stds=(2.0,), oversolds=(0.1,), overboughts=(0.9,),
+            sort_by='Sharpe_Ratio'):
+        """
+        Evaluate every grid point.
+
+        Returns:
+        --------
+        DataFrame with one row per combination, ranked by `sort_by`
+        """
+        rows = []
+        for window in windows:
+            sma, std = rolling_mean_std(self.sums, window)
+            deviation = self.closes - sma
+
+            for num_std in num_stds:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    percent_b = (deviation + num_std * std) / (2 * num_std * std)
+
+                for oversold, overbought in itertools.product(oversolds, overboughts):
+                    metrics = self.evaluate(percent_b, oversold, overbought)
+                    rows.append({
+                        'window': window,
+                        'num_std': num_std,
+                        'oversold': oversold,
+                        'overbought': overbought,
+                        **metrics
+                    })
+
+        results = pd.DataFrame(rows)
+        if len(results) and sort_by:
+            results = results.sort_values(sort_by, ascending=False, kind='stable').reset_index(drop=True)
+        return results
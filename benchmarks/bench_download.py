@@ -0,0 +1,39 @@
+"""
+Historical download throughput against a local mock of the history endpoint
+Run: python -m benchmarks.bench_download
+"""
+
+import pandas as pd
+
+from fyers.downloader import HistoricalDownloader
+from fyers.fakes import FakeHistoryAPI
+
+
+def run(n_symbols=10, years=3, resolution='D', latency=0.2, max_rps=10,
+        worker_counts=(1, 4, 8)):
+    """Candles per second for each pool size, with a simulated round trip and server rate limit"""
+    end = pd.Timestamp('2026-10-16', tz='Asia/Kolkata')
+    from_ts = int((end - pd.DateOffset(years=years)).timestamp())
+    to_ts = int(end.timestamp())
+    symbols = [f"NSE:SYM{k}-EQ" for k in range(n_symbols)]
+
+    results = {}
+    for workers in worker_counts:
+        api = FakeHistoryAPI(clock=lambda: to_ts, latency=latency, max_rps=max_rps)
+        # Stay just under the server limit, without bursts, so no 429s are provoked
+        downloader = HistoricalDownloader(api, max_workers=workers, requests_per_second=0.9 * max_rps,
+                                          burst=1)
+        frames = downloader.download(symbols, from_ts, to_ts, resolution)
+        results[workers] = {
+            'candles_per_s': downloader.throughput(),
+            'elapsed_s': downloader.stats['elapsed'],
+            'requests': downloader.stats['requests'],
+            'retries': downloader.stats['retries'],
+            'complete': all(df is not None for df in frames.values())
+        }
+    return results
+
+
+if __name__ == "__main__":
+    for workers, stats in run().items():
+        print(f"workers={workers}: {stats}")
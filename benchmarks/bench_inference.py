@@ -0,0 +1,61 @@
+"""
+Single-row inference latency: sklearn forest vs CompiledForest
+Run: python -m benchmarks.bench_inference
+"""
+
+import time
+import numpy as np
+import pandas as pd
+
+from ml_model import MLTradingModel
+from strategy.bollinger import calculate_bollinger_bands
+
+
+def make_training_frame(n_bars=3000, seed=42):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+    df = pd.DataFrame({'Close': close}, index=pd.date_range('2015-01-01', periods=n_bars, freq='B'))
+    return calculate_bollinger_bands(df, window=20, num_std=2)
+
+
+def time_calls(func, n_calls):
+    samples = np.empty(n_calls)
+    for k in range(n_calls):
+        started = time.perf_counter()
+        func()
+        samples[k] = time.perf_counter() - started
+    samples *= 1e6
+    return {
+        'p50_us': float(np.percentile(samples, 50)),
+        'p99_us': float(np.percentile(samples, 99)),
+        'mean_us': float(samples.mean())
+    }
+
+
+def run(n_calls=2000, batch_size=1000):
+    df = make_training_frame()
+    model = MLTradingModel()
+    model.train(df)
+
+    X = df[model.feature_columns].dropna().to_numpy()
+    row = X[-1:]
+    batch = X[-batch_size:]
+    compiled = model.compile()
+
+    sklearn_single = lambda: model.model.predict_proba(model.scaler.transform(row))
+    results = {
+        'sklearn_single_row': time_calls(sklearn_single, max(n_calls // 10, 50)),
+        'compiled_single_row': time_calls(lambda: compiled.predict_up(row), n_calls),
+        'sklearn_batch': time_calls(lambda: model.model.predict_proba(model.scaler.transform(batch)), 20),
+        'compiled_batch': time_calls(lambda: compiled.predict_proba(batch), 20)
+    }
+
+    # Same inputs, same answers
+    expected = model.model.predict_proba(model.scaler.transform(batch))
+    results['max_abs_diff'] = float(np.abs(expected - compiled.predict_proba(batch)).max())
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name}: {value}")
@@ -0,0 +1,111 @@
+"""
+Peak memory of the main.py pipeline (bands -> ML signals -> backtest):
+with copies, copy-free, and copy-free on compact dtypes
+Run: python -m benchmarks.bench_memory [n_rows] [volatility] [decimals]
+
+Each mode runs in its own subprocess so the peak RSS of one cannot hide
+the other's.
+"""
+
+import json
+import resource
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from compact import memory_mb, to_compact
+from ml_model import MLTradingModel
+from strategy.bollinger import calculate_bollinger_bands, generate_ml_signals, backtest_strategy
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_frame(n_rows, seed=42, volatility=0.01, decimals=None):
+    """
+    Random-walk minute bars. decimals rounds prices to ticks; with a low
+    volatility (e.g. 0.001) prices then stay where float32 is safe, so the
+    compact mode can narrow them.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, volatility, n_rows)))
+    open_ = close * (1 + rng.normal(0, volatility / 5, n_rows))
+    high = np.maximum(open_, close) * 1.001
+    low = np.minimum(open_, close) * 0.999
+    if decimals is not None:
+        open_, high, low, close = (p.round(decimals) for p in (open_, high, low, close))
+    return pd.DataFrame({
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': rng.integers(1000, 100000, n_rows).astype(float)
+    }, index=pd.date_range('2015-01-01 09:15', periods=n_rows, freq='min', name='date'))
+
+
+MODES = {
+    'copy': {'copy': True, 'compact': False},
+    'copy_free': {'copy': False, 'compact': False},
+    'compact': {'copy': False, 'compact': True},
+}
+
+
+def run_pipeline(n_rows, mode, volatility=0.01, decimals=None):
+    copy, compact = MODES[mode]['copy'], MODES[mode]['compact']
+    df = make_frame(n_rows, volatility=volatility, decimals=decimals)
+    if compact:
+        df = to_compact(df)
+
+    # Small forest trained on a prefix: the benchmark is about frame copies, not the model
+    model = MLTradingModel()
+    model.model = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=42)
+    model.train(calculate_bollinger_bands(df.iloc[:5000]))
+
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+
+    df = calculate_bollinger_bands(df, copy=copy)
+    df = generate_ml_signals(df, model, copy=copy, compact=compact)
+    df, trades, final_capital = backtest_strategy(df, copy=copy)
+
+    return {
+        'mode': mode,
+        'rows': n_rows,
+        'elapsed_s': time.perf_counter() - started,
+        'baseline_rss_mb': baseline,
+        'peak_rss_mb': peak_rss_mb(),
+        'frame_mb': memory_mb(df),
+        'trades': len(trades),
+        'final_value': float(final_capital)
+    }
+
+
+def run(n_rows=10_000_000, volatility=0.01, decimals=None):
+    results = []
+    for mode in MODES:
+        out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_memory', '--worker', mode, str(n_rows),
+                              str(volatility), str(decimals)],
+                             check=True, capture_output=True, text=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        decimals = None if sys.argv[5] == 'None' else int(sys.argv[5])
+        print(json.dumps(run_pipeline(int(sys.argv[3]), sys.argv[2], float(sys.argv[4]), decimals)))
+    else:
+        n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+        volatility = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+        decimals = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        for result in run(n_rows, volatility, decimals):
+            print(f"{result['mode']:>10}: peak {result['peak_rss_mb']:8.0f} MB "
+                  f"(+{result['peak_rss_mb'] - result['baseline_rss_mb']:.0f} MB over input), "
+                  f"result frame {result['frame_mb']:.0f} MB, "
+                  f"{result['elapsed_s']:.1f}s, {result['trades']} trades, "
+                  f"final {result['final_value']:.2f}")
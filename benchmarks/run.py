@@ -0,0 +1,247 @@
+"""
+Benchmark suite for the indicator, ML and backtest hot paths
+
+Run:      python -m benchmarks.run run --sizes 1e3 1e4 1e5 --out benchmarks/results/current.json
+Compare:  python -m benchmarks.run compare baseline.json current.json --threshold 0.10
+
+Every benchmark runs on the seeded synthetic bars from benchmarks.synthetic,
+so results from different runs measure the code, not the data. `compare`
+exits with status 1 when any benchmark got slower than the threshold.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from backtest.backtest_engine import BacktestEngine
+from benchmarks.synthetic import generate_ohlcv, title_case
+from ml.features import FeatureEngineer
+from ml.walk_forward import WalkForward
+from ml_model import MLTradingModel
+from strategy.bollinger import BollingerBandsStrategy, calculate_bollinger_bands, backtest_strategy
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Below this many seconds a slowdown is treated as timer noise
+NOISE_FLOOR_S = 0.001
+
+
+def _quiet(func):
+    """Run func with its progress prints swallowed"""
+    def call():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return call
+
+
+def _bands(df):
+    data = title_case(df)
+    return lambda: calculate_bollinger_bands(data)
+
+
+def _features(df):
+    fe = FeatureEngineer()
+    return lambda: fe.create_ml_features(df)
+
+
+def _train(df):
+    data = calculate_bollinger_bands(title_case(df))
+    return _quiet(lambda: MLTradingModel().train(data))
+
+
+def _predict(df):
+    data = calculate_bollinger_bands(title_case(df))
+    model = MLTradingModel()
+    _quiet(lambda: model.train(data.iloc[:5000]))()
+    return lambda: model.predict_proba(data)
+
+
+def _engine(df):
+    engine = BacktestEngine(BollingerBandsStrategy())
+    return _quiet(lambda: engine.run(df))
+
+
+def _backtest_strategy(df):
+    # Band-based BUY/SELL/HOLD labels stand in for model output
+    data = calculate_bollinger_bands(title_case(df))
+    percent_b = data['Percent_B'].to_numpy()
+    data['prob_up'] = np.clip(1 - percent_b, 0, 1)
+    data['Signal'] = np.where(percent_b < 0.1, 'BUY', np.where(percent_b > 0.9, 'SELL', 'HOLD'))
+    return lambda: backtest_strategy(data)
+
+
+def _walk_forward(retrain_every):
+    def setup(df):
+        features, cols = FeatureEngineer().create_ml_features(df)
+        walk_forward = WalkForward(min_train=20, retrain_every=retrain_every)
+        return lambda: walk_forward.run(features[cols], features['Target'])
+    return setup
+
+
+# name -> (setup(df) returning the timed callable, largest size worth running)
+BENCHMARKS = {
+    'calculate_bollinger_bands': (_bands, 10_000_000),
+    'create_ml_features': (_features, 10_000_000),
+    'ml_train': (_train, 100_000),
+    'ml_predict_proba': (_predict, 1_000_000),
+    'backtest_engine_run': (_engine, 10_000_000),
+    'backtest_strategy': (_backtest_strategy, 10_000_000),
+    'walk_forward': (_walk_forward(1), 1_000),
+    'walk_forward_k20': (_walk_forward(20), 10_000),
+}
+
+
+def time_benchmark(func, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def run(sizes=None, names=None, repeats=3, seed=42):
+    """
+    Time every selected benchmark at every size it supports.
+
+    Returns:
+    --------
+    dict with 'meta' (environment) and 'results' keyed by "<name>@<size>"
+    """
+    sizes = sizes or DEFAULT_SIZES
+    names = names or list(BENCHMARKS)
+    results = {}
+
+    for size in sizes:
+        df = generate_ohlcv(size, seed=seed)
+        for name in names:
+            setup, max_size = BENCHMARKS[name]
+            if size > max_size:
+                continue
+
+            func = setup(df)
+            samples = time_benchmark(func, repeats if size < 1_000_000 else 1)
+            best = min(samples)
+            results[f"{name}@{size}"] = {
+                'name': name,
+                'rows': size,
+                'repeats': len(samples),
+                'min_s': best,
+                'median_s': float(np.median(samples)),
+                'rows_per_s': size / best if best > 0 else None
+            }
+            print(f"{name:>28} @ {size:>10,}: {best * 1000:12.2f} ms")
+
+    meta = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'seed': seed
+    }
+    return {'meta': meta, 'results': results}
+
+
+def save(report, filepath):
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(filepath, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load(filepath):
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    Compare two reports on their shared benchmarks (min time).
+
+    Returns:
+    --------
+    list of dicts (key, baseline_s, current_s, change_pct, status) where status
+    is 'REGRESSION', 'IMPROVED' or 'OK'
+    """
+    rows = []
+    for key, base in baseline['results'].items():
+        if key not in current['results']:
+            continue
+        base_s = base['min_s']
+        current_s = current['results'][key]['min_s']
+        change = current_s / base_s - 1 if base_s > 0 else 0.0
+
+        status = 'OK'
+        if abs(current_s - base_s) > NOISE_FLOOR_S:
+            if change > threshold:
+                status = 'REGRESSION'
+            elif change < -threshold:
+                status = 'IMPROVED'
+
+        rows.append({
+            'key': key,
+            'baseline_s': base_s,
+            'current_s': current_s,
+            'change_pct': change * 100,
+            'status': status
+        })
+    return rows
+
+
+def _print_comparison(rows, baseline, current):
+    for field in ('python', 'numpy', 'pandas', 'machine', 'cpu_count'):
+        if baseline['meta'].get(field) != current['meta'].get(field):
+            print(f"Warning: {field} differs ({baseline['meta'].get(field)} -> {current['meta'].get(field)})")
+
+    for row in rows:
+        print(f"{row['key']:>40}: {row['baseline_s'] * 1000:10.2f} ms -> {row['current_s'] * 1000:10.2f} ms "
+              f"({row['change_pct']:+6.1f}%) {row['status']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="time the benchmarks and write a JSON report")
+    run_parser.add_argument('--sizes', nargs='+', type=lambda s: int(float(s)), default=DEFAULT_SIZES)
+    run_parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=None)
+    run_parser.add_argument('--repeats', type=int, default=3)
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--out', default='benchmarks/results/latest.json')
+
+    compare_parser = commands.add_parser('compare', help="flag regressions against a baseline report")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="allowed slowdown as a fraction (default 0.10)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        report = run(args.sizes, args.only, args.repeats, args.seed)
+        save(report, args.out)
+        print(f"Results saved to {args.out}")
+        return 0
+
+    baseline, current = load(args.baseline), load(args.current)
+    rows = compare(baseline, current, args.threshold)
+    _print_comparison(rows, baseline, current)
+    regressions = [row for row in rows if row['status'] == 'REGRESSION']
+    print(f"{len(regressions)} regression(s) in {len(rows)} benchmark(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Seeded synthetic OHLCV bars for benchmarks
+
+Closes follow a geometric Brownian motion; each open is the previous close
+moved by an occasional overnight gap. The same seed and arguments always
+give the same frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def generate_ohlcv(n_bars, seed=42, start_price=100.0, drift=0.0, volatility=0.001,
+                   gap_prob=0.001, gap_volatility=0.005, freq='min', start='2000-01-03'):
+    """
+    Generate a synthetic OHLCV frame.
+
+    Parameters:
+    -----------
+    n_bars : number of bars (1e3 to 1e7 are all practical)
+    drift, volatility : per-bar drift and volatility of the log return; the
+        minute-bar defaults keep 1e7 bars well inside float range, use
+        e.g. volatility=0.02 for daily bars
+    gap_prob : probability that a bar opens with a gap
+    gap_volatility : volatility of the gap log return
+    freq : bar spacing of the DatetimeIndex ('min' fits 1e7 bars in range)
+
+    Returns:
+    --------
+    DataFrame with lowercase open/high/low/close/volume and a 'date' index
+    """
+    rng = np.random.default_rng(seed)
+
+    gaps = np.where(rng.random(n_bars) < gap_prob, rng.normal(0.0, gap_volatility, n_bars), 0.0)
+    body = rng.normal(drift, volatility, n_bars)
+
+    # log(close_i) = log(close_{i-1}) + gap_i + body_i ; open_i = close_{i-1} * exp(gap_i)
+    log_close = np.log(start_price) + np.cumsum(gaps + body)
+    close = np.exp(log_close)
+    open_ = np.exp(log_close - body)
+
+    # High/low extend past the open-close range by a half-normal wick
+    wick = np.abs(rng.normal(0.0, 0.5 * volatility, (2, n_bars)))
+    high = np.maximum(open_, close) * np.exp(wick[0])
+    low = np.minimum(open_, close) * np.exp(-wick[1])
+
+    volume = np.round(rng.lognormal(11.0, 0.5, n_bars) * (1 + 20 * np.abs(body)))
+
+    index = pd.date_range(start, periods=n_bars, freq=freq, name='date')
+    return pd.DataFrame({
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume
+    }, index=index)
+
+
+def title_case(df):
+    """Rename columns to the Open/High/Low/Close/Volume used by strategy.bollinger"""
+    return df.rename(columns=str.title)
@@ -0,0 +1,143 @@
+"""
+Compact dtypes for intraday-scale data
+
+    float32 prices                  (only when widen_prices restores them exactly)
+    int32 volumes                   (when integral and in range)
+    int8 signal/direction codes     (SIGNAL_CODES, DIRECTION_CODES)
+    int64 epoch-second timestamps   (index named 'timestamp')
+
+Compact frames must trade exactly like the originals, so everything
+compared against a threshold stays float64: indicators, features and
+probabilities are never narrowed, and every computation reads prices
+through price_column / widen_prices, which turn float32 tick prices back
+into the exact float64 values they were stored from.
+
+Every pipeline entry point accepts frames in this form;
+generate_ml_signals and MLTradingModel.predict_proba produce it with
+compact=True.
+"""
+
+import numpy as np
+import pandas as pd
+
+SIGNAL_CODES = {'HOLD': 0, 'BUY': 1, 'SELL': -1}
+DIRECTION_CODES = {'DOWN': 0, 'UP': 1}
+NO_DIRECTION = -1  # rows without a prediction
+
+PRICE_COLUMNS = {'open', 'high', 'low', 'close'}
+VOLUME_COLUMNS = {'volume'}
+
+INT32_MAX = np.iinfo(np.int32).max
+
+
+MAX_DECIMALS = 8
+
+
+def widen_prices(values):
+    """
+    float64 prices from compact float32 ones.
+
+    Each value becomes the shortest decimal (up to MAX_DECIMALS places) that
+    rounds to the same float32, so a tick price such as 100.07 comes back as
+    exactly the float64 100.07 it was narrowed from. Other dtypes are only
+    cast to float64.
+    """
+    values = np.asarray(values)
+    if values.dtype != np.float32:
+        return np.asarray(values, dtype=float)
+
+    wide = values.astype(float)
+    pending = np.flatnonzero(np.isfinite(wide))
+    for decimals in range(MAX_DECIMALS + 1):
+        if len(pending) == 0:
+            break
+        rounded = np.round(wide[pending], decimals)
+        hit = rounded.astype(np.float32) == values[pending]
+        wide[pending[hit]] = rounded[hit]
+        pending = pending[~hit]
+    return wide
+
+
+def price_column(df, column):
+    """df[column] as a float64 Series, widened if it is a compact float32 column"""
+    prices = df[column]
+    if prices.dtype != np.float32:
+        return prices
+    return pd.Series(widen_prices(prices.to_numpy()), index=df.index, name=column)
+
+
+def float32_is_lossless(values):
+    """True if values survive a float32 round trip through widen_prices exactly"""
+    values = np.asarray(values, dtype=float)
+    restored = widen_prices(values.astype(np.float32))
+    return bool(np.array_equal(restored, values, equal_nan=True))
+
+
+def to_epoch(index):
+    """DatetimeIndex (or datetime-like values) -> int64 epoch seconds"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.as_unit('s').asi8
+
+
+def from_epoch(timestamps):
+    """int64 epoch seconds -> DatetimeIndex (UTC-naive), for display"""
+    return pd.to_datetime(np.asarray(timestamps, dtype=np.int64), unit='s')
+
+
+def encode_signals(signals):
+    """'BUY'/'SELL'/'HOLD' labels -> int8 codes (numeric input is cast as is)"""
+    signals = pd.Series(signals)
+    if pd.api.types.is_numeric_dtype(signals):
+        return signals.to_numpy().astype(np.int8)
+    return signals.map(SIGNAL_CODES).fillna(0).to_numpy().astype(np.int8)
+
+
+def decode_signals(codes):
+    labels = np.array(['SELL', 'HOLD', 'BUY'], dtype=object)
+    return labels[np.asarray(codes, dtype=np.int64) + 1]
+
+
+def to_compact(df, epoch_index=True):
+    """
+    Compact copy of an OHLCV / indicator / signal frame.
+
+    Price columns are narrowed only where the float32 round trip is exact
+    (tick prices), volume columns only where they are integral and in range;
+    other columns keep their dtype. Signal and predicted_direction labels
+    become int8 codes and a DatetimeIndex becomes int64 epoch seconds.
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        name = col.lower()
+
+        if name in PRICE_COLUMNS and pd.api.types.is_float_dtype(values):
+            if float32_is_lossless(values):
+                values = values.astype(np.float32)
+        elif name in VOLUME_COLUMNS and pd.api.types.is_numeric_dtype(values):
+            raw = values.to_numpy(dtype=float)
+            if np.all(np.isfinite(raw)) and np.all(raw == np.round(raw)) and \
+                    (len(raw) == 0 or (raw.min() >= 0 and raw.max() <= INT32_MAX)):
+                values = values.astype(np.int32)
+        elif col == 'Signal':
+            values = pd.Series(encode_signals(values), index=df.index)
+        elif col == 'predicted_direction' and not pd.api.types.is_numeric_dtype(values):
+            values = values.map(DIRECTION_CODES).fillna(NO_DIRECTION).astype(np.int8)
+        elif col == 'Target' and pd.api.types.is_integer_dtype(values):
+            values = values.astype(np.int8)
+        columns[col] = values
+
+    index = df.index
+    if epoch_index and isinstance(index, pd.DatetimeIndex):
+        index = pd.Index(to_epoch(index), name='timestamp')
+
+    result = pd.DataFrame(columns, index=df.index)
+    result.index = index
+    return result
+
+
+def memory_mb(df):
+    """Deep memory use of a frame, index included, in MB"""
+    return df.memory_usage(deep=True, index=True).sum() / (1024 * 1024)
@@ -1,5 +1,6 @@
 import os
 from fyers_apiv3 import fyersModel
+from fyers.session import TOKEN_FILE, get_session, read_token_file
 
 class FyersAuth:
     def __init__(self):
@@ -11,42 +12,36 @@ class FyersAuth:
         
         self.redirect_uri = os.getenv('FYERS_REDIRECT_URI', 'https://www.google.com')
         self.access_token = None
+        self._session_model = None
+    
+    def _get_session_model(self):
+        if self._session_model is None:
+            self._session_model = fyersModel.SessionModel(
+                client_id=self.client_id,
+                secret_key=self.secret_key,
+                redirect_uri=self.redirect_uri,
+                response_type="code",
+                grant_type="authorization_code"
+            )
+        return self._session_model
     
     def generate_auth_url(self):
-        session = fyersModel.SessionModel(
-            client_id=self.client_id,
-            secret_key=self.secret_key,
-            redirect_uri=self.redirect_uri,
-            response_type="code",
-            grant_type="authorization_code"
-        )
-        return session.generate_authcode()
+        return self._get_session_model().generate_authcode()
     
     def generate_token(self, auth_code):
-        session = fyersModel.SessionModel(
-            client_id=self.client_id,
-            secret_key=self.secret_key,
-            redirect_uri=self.redirect_uri,
-            response_type="code",
-            grant_type="authorization_code"
-        )
+        session = self._get_session_model()
         session.set_token(auth_code)
         response = session.generate_token()
         
         if response.get('code') == 200:
             self.access_token = response['access_token']
+            get_session(client_id=self.client_id, token=self.access_token).set_token(self.access_token)
             return self.access_token
         return None
     
     def get_fyers_instance(self):
+        """Shared, warm client for this process (see fyers.session)"""
         if not self.access_token:
-            token_file = 'fyers_access_token.txt'
-            if os.path.exists(token_file):
-                with open(token_file, 'r') as f:
-                    self.access_token = f.read().strip()
+            self.access_token = read_token_file(TOKEN_FILE)
         
-        return fyersModel.FyersModel(
-            client_id=self.client_id,
-            token=self.access_token,
-            log_path=""
-        )
+        return get_session(client_id=self.client_id, token=self.access_token).get_client()
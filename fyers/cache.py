@@ -0,0 +1,151 @@
+import json
+import os
+import re
+import time
+import numpy as np
+import pandas as pd
+
+# FYERS stamps daily candles at midnight exchange time
+EXCHANGE_TZ = 'Asia/Kolkata'
+
+class HistoricalDataCache:
+    """
+    On-disk candle store keyed by (symbol, resolution).
+
+    Candles live in memory-mapped NumPy files (int64 epoch timestamps plus a
+    float64 OHLCV matrix) and a coverage.json records which timestamp ranges
+    have already been requested from the broker, so holidays and empty
+    sessions are not refetched. A request only fetches the uncovered gaps,
+    merges them into the store and slices the result from disk.
+
+    `source` is anything with fetch_candles(symbol, resolution, from_ts, to_ts)
+    returning a list of [timestamp, open, high, low, close, volume] rows, or
+    None on failure (FyersData, or a fake client in tests).
+    """
+
+    def __init__(self, source, cache_dir='data/cache', clock=time.time, exchange_tz=EXCHANGE_TZ):
+        self.source = source
+        self.cache_dir = cache_dir
+        self.clock = clock
+        self.exchange_tz = exchange_tz
+
+    def session_start(self):
+        """Epoch seconds of midnight, exchange time, of the current session"""
+        now = pd.Timestamp(self.clock(), unit='s', tz='UTC').tz_convert(self.exchange_tz)
+        return int(now.normalize().timestamp())
+
+    def _key_dir(self, symbol, resolution):
+        safe_symbol = re.sub(r'[^A-Za-z0-9_.-]', '_', symbol)
+        return os.path.join(self.cache_dir, f"{safe_symbol}__{resolution}")
+
+    def load(self, symbol, resolution):
+        """Return (timestamps, ohlcv, coverage) for a key, memory-mapped"""
+        key_dir = self._key_dir(symbol, resolution)
+        coverage_file = os.path.join(key_dir, 'coverage.json')
+        if not os.path.exists(coverage_file):
+            return np.empty(0, dtype=np.int64), np.empty((0, 5)), []
+
+        with open(coverage_file, 'r') as f:
+            coverage = [tuple(span) for span in json.load(f)]
+
+        timestamps = np.load(os.path.join(key_dir, 'timestamps.npy'), mmap_mode='r')
+        ohlcv = np.load(os.path.join(key_dir, 'ohlcv.npy'), mmap_mode='r')
+        return timestamps, ohlcv, coverage
+
+    def _store(self, symbol, resolution, timestamps, ohlcv, coverage):
+        key_dir = self._key_dir(symbol, resolution)
+        os.makedirs(key_dir, exist_ok=True)
+
+        # Write to temporaries and rename, so readers never see a half-written store
+        for name, array in (('timestamps.npy', timestamps), ('ohlcv.npy', ohlcv)):
+            tmp_path = os.path.join(key_dir, name + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp_path, os.path.join(key_dir, name))
+
+        tmp_path = os.path.join(key_dir, 'coverage.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump([list(span) for span in coverage], f)
+        os.replace(tmp_path, os.path.join(key_dir, 'coverage.json'))
+
+    @staticmethod
+    def missing_ranges(from_ts, to_ts, coverage):
+        """Parts of [from_ts, to_ts] not inside any covered span"""
+        gaps = []
+        cursor = from_ts
+        for start, end in sorted(coverage):
+            if end < cursor:
+                continue
+            if start > to_ts:
+                break
+            if start > cursor:
+                gaps.append((cursor, start - 1))
+            cursor = max(cursor, end + 1)
+            if cursor > to_ts:
+                break
+        if cursor <= to_ts:
+            gaps.append((cursor, to_ts))
+        return gaps
+
+    @staticmethod
+    def merge_coverage(coverage, span):
+        spans = sorted(list(coverage) + [span])
+        merged = [list(spans[0])]
+        for start, end in spans[1:]:
+            if start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return [tuple(span) for span in merged]
+
+    def get(self, symbol, resolution, from_ts, to_ts):
+        """Candles in [from_ts, to_ts] as a DataFrame, fetching only what is missing"""
+        timestamps, ohlcv, coverage = self.load(symbol, resolution)
+        gaps = self.missing_ranges(from_ts, to_ts, coverage)
+
+        if gaps:
+            new_rows = []
+            failed = False
+            # Bars of the current session (the daily bar is stamped at its
+            # exchange-time midnight) may still be forming; never mark them covered
+            today = self.session_start()
+
+            for start, end in gaps:
+                candles = self.source.fetch_candles(symbol, resolution, start, end)
+                if candles is None:
+                    failed = True
+                    continue
+                new_rows.extend(candles)
+                if start < today:
+                    coverage = self.merge_coverage(coverage, (start, min(end, today - 1)))
+
+            if new_rows:
+                fetched = np.asarray(new_rows, dtype=float).reshape(-1, 6)
+                all_ts = np.concatenate([np.asarray(timestamps), fetched[:, 0].astype(np.int64)])
+                all_ohlcv = np.concatenate([np.asarray(ohlcv), fetched[:, 1:]])
+
+                # Keep the freshest copy of any candle that was fetched twice
+                order = np.argsort(all_ts, kind='stable')
+                all_ts = all_ts[order]
+                all_ohlcv = all_ohlcv[order]
+                keep = np.append(all_ts[1:] != all_ts[:-1], True)
+                timestamps, ohlcv = all_ts[keep], all_ohlcv[keep]
+
+            self._store(symbol, resolution, timestamps, ohlcv, coverage)
+            if failed:
+                return None
+
+        lo = np.searchsorted(timestamps, from_ts, side='left')
+        hi = np.searchsorted(timestamps, to_ts, side='right')
+        return self._to_frame(timestamps[lo:hi], ohlcv[lo:hi])
+
+    @staticmethod
+    def _to_frame(timestamps, ohlcv):
+        df = pd.DataFrame({
+            'open': ohlcv[:, 0],
+            'high': ohlcv[:, 1],
+            'low': ohlcv[:, 2],
+            'close': ohlcv[:, 3],
+            'volume': ohlcv[:, 4].astype(np.int64)
+        }, index=pd.DatetimeIndex(pd.to_datetime(np.asarray(timestamps), unit='s'), name='date'))
+        return df
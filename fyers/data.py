@@ -1,13 +1,23 @@
 from datetime import datetime
 import pandas as pd
+from fyers.cache import HistoricalDataCache
+from fyers.session import get_session
 
 class FyersData:
-    def __init__(self, fyers_instance):
-        self.fyers = fyers_instance
+    def __init__(self, fyers_instance=None, cache_dir=None, downloader=None):
+        self._fyers = fyers_instance
+        self.downloader = downloader
+        self.cache = HistoricalDataCache(self, cache_dir) if cache_dir else None
     
-    def get_historical_data(self, symbol, from_date, to_date, resolution='D'):
-        from_ts = int(datetime.strptime(from_date, '%Y-%m-%d').timestamp())
-        to_ts = int(datetime.strptime(to_date, '%Y-%m-%d').timestamp())
+    @property
+    def fyers(self):
+        # Without an explicit client, use the process-wide warm session
+        return self._fyers if self._fyers is not None else get_session().get_client()
+    
+    def fetch_candles(self, symbol, resolution, from_ts, to_ts):
+        """Raw candle rows for an epoch range, or None if the API call fails"""
+        if self.downloader is not None:
+            return self.downloader.fetch_candles(symbol, resolution, from_ts, to_ts)
         
         data_params = {
             'symbol': symbol,
@@ -21,7 +31,20 @@ class FyersData:
         response = self.fyers.history(data=data_params)
         
         if response.get('code') == 200:
-            candles = response['candles']
+            return response.get('candles', [])
+        return None
+    
+    def get_historical_data(self, symbol, from_date, to_date, resolution='D'):
+        from_ts = int(datetime.strptime(from_date, '%Y-%m-%d').timestamp())
+        to_ts = int(datetime.strptime(to_date, '%Y-%m-%d').timestamp())
+        
+        if self.cache is not None:
+            # Cover every bar of to_date, as the API does for intraday resolutions
+            return self.cache.get(symbol, resolution, from_ts, to_ts + 86399)
+        
+        candles = self.fetch_candles(symbol, resolution, from_ts, to_ts)
+        
+        if candles is not None:
             df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
             df['date'] = pd.to_datetime(df['timestamp'], unit='s')
             df.set_index('date', inplace=True)
@@ -0,0 +1,199 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Longest range (in days) the history endpoint serves in one call
+MAX_DAYS_PER_REQUEST = {'D': 366, '1D': 366}
+INTRADAY_MAX_DAYS = 100
+
+# Replies worth retrying: rate limited or a server-side error
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+# Transport failures (socket errors, timeouts; requests' exceptions derive from OSError)
+RETRYABLE_ERRORS = (OSError,)
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second, bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take a token and return how long the caller must wait before using it"""
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            self.sleep(wait)
+
+
+class HistoricalDownloader:
+    """
+    Chunked, concurrent candle downloader for the FYERS history endpoint.
+
+    A range is split into chunks the endpoint accepts, and chunks of every
+    symbol are fetched on a thread pool under a shared token-bucket rate
+    limit. Transport errors and rate-limit / 5xx replies are retried with
+    exponential backoff; other replies (bad symbol, bad range) fail at once
+    and any other exception propagates. Overlapping candles are
+    de-duplicated and each symbol is stitched into one sorted frame.
+    `stats` records requests, retries, candles and elapsed time so
+    throughput can be measured against fyers.fakes.FakeHistoryAPI (see
+    benchmarks/bench_download.py).
+    """
+
+    def __init__(self, fyers_instance, max_workers=4, requests_per_second=10, burst=None,
+                 max_retries=3, backoff=0.5, sleep=time.sleep):
+        self.fyers = fyers_instance
+        self.max_workers = max_workers
+        self.limiter = TokenBucket(requests_per_second, burst, sleep=sleep)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'candles': 0, 'elapsed': 0.0}
+
+    def throughput(self):
+        """Candles downloaded per second of wall time"""
+        if self.stats['elapsed'] == 0:
+            return 0.0
+        return self.stats['candles'] / self.stats['elapsed']
+
+    @staticmethod
+    def split_range(resolution, from_ts, to_ts):
+        """Split [from_ts, to_ts] into chunks the endpoint accepts"""
+        span = MAX_DAYS_PER_REQUEST.get(resolution, INTRADAY_MAX_DAYS) * 86400
+        chunks = []
+        start = from_ts
+        while start <= to_ts:
+            end = min(start + span - 1, to_ts)
+            chunks.append((start, end))
+            start = end + 1
+        return chunks
+
+    @staticmethod
+    def retryable(code):
+        return code in RETRYABLE_CODES or (isinstance(code, int) and 500 <= code < 600)
+
+    def _count(self, key, value=1):
+        with self.stats_lock:
+            self.stats[key] += value
+
+    def _fetch_chunk(self, symbol, resolution, from_ts, to_ts):
+        data_params = {
+            'symbol': symbol,
+            'resolution': resolution,
+            'date_format': '1',
+            'range_from': str(from_ts),
+            'range_to': str(to_ts),
+            'cont_flag': '1'
+        }
+
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                self._count('retries')
+                self.sleep(self.backoff * (2 ** (attempt - 1)))
+
+            self.limiter.acquire()
+            self._count('requests')
+            try:
+                response = self.fyers.history(data=data_params)
+            except RETRYABLE_ERRORS as e:
+                error = repr(e)
+                continue
+
+            code = response.get('code')
+            if code == 200:
+                candles = response.get('candles', [])
+                self._count('candles', len(candles))
+                return candles
+
+            error = f"code {code}: {response.get('message', '')}"
+            if not self.retryable(code):
+                break
+
+        self._count('failures')
+        print(f"History request failed for {symbol} {resolution} [{from_ts}, {to_ts}] "
+              f"after {attempt + 1} attempt(s): {error}")
+        return None
+
+    @staticmethod
+    def _stitch(chunks):
+        rows = [row for chunk in chunks for row in chunk]
+        if not rows:
+            return np.empty((0, 6))
+
+        candles = np.asarray(rows, dtype=float).reshape(-1, 6)
+        order = np.argsort(candles[:, 0], kind='stable')
+        candles = candles[order]
+        keep = np.append(candles[1:, 0] != candles[:-1, 0], True)
+        return candles[keep]
+
+    def download(self, symbols, from_ts, to_ts, resolution='D'):
+        """
+        Download several symbols concurrently.
+
+        Returns:
+        --------
+        dict of symbol -> DataFrame (None for symbols with a failed chunk)
+        """
+        chunks = self.split_range(resolution, from_ts, to_ts)
+        tasks = [(symbol, start, end) for symbol in symbols for start, end in chunks]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(lambda task: self._fetch_chunk(task[0], resolution, task[1], task[2]),
+                                    tasks))
+        self._count('elapsed', time.perf_counter() - started)
+
+        by_symbol = {symbol: [] for symbol in symbols}
+        for (symbol, _, _), candles in zip(tasks, results):
+            by_symbol[symbol].append(candles)
+
+        frames = {}
+        for symbol, symbol_chunks in by_symbol.items():
+            if any(candles is None for candles in symbol_chunks):
+                frames[symbol] = None
+                continue
+
+            candles = self._stitch(symbol_chunks)
+            df = pd.DataFrame(candles[:, 1:], columns=['open', 'high', 'low', 'close', 'volume'])
+            df['volume'] = df['volume'].astype(np.int64)
+            df.index = pd.DatetimeIndex(pd.to_datetime(candles[:, 0].astype(np.int64), unit='s'), name='date')
+            frames[symbol] = df
+        return frames
+
+    def fetch_candles(self, symbol, resolution, from_ts, to_ts):
+        """Candle rows for one symbol; same contract as FyersData.fetch_candles"""
+        chunks = self.split_range(resolution, from_ts, to_ts)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(lambda chunk: self._fetch_chunk(symbol, resolution, *chunk), chunks))
+        self._count('elapsed', time.perf_counter() - started)
+
+        if any(candles is None for candles in results):
+            return None
+        return self._stitch(results).tolist()
@@ -0,0 +1,186 @@
+import asyncio
+import collections
+import itertools
+import threading
+import time
+import zlib
+import numpy as np
+import pandas as pd
+
+EXCHANGE_TZ = 'Asia/Kolkata'
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=15)
+SESSION_CLOSE = pd.Timedelta(hours=15, minutes=30)
+
+
+class FakeHistoryAPI:
+    """
+    Local stand-in for FyersModel.history, for tests and throughput checks.
+
+    Serves deterministic candles for any symbol the way FYERS stamps them:
+    daily bars at IST midnight on weekdays, intraday bars (resolution in
+    minutes) from 09:15 to 15:30 IST. Bars after `clock()` are not served;
+    set_candle() overrides fields of one bar, e.g. to move a still-forming
+    close. Every call is recorded in `calls`.
+
+    `latency` (seconds) is slept per call and `max_rps` makes the fake reply
+    429 beyond that many calls in any one-second window, like the real
+    endpoint. queue() scripts the next replies (dicts or exceptions to
+    raise) ahead of normal service.
+    """
+
+    def __init__(self, clock=time.time, seed=0, latency=0.0, max_rps=None):
+        self.clock = clock
+        self.seed = seed
+        self.latency = latency
+        self.max_rps = max_rps
+        self.overrides = {}
+        self.calls = []
+        self.scripted = collections.deque()
+        self.recent = collections.deque()
+        self.lock = threading.Lock()
+
+    def queue(self, *replies):
+        self.scripted.extend(replies)
+
+    def set_candle(self, symbol, resolution, timestamp, **fields):
+        """Override open/high/low/close/volume of one bar"""
+        self.overrides.setdefault((symbol, resolution, int(timestamp)), {}).update(fields)
+
+    @staticmethod
+    def timestamps(resolution, from_ts, to_ts):
+        """Bar timestamps in [from_ts, to_ts] for a resolution"""
+        start = pd.Timestamp(from_ts, unit='s', tz='UTC').tz_convert(EXCHANGE_TZ).normalize()
+        end = pd.Timestamp(to_ts, unit='s', tz='UTC').tz_convert(EXCHANGE_TZ).normalize()
+        days = pd.bdate_range(start, end)
+
+        stamps = days.as_unit('s').asi8
+        if resolution not in ('D', '1D'):
+            step = int(resolution) * 60
+            offsets = np.arange(SESSION_OPEN.total_seconds(), SESSION_CLOSE.total_seconds(), step)
+            stamps = (stamps[:, None] + offsets.astype(np.int64)[None, :]).reshape(-1)
+        stamps = np.asarray(stamps, dtype=np.int64)
+        return stamps[(stamps >= from_ts) & (stamps <= to_ts)]
+
+    def candle(self, symbol, resolution, timestamp):
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode()), int(timestamp)])
+        base = 100 + (int(timestamp) // 86400) % 50
+        o, c = base + rng.normal(0, 1, 2)
+        row = {'open': o, 'high': max(o, c) + 0.5, 'low': min(o, c) - 0.5, 'close': c,
+               'volume': int(rng.integers(1000, 10000))}
+        row.update(self.overrides.get((symbol, resolution, int(timestamp)), {}))
+        return [int(timestamp), row['open'], row['high'], row['low'], row['close'], row['volume']]
+
+    def history(self, data):
+        symbol = data['symbol']
+        resolution = data['resolution']
+        from_ts, to_ts = int(data['range_from']), int(data['range_to'])
+        with self.lock:
+            self.calls.append((symbol, resolution, from_ts, to_ts))
+            scripted = self.scripted.popleft() if self.scripted else None
+            limited = False
+            if self.max_rps is not None:
+                started = time.monotonic()
+                while self.recent and self.recent[0] <= started - 1.0:
+                    self.recent.popleft()
+                limited = len(self.recent) >= self.max_rps
+                if not limited:
+                    self.recent.append(started)
+
+        if self.latency:
+            time.sleep(self.latency)
+        if isinstance(scripted, BaseException):
+            raise scripted
+        if scripted is not None:
+            return scripted
+        if limited:
+            return {'s': 'error', 'code': 429, 'message': 'request limit reached'}
+
+        now = int(self.clock())
+        candles = [self.candle(symbol, resolution, ts)
+                   for ts in self.timestamps(resolution, from_ts, min(to_ts, now))]
+        return {'s': 'ok', 'code': 200, 'candles': candles}
+
+
+class FakeBroker:
+    """
+    Local stand-in for the FyersModel order endpoints, for router tests.
+
+    place_order / place_basket_orders sleep `latency` seconds and reply the
+    way FYERS does (code 1101 on acceptance). Symbols in `reject_symbols`
+    are rejected. Accepted order payloads are kept in `orders`, and
+    `max_in_flight` records the most calls seen at the same time.
+    """
+
+    def __init__(self, latency=0.0, reject_symbols=()):
+        self.latency = latency
+        self.reject_symbols = set(reject_symbols)
+        self.orders = []
+        self.basket_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def _enter(self):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def _accept(self, data):
+        if data['symbol'] in self.reject_symbols:
+            return {'s': 'error', 'code': -50, 'message': 'Invalid symbol'}
+        with self.lock:
+            self.orders.append(data)
+            order_id = f"FAKE{next(self.ids):08d}"
+        return {'s': 'ok', 'code': 1101, 'message': 'Order submitted', 'id': order_id}
+
+    def _basket(self, data):
+        with self.lock:
+            self.basket_calls += 1
+        results = []
+        for order in data:
+            body = self._accept(order)
+            results.append({'statusCode': 200 if body['s'] == 'ok' else 400, 'body': body})
+        return {'s': 'ok', 'code': 200, 'data': results}
+
+    def place_order(self, data):
+        self._enter()
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            return self._accept(data)
+        finally:
+            self._leave()
+
+    def place_basket_orders(self, data):
+        self._enter()
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            return self._basket(data)
+        finally:
+            self._leave()
+
+
+class AsyncFakeBroker(FakeBroker):
+    """FakeBroker with coroutine endpoints, like FyersModel(is_async=True)"""
+
+    async def place_order(self, data):
+        self._enter()
+        try:
+            await asyncio.sleep(self.latency)
+            return self._accept(data)
+        finally:
+            self._leave()
+
+    async def place_basket_orders(self, data):
+        self._enter()
+        try:
+            await asyncio.sleep(self.latency)
+            return self._basket(data)
+        finally:
+            self._leave()
@@ -1,8 +1,16 @@
+from fyers.session import get_session
+
 class FyersOrders:
-    def __init__(self, fyers_instance):
-        self.fyers = fyers_instance
+    def __init__(self, fyers_instance=None):
+        self._fyers = fyers_instance
     
-    def place_market_order(self, symbol, qty, side):
+    @property
+    def fyers(self):
+        # Without an explicit client, use the process-wide warm session
+        return self._fyers if self._fyers is not None else get_session().get_client()
+    
+    @staticmethod
+    def build_market_order(symbol, qty, side, order_tag=None):
         order_data = {
             'symbol': symbol,
             'qty': qty,
@@ -15,6 +23,12 @@ class FyersOrders:
             'disclosedQty': 0,
             'offlineOrder': False
         }
+        if order_tag:
+            order_data['orderTag'] = order_tag
+        return order_data
+    
+    def place_market_order(self, symbol, qty, side):
+        order_data = self.build_market_order(symbol, qty, side)
         
         response = self.fyers.place_order(data=order_data)
         return response
@@ -0,0 +1,163 @@
+import asyncio
+import inspect
+import itertools
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from fyers.downloader import TokenBucket
+from fyers.orders import FyersOrders
+
+# Most orders the basket endpoint accepts in one call
+MAX_BASKET_SIZE = 10
+
+class AsyncOrderRouter:
+    """
+    Concurrent market-order submission for rebalancing many symbols at once.
+
+    Orders are sent concurrently (or grouped into basket calls) under a
+    token-bucket rate limit. Each order gets a client-side ID, which is also
+    sent as the FYERS orderTag, and its submit -> ack latency is recorded.
+    The client may be a FyersModel (sync or is_async=True) or any fake
+    broker exposing place_order / place_basket_orders (see
+    fyers.fakes.FakeBroker); blocking clients run on a dedicated thread
+    pool, released by close() or on leaving a `with` block.
+
+    Client IDs are prefix + a random per-router token + a counter, so
+    routers in the same second or in other processes never share an
+    orderTag.
+    """
+
+    def __init__(self, fyers_instance, requests_per_second=10, burst=None, use_basket=False,
+                 basket_size=MAX_BASKET_SIZE, id_prefix='BB', max_threads=32):
+        self.fyers = fyers_instance
+        self.limiter = TokenBucket(requests_per_second, burst)
+        self.use_basket = use_basket
+        self.basket_size = min(basket_size, MAX_BASKET_SIZE)
+        self.id_prefix = id_prefix
+        self.instance_id = uuid.uuid4().hex[:10]
+        self.ids = itertools.count(1)
+        self.records = {}
+        # Blocking clients get their own threads so orders never queue behind each other
+        self.executor = ThreadPoolExecutor(max_workers=max_threads)
+
+    def next_client_id(self):
+        return f"{self.id_prefix}{self.instance_id}{next(self.ids):06d}"
+
+    def close(self):
+        """Shut down the thread pool used for blocking clients"""
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    async def _acquire(self):
+        wait = self.limiter.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _call(self, method, data):
+        func = getattr(self.fyers, method)
+        if inspect.iscoroutinefunction(func):
+            return await func(data=data)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, lambda: func(data=data))
+
+    def _new_record(self, symbol, qty, side):
+        client_id = self.next_client_id()
+        record = {
+            'client_id': client_id,
+            'symbol': symbol,
+            'qty': qty,
+            'side': side,
+            'status': 'PENDING',
+            'submitted_at': None,
+            'acked_at': None,
+            'latency_ms': None,
+            'response': None
+        }
+        self.records[client_id] = record
+        return record
+
+    @staticmethod
+    def _ack(record, response, submitted_at):
+        acked_at = time.perf_counter()
+        record['submitted_at'] = submitted_at
+        record['acked_at'] = acked_at
+        record['latency_ms'] = (acked_at - submitted_at) * 1000
+        record['response'] = response
+        ok = isinstance(response, dict) and (response.get('s') == 'ok' or response.get('code') in (200, 1101))
+        record['status'] = 'ACKED' if ok else 'REJECTED'
+
+    async def _submit_one(self, record):
+        order_data = FyersOrders.build_market_order(record['symbol'], record['qty'], record['side'],
+                                                    order_tag=record['client_id'])
+        await self._acquire()
+        submitted_at = time.perf_counter()
+        try:
+            response = await self._call('place_order', order_data)
+        except Exception as e:
+            response = {'s': 'error', 'message': str(e)}
+        self._ack(record, response, submitted_at)
+        return record
+
+    async def _submit_basket(self, records):
+        orders = [FyersOrders.build_market_order(r['symbol'], r['qty'], r['side'], order_tag=r['client_id'])
+                  for r in records]
+        await self._acquire()
+        submitted_at = time.perf_counter()
+        try:
+            response = await self._call('place_basket_orders', orders)
+        except Exception as e:
+            response = {'s': 'error', 'message': str(e)}
+
+        # The basket reply lists one result per order, in submission order
+        results = response.get('data') if isinstance(response, dict) else None
+        for k, record in enumerate(records):
+            if isinstance(results, list) and k < len(results):
+                item = results[k]
+                self._ack(record, item.get('body', item), submitted_at)
+            else:
+                self._ack(record, response, submitted_at)
+        return records
+
+    async def submit(self, orders):
+        """
+        Submit orders concurrently.
+
+        Parameters:
+        -----------
+        orders : iterable of (symbol, qty, side) tuples
+
+        Returns:
+        --------
+        List of order records in the same order as `orders`
+        """
+        records = [self._new_record(symbol, qty, side) for symbol, qty, side in orders]
+
+        if self.use_basket:
+            baskets = [records[k:k + self.basket_size] for k in range(0, len(records), self.basket_size)]
+            await asyncio.gather(*(self._submit_basket(basket) for basket in baskets))
+        else:
+            await asyncio.gather(*(self._submit_one(record) for record in records))
+        return records
+
+    def route(self, orders):
+        """Blocking wrapper around submit() for synchronous callers"""
+        return asyncio.run(self.submit(orders))
+
+    def latency_summary(self):
+        """p50/p99/max submit -> ack latency in milliseconds"""
+        latencies = np.array([r['latency_ms'] for r in self.records.values() if r['latency_ms'] is not None])
+        if len(latencies) == 0:
+            return {'count': 0, 'p50_ms': None, 'p99_ms': None, 'max_ms': None}
+        return {
+            'count': len(latencies),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'max_ms': float(latencies.max())
+        }
@@ -0,0 +1,183 @@
+import base64
+import json
+import os
+import threading
+import time
+
+TOKEN_FILE = 'fyers_access_token.txt'
+
+def token_expiry(access_token):
+    """Expiry (epoch seconds) from the JWT 'exp' claim, or None if unreadable"""
+    try:
+        payload = access_token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (IndexError, KeyError, ValueError, TypeError):
+        return None
+
+def read_token_file(token_file=TOKEN_FILE):
+    if os.path.exists(token_file):
+        with open(token_file, 'r') as f:
+            return f.read().strip() or None
+    return None
+
+
+class FyersSession:
+    """
+    One warm, authenticated FyersModel per process.
+
+    The client is built once per access token and shared by FyersData and
+    FyersOrders. A background timer swaps in a fresh token `refresh_margin`
+    seconds before the current one expires, so trading-path calls never pay
+    for authentication or client construction.
+
+    `refresh` is a callable returning a new access token. By default it
+    only re-reads the token file written by the login flow (FyersAuth); it
+    does not renew the token with FYERS itself, so a new login (or a
+    `refresh` that renews through the FYERS refresh-token API) must
+    publish the next day's token. Once the token has expired with no newer
+    one available, get_client raises ValueError instead of handing out a
+    dead client.
+    """
+
+    def __init__(self, client_id=None, token=None, refresh=None, refresh_margin=600,
+                 retry_interval=60, default_lifetime=86400, client_factory=None, clock=time.time):
+        self.client_id = client_id or os.getenv('FYERS_CLIENT_ID')
+        self.refresh_token_source = refresh or read_token_file
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.default_lifetime = default_lifetime
+        self.client_factory = client_factory or self._build_client
+        self.clock = clock
+
+        self.lock = threading.RLock()
+        self.timer = None
+        self.access_token = None
+        self.client = None
+        self.expires_at = 0.0
+        self.refresh_at = 0.0
+
+        if token:
+            self._install(token)
+
+    def _build_client(self, access_token):
+        from fyers_apiv3 import fyersModel
+        return fyersModel.FyersModel(client_id=self.client_id, token=access_token, log_path="")
+
+    def _install(self, access_token):
+        expires_at = token_expiry(access_token) or self.clock() + self.default_lifetime
+        client = self.client_factory(access_token)
+
+        self.access_token = access_token
+        self.client = client
+        self.expires_at = expires_at
+        self.refresh_at = expires_at - self.refresh_margin
+
+    def set_token(self, access_token):
+        """Install a token obtained elsewhere (e.g. a fresh login)"""
+        with self.lock:
+            if access_token and access_token != self.access_token:
+                self._install(access_token)
+                if self.timer is not None:
+                    self._schedule()
+
+    def refresh(self):
+        """Fetch a token and rebuild the client if it changed"""
+        with self.lock:
+            new_token = self.refresh_token_source()
+            if new_token and new_token != self.access_token:
+                self._install(new_token)
+            elif self.client is None:
+                raise ValueError("No FYERS access token available")
+            elif self.clock() >= self.expires_at:
+                raise ValueError("FYERS access token expired and no newer token is available; log in again")
+            return self.client
+
+    def get_client(self):
+        """Cached client; refreshes inline only if no timer is keeping it fresh"""
+        client = self.client
+        if client is not None:
+            now = self.clock()
+            if now < self.refresh_at or (self.timer is not None and now < self.expires_at):
+                return client
+
+        with self.lock:
+            try:
+                self.refresh()
+            except ValueError:
+                if self.client is None or self.clock() >= self.expires_at:
+                    raise
+            return self.client
+
+    def start(self):
+        """Schedule proactive refreshes ahead of each token expiry"""
+        with self.lock:
+            if self.client is None:
+                self.refresh()
+            self._schedule()
+        return self
+
+    def stop(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+    def _schedule(self):
+        if self.timer is not None:
+            self.timer.cancel()
+
+        delay = self.refresh_at - self.clock()
+        if delay <= 0:
+            # Token is due but no newer one was published yet; try again shortly
+            delay = self.retry_interval
+
+        self.timer = threading.Timer(delay, self._on_timer)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def _on_timer(self):
+        with self.lock:
+            try:
+                self.refresh()
+            except ValueError:
+                pass
+            self._schedule()
+
+
+_shared_session = None
+_shared_lock = threading.Lock()
+
+def get_session(**kwargs):
+    """
+    Process-wide FyersSession, created and started on first use.
+
+    Later calls return the same session: a `token` is installed on it with
+    set_token (e.g. after a fresh login), while a different `client_id` or
+    any other constructor argument raises ValueError rather than being
+    silently ignored. reset_session() discards the shared session.
+    """
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = FyersSession(**kwargs).start()
+            return _shared_session
+        session = _shared_session
+
+    token = kwargs.pop('token', None)
+    client_id = kwargs.pop('client_id', None)
+    if client_id is not None and client_id != session.client_id:
+        raise ValueError(f"Shared FYERS session belongs to client {session.client_id}, not {client_id}")
+    if kwargs:
+        raise ValueError(f"Shared FYERS session already exists; cannot apply {sorted(kwargs)}")
+    if token:
+        session.set_token(token)
+    return session
+
+def reset_session():
+    """Stop and discard the process-wide session"""
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is not None:
+            _shared_session.stop()
+        _shared_session = None
@@ -0,0 +1,199 @@
+"""
+Stage-level timing and memory instrumentation
+
+    profiler = StageProfiler()
+    with profiler.stage('features') as stage:
+        df = calculate_bollinger_bands(df)
+        stage['rows'] = len(df)
+    profiler.save('run_profile.json')
+
+Each stage records wall time, CPU time, the process peak RSS so far and
+how much the stage raised it (POSIX only; None elsewhere), and with
+trace_memory=True also peak traced memory (tracemalloc, which NumPy and
+pandas buffers report to). A disabled profiler hands out one shared no-op
+context, so instrumented code pays only a method call per stage.
+
+Memory tracing is opt-in: tracemalloc hooks every allocation and slows
+allocation-heavy stages several times over (walk-forward refits ~5x).
+PIPELINE_PROFILE=time (the default) records timings only,
+PIPELINE_PROFILE=memory adds memory tracing and PIPELINE_PROFILE=0 turns
+profiling off.
+"""
+
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _process_peak_rss_mb():
+    """Peak RSS of the whole process so far, or None where it is unavailable"""
+    if resource is None:
+        return None
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+class _NullStage:
+    """No-op stage handed out by a disabled profiler"""
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.record = {'name': name, 'rows': None}
+
+    def __enter__(self):
+        profiler = self.profiler
+        self.record['depth'] = len(profiler.stack)
+
+        if profiler.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # The parent keeps the highest peak seen before this stage reset it
+            if profiler.stack:
+                parent = profiler.stack[-1]
+                parent.peak_seen = max(parent.peak_seen, peak)
+            tracemalloc.reset_peak()
+            self.start_traced = current
+            self.peak_seen = current
+
+        profiler.stack.append(self)
+        self.start_peak_rss = _process_peak_rss_mb()
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        return self.record
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        profiler = self.profiler
+        profiler.stack.pop()
+
+        record = self.record
+        record['wall_s'] = wall
+        record['cpu_s'] = cpu
+        # ru_maxrss only ever grows: the growth is what this stage added to the peak
+        peak_rss = _process_peak_rss_mb()
+        record['process_peak_rss_mb'] = peak_rss
+        record['peak_rss_growth_mb'] = None if peak_rss is None else peak_rss - self.start_peak_rss
+        record['failed'] = exc_type is not None
+
+        if profiler.trace_memory:
+            peak = max(self.peak_seen, tracemalloc.get_traced_memory()[1])
+            record['peak_mem_mb'] = (peak - self.start_traced) / (1024 * 1024)
+            if profiler.stack:
+                parent = profiler.stack[-1]
+                parent.peak_seen = max(parent.peak_seen, peak)
+
+        profiler.stages.append(record)
+        return False
+
+
+class StageProfiler:
+    """
+    Records wall time, CPU time, peak memory and row counts per stage.
+
+    Stages may be nested; `depth` in each record gives the nesting level.
+    Records are listed in the order stages finish.
+    """
+
+    def __init__(self, enabled=True, trace_memory=False):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.stages = []
+        self.stack = []
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.start_wall = time.perf_counter()
+        self.owns_tracing = False
+
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.owns_tracing = True
+
+    @classmethod
+    def from_env(cls, variable='PIPELINE_PROFILE'):
+        """Profiler configured by an environment variable (0 / time / memory)"""
+        setting = os.getenv(variable, 'time').lower()
+        if setting in ('0', 'off', 'false', 'no'):
+            return cls(enabled=False)
+        return cls(trace_memory=setting in ('memory', 'full'))
+
+    def stage(self, name):
+        """Context manager timing one stage; set ['rows'] on the yielded dict"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def profile(self, name=None, rows=None):
+        """
+        Decorator form of stage().
+
+        `rows` is an optional callable mapping the function's return value
+        to a row count, e.g. rows=lambda result: len(result[0]).
+        """
+        def decorate(func):
+            stage_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.stage(stage_name) as record:
+                    result = func(*args, **kwargs)
+                    if rows is not None:
+                        record['rows'] = rows(result)
+                return result
+            return wrapper
+        return decorate
+
+    def stop(self):
+        """Stop memory tracing if this profiler started it"""
+        if self.owns_tracing:
+            tracemalloc.stop()
+            self.owns_tracing = False
+
+    def report(self):
+        return {
+            'started_at': self.started_at,
+            'enabled': self.enabled,
+            'trace_memory': self.trace_memory,
+            'total_wall_s': time.perf_counter() - self.start_wall,
+            'process_peak_rss_mb': _process_peak_rss_mb(),
+            'stages': self.stages
+        }
+
+    def save(self, filepath):
+        """Write the run profile as JSON (skipped when disabled)"""
+        if not self.enabled:
+            return
+        with open(filepath, 'w') as f:
+            json.dump(self.report(), f, indent=2, default=str)
+
+    def print_summary(self):
+        if not self.enabled:
+            return
+        print(f"{'Stage':<28}{'Wall (s)':>10}{'CPU (s)':>10}{'Peak MB':>10}{'Rows':>10}")
+        for record in self.stages:
+            name = '  ' * record['depth'] + record['name']
+            peak = record.get('peak_mem_mb')
+            peak = f"{peak:10.1f}" if peak is not None else f"{'-':>10}"
+            rows = record['rows'] if record['rows'] is not None else '-'
+            print(f"{name:<28}{record['wall_s']:10.3f}{record['cpu_s']:10.3f}{peak}{rows:>10}")
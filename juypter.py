@@ -6,6 +6,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import warnings
+from backtest.metrics import MetricsAccumulator
 warnings.filterwarnings('ignore')
 
 # STEP 1: LOAD DATA (FIXED DATE FORMAT)
@@ -139,32 +140,22 @@ df, trades = backtest_strategy(df, initial_capital=100000, position_size_pct=0.9
 
 # STEP 5: PERFORMANCE METRICS
 def calculate_metrics(df, trades, initial_capital=100000):
-    final_value = df['Total'].iloc[-1]
-    total_return = ((final_value - initial_capital) / initial_capital) * 100
+    performance = MetricsAccumulator(initial_capital)
+    performance.update_many(df['Total'].to_numpy(dtype=float))
+    performance.add_trades(trades)
     
-    rolling_max = df['Total'].expanding().max()
-    drawdown = (df['Total'] - rolling_max) / rolling_max
-    max_drawdown = drawdown.min() * 100
+    final_value = performance.last_value
+    total_return = performance.total_return_pct()
+    max_drawdown = performance.max_drawdown_pct()
+    sharpe_ratio = performance.sharpe_ratio()
     
-    returns = df['Total'].pct_change().dropna()
-    if len(returns) > 0 and returns.std() != 0:
-        sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252)
-    else:
-        sharpe_ratio = 0
-    
-    sell_trades = [t for t in trades if t['Type'] == 'SELL']
-    
-    if len(sell_trades) > 0:
-        winning_trades = [t for t in sell_trades if t['Profit'] > 0]
-        losing_trades = [t for t in sell_trades if t['Profit'] <= 0]
-        
-        win_rate = (len(winning_trades) / len(sell_trades)) * 100
-        avg_win = np.mean([t['Profit'] for t in winning_trades]) if winning_trades else 0
-        avg_loss = np.mean([t['Profit'] for t in losing_trades]) if losing_trades else 0
+    if performance.n_sells > 0:
+        win_rate = performance.win_rate_pct()
+        avg_win = performance.avg_win()
+        avg_loss = -performance.avg_loss()
         
-        total_wins = sum([t['Profit'] for t in winning_trades]) if winning_trades else 0
-        total_losses = sum([abs(t['Profit']) for t in losing_trades]) if losing_trades else 1
-        profit_factor = total_wins / total_losses if total_losses > 0 else 0
+        # No losing trades: profit factor is reported as total wins
+        profit_factor = performance.profit_factor() if performance.n_losses else performance.win_sum
     else:
         win_rate = avg_win = avg_loss = profit_factor = 0
     
@@ -175,12 +166,12 @@ def calculate_metrics(df, trades, initial_capital=100000):
         'Total Return (%)': total_return,
         'Max Drawdown (%)': max_drawdown,
         'Sharpe Ratio': sharpe_ratio,
-        'Total Trades': len(trades),
-        'Buy Trades': len([t for t in trades if t['Type'] == 'BUY']),
-        'Sell Trades': len(sell_trades),
+        'Total Trades': performance.n_trades,
+        'Buy Trades': performance.n_buys,
+        'Sell Trades': performance.n_sells,
         'Win Rate (%)': win_rate,
-        'Winning Trades': len([t for t in sell_trades if t.get('Profit', 0) > 0]),
-        'Losing Trades': len([t for t in sell_trades if t.get('Profit', 0) <= 0]),
+        'Winning Trades': performance.n_wins,
+        'Losing Trades': performance.n_losses,
         'Avg Win (₹)': avg_win,
         'Avg Loss (₹)': avg_loss,
         'Profit Factor': profit_factor,
@@ -0,0 +1 @@
+# Live trading module
@@ -0,0 +1,212 @@
+"""
+Event-Driven Live Trading Engine
+Bar in -> incremental indicators and ML probability -> order out
+"""
+
+import math
+import time
+import numpy as np
+
+from backtest.metrics import MetricsAccumulator
+from strategy.streaming import StreamingBollingerBands
+
+
+class PaperOrders:
+    """Order sink that only records orders, for replay and throughput runs"""
+
+    def __init__(self):
+        self.orders = []
+
+    def place_market_order(self, symbol, qty, side):
+        self.orders.append({'symbol': symbol, 'qty': qty, 'side': side})
+        return {'s': 'ok', 'code': 1101, 'id': str(len(self.orders))}
+
+
+class LiveTradingEngine:
+    """
+    Connects a bar feed, the ML-enhanced Bollinger rules and an order sink.
+
+    On every bar the bands, the ML features and the model probability are
+    updated incrementally, the run_pipeline.py rules are applied
+    (BUY: Percent_B < oversold and proba > buy_threshold; SELL: Percent_B >
+    overbought or proba < sell_threshold) and at most one order is sent.
+    Latency is recorded from bar close to decision and to order submission,
+    plus the broker round trip. Cash and position only change when the
+    broker acknowledges the order; rejections and broker errors are kept in
+    `sent_orders` with status 'REJECTED'.
+
+    `feed` is any iterable of bar dicts (ReplayFeed, SocketFeed); `orders`
+    is anything with place_market_order(symbol, qty, side), e.g. FyersOrders.
+    """
+
+    def __init__(self, feed, orders, symbol, model=None, window=20, num_std=2.0,
+                 oversold=0.1, overbought=0.9, buy_threshold=0.55, sell_threshold=0.45,
+                 initial_capital=100000, position_size_pct=0.95, online_updates=False):
+        self.feed = feed
+        self.orders = orders
+        self.symbol = symbol
+        self.model = model
+        self.bands = StreamingBollingerBands(window=window, num_std=num_std)
+        self.oversold = oversold
+        self.overbought = overbought
+        self.buy_threshold = buy_threshold
+        self.sell_threshold = sell_threshold
+        self.position_size_pct = position_size_pct
+        self.online_updates = online_updates and hasattr(model, 'partial_fit')
+
+        self.cash = initial_capital
+        self.position = 0
+        self.entry_price = 0.0
+        self.performance = MetricsAccumulator(initial_capital)
+        self.prev_close = None
+        self.prev_features = None
+        self.features = np.empty((1, 4))
+
+        self.bars_processed = 0
+        self.decision_latency_ns = []
+        self.order_latency_ns = []
+        self.round_trip_ns = []
+        self.sent_orders = []
+
+    def warm_up(self, closes):
+        """Seed indicators from history so trading can start on the first live bar"""
+        online_updates = self.online_updates
+        self.online_updates = False  # history is already in the model's training set
+        for close in closes:
+            self._update_features(float(close))
+        self.online_updates = online_updates
+
+    def _update_features(self, close):
+        bands = self.bands.update(close)
+        ret = close / self.prev_close - 1 if self.prev_close else math.nan
+
+        # Row i-1's target (did the close go up?) is known once bar i closes
+        if self.online_updates and self.prev_features is not None:
+            self.model.partial_fit(self.prev_features, [int(close > self.prev_close)])
+
+        self.prev_close = close
+        sma = bands['SMA']
+        row = self.features[0]
+        row[0] = bands['Percent_B']
+        row[1] = bands['Bandwidth']
+        row[2] = (close - sma) / sma if sma == sma and sma != 0 else math.nan
+        row[3] = ret
+
+        if np.isnan(row).any():
+            self.prev_features = None
+            return None
+
+        self.prev_features = self.features.copy()
+        return bands
+
+    def _probability(self):
+        if self.model is None:
+            return 0.5
+        return float(self.model.predict_proba(self.features)[0])
+
+    @staticmethod
+    def _acked(response):
+        return isinstance(response, dict) and (response.get('s') == 'ok' or response.get('code') in (200, 1101))
+
+    def on_bar(self, bar):
+        """Process one closed bar; returns the side of an acknowledged order (1/-1) or None"""
+        close = float(bar['close'])
+        bands = self._update_features(close)
+        self.bars_processed += 1
+
+        side = None
+        if bands is not None:
+            proba = self._probability()
+            percent_b = bands['Percent_B']
+
+            if self.position == 0 and percent_b < self.oversold and proba > self.buy_threshold:
+                qty = int((self.cash * self.position_size_pct) / close)
+                if qty > 0:
+                    side = 1
+            elif self.position > 0 and (percent_b > self.overbought or proba < self.sell_threshold):
+                qty = self.position
+                side = -1
+
+        decided = time.perf_counter()
+        closed_at = bar.get('closed_at', decided)
+        self.decision_latency_ns.append(int((decided - closed_at) * 1e9))
+
+        if side is not None:
+            submitted = time.perf_counter()
+            self.order_latency_ns.append(int((submitted - closed_at) * 1e9))
+            try:
+                response = self.orders.place_market_order(self.symbol, qty, side)
+            except Exception as e:
+                response = {'s': 'error', 'message': str(e)}
+            self.round_trip_ns.append(int((time.perf_counter() - submitted) * 1e9))
+
+            acked = self._acked(response)
+            if acked:
+                # Assume the market order fills near this close until fills are reconciled
+                if side == 1:
+                    self.cash -= qty * close
+                    self.position = qty
+                    self.entry_price = close
+                    self.performance.add_trade('BUY')
+                else:
+                    self.cash += qty * close
+                    self.position = 0
+                    self.performance.add_trade('SELL', (close - self.entry_price) * qty)
+            else:
+                print(f"Order rejected for {self.symbol}: {response}")
+
+            self.sent_orders.append({
+                'timestamp': bar.get('timestamp'),
+                'side': side,
+                'qty': qty,
+                'price': close,
+                'status': 'ACKED' if acked else 'REJECTED',
+                'response': response
+            })
+            if not acked:
+                side = None
+
+        # Equity is marked after the order so monitoring never delays it
+        self.performance.update(self.cash + self.position * close)
+        return side
+
+    def run(self, max_bars=None):
+        """Consume the feed until it ends (or max_bars) and return the latency report"""
+        started = time.perf_counter()
+        for bar in self.feed:
+            self.on_bar(bar)
+            if max_bars is not None and self.bars_processed >= max_bars:
+                break
+        elapsed = time.perf_counter() - started
+
+        report = self.latency_report()
+        report['elapsed_s'] = elapsed
+        report['bars_per_s'] = self.bars_processed / elapsed if elapsed > 0 else 0.0
+        return report
+
+    @staticmethod
+    def _percentiles(samples_ns):
+        if not samples_ns:
+            return {'count': 0, 'p50_us': None, 'p99_us': None}
+        samples = np.asarray(samples_ns) / 1000
+        return {
+            'count': len(samples),
+            'p50_us': float(np.percentile(samples, 50)),
+            'p99_us': float(np.percentile(samples, 99))
+        }
+
+    def performance_report(self):
+        """Running metrics (BacktestEngine.calculate_metrics keys) for the session so far"""
+        if self.performance.bars == 0:
+            return {}
+        return self.performance.summary()
+
+    def latency_report(self):
+        return {
+            'bars': self.bars_processed,
+            'orders': len(self.sent_orders),
+            'rejected': sum(order['status'] == 'REJECTED' for order in self.sent_orders),
+            'bar_to_decision': self._percentiles(self.decision_latency_ns),
+            'bar_to_order_sent': self._percentiles(self.order_latency_ns),
+            'order_round_trip': self._percentiles(self.round_trip_ns)
+        }
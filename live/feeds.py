@@ -0,0 +1,130 @@
+import queue
+import threading
+import time
+import pandas as pd
+
+BAR_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+class ReplayFeed:
+    """
+    Replays recorded bars from a DataFrame or CSV file.
+
+    With speed=None bars are emitted as fast as the consumer takes them, for
+    offline throughput tests; otherwise the original bar spacing is replayed
+    `speed` times faster than real time. Each bar is stamped with the
+    perf_counter time at which it closed.
+    """
+
+    def __init__(self, data, speed=None, date_column='date'):
+        if isinstance(data, str):
+            data = pd.read_csv(data)
+            data[date_column] = pd.to_datetime(data[date_column], dayfirst=True)
+            data = data.set_index(date_column).sort_index()
+
+        self.timestamps = data.index
+        self.values = data[BAR_FIELDS].to_numpy(dtype=float)
+        self.speed = speed
+
+    def __iter__(self):
+        previous = None
+        for timestamp, row in zip(self.timestamps, self.values):
+            if self.speed and previous is not None:
+                time.sleep(max((timestamp - previous).total_seconds() / self.speed, 0))
+            previous = timestamp
+
+            yield {
+                'timestamp': timestamp,
+                'open': row[0],
+                'high': row[1],
+                'low': row[2],
+                'close': row[3],
+                'volume': row[4],
+                'closed_at': time.perf_counter()
+            }
+
+
+class SocketFeed:
+    """
+    Live bars built from the FYERS market-data websocket.
+
+    Ticks (ltp, cumulative volume) are aggregated into `interval`-second bars;
+    a bar is emitted as soon as the first tick of the next interval arrives.
+    """
+
+    def __init__(self, access_token, symbol, interval=60):
+        self.access_token = access_token
+        self.symbol = symbol
+        self.interval = interval
+        self.bars = queue.Queue()
+        self.current = None
+        self.last_volume = None
+        self.socket = None
+        self.stopped = threading.Event()
+
+    def on_tick(self, message):
+        if not isinstance(message, dict) or message.get('symbol') != self.symbol or 'ltp' not in message:
+            return
+
+        price = float(message['ltp'])
+        tick_time = int(message.get('exch_feed_time') or message.get('last_traded_time') or time.time())
+        bucket = tick_time - tick_time % self.interval
+
+        total_volume = message.get('vol_traded_today')
+        volume = 0.0
+        if total_volume is not None:
+            if self.last_volume is not None:
+                volume = max(float(total_volume) - self.last_volume, 0.0)
+            self.last_volume = float(total_volume)
+
+        if self.current is not None and bucket != self.current['bucket']:
+            bar = self.current
+            bar['closed_at'] = time.perf_counter()
+            self.bars.put(bar)
+            self.current = None
+
+        if self.current is None:
+            self.current = {
+                'bucket': bucket,
+                'timestamp': pd.Timestamp(bucket, unit='s'),
+                'open': price,
+                'high': price,
+                'low': price,
+                'close': price,
+                'volume': volume
+            }
+        else:
+            self.current['high'] = max(self.current['high'], price)
+            self.current['low'] = min(self.current['low'], price)
+            self.current['close'] = price
+            self.current['volume'] += volume
+
+    def start(self):
+        from fyers_apiv3.FyersWebsocket import data_ws
+
+        def on_connect():
+            self.socket.subscribe(symbols=[self.symbol], data_type='SymbolUpdate')
+            self.socket.keep_running()
+
+        self.socket = data_ws.FyersDataSocket(
+            access_token=self.access_token,
+            log_path='',
+            litemode=False,
+            write_to_file=False,
+            reconnect=True,
+            on_connect=on_connect,
+            on_message=self.on_tick
+        )
+        self.socket.connect()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.socket is not None:
+            self.socket.close_connection()
+
+    def __iter__(self):
+        while not self.stopped.is_set():
+            try:
+                yield self.bars.get(timeout=1.0)
+            except queue.Empty:
+                continue
@@ -4,6 +4,7 @@ from datetime import datetime
 from fyers_data import get_fyers_data
 from strategy import calculate_bollinger_bands, generate_ml_signals, backtest_strategy, calculate_performance_metrics
 from ml_model import MLTradingModel
+from instrumentation import StageProfiler
 
 def main():
     print("=" * 60)
@@ -15,9 +16,14 @@ def main():
     train_start = "2025-11-01"
     train_end = "2025-12-31"
     
+    # Per-stage timings and memory, saved next to results_summary.json
+    profiler = StageProfiler.from_env()
+    
     # Step 1: Load training data
     print(f"\n[1/6] Loading training data from {train_start} to {train_end}...")
-    train_df = get_fyers_data(symbol, train_start, train_end)
+    with profiler.stage('load') as stage:
+        train_df = get_fyers_data(symbol, train_start, train_end)
+        stage['rows'] = len(train_df) if train_df is not None else 0
     
     if train_df is None or len(train_df) == 0:
         print("ERROR: Failed to load training data")
@@ -27,7 +33,9 @@ def main():
     
     # Step 2: Calculate Bollinger Bands features
     print("\n[2/6] Calculating Bollinger Bands indicators...")
-    train_df = calculate_bollinger_bands(train_df, window=20, num_std=2)
+    with profiler.stage('features') as stage:
+        train_df = calculate_bollinger_bands(train_df, window=20, num_std=2)
+        stage['rows'] = len(train_df)
     print(f"Features calculated: {['Percent_B', 'Bandwidth', 'SMA', 'STD']}")
     
     # Step 3: Train ML model
@@ -35,8 +43,11 @@ def main():
     ml_model = MLTradingModel()
     
     try:
-        ml_model.train(train_df)
-        ml_model.save_model('trained_model.pkl')
+        with profiler.stage('train') as stage:
+            ml_model.train(train_df)
+            stage['rows'] = len(train_df)
+        with profiler.stage('save_model'):
+            ml_model.save_model('trained_model.pkl')
         print("✓ Model trained and saved as 'trained_model.pkl'")
         print(f"✓ Training frozen on: {train_end}")
     except Exception as e:
@@ -45,11 +56,15 @@ def main():
     
     # Step 4: Backtest on training period
     print("\n[4/6] Running backtest on training period...")
-    train_df = generate_ml_signals(train_df, ml_model, buy_threshold=0.55, sell_threshold=0.45)
-    backtest_df, trades_df, final_capital = backtest_strategy(train_df, initial_capital=100000, position_size=0.95)
-    
-    # Calculate metrics
-    metrics = calculate_performance_metrics(backtest_df, trades_df, final_capital, 100000)
+    with profiler.stage('signals') as stage:
+        train_df = generate_ml_signals(train_df, ml_model, buy_threshold=0.55, sell_threshold=0.45)
+        stage['rows'] = len(train_df)
+    with profiler.stage('backtest') as stage:
+        backtest_df, trades_df, final_capital = backtest_strategy(train_df, initial_capital=100000, position_size=0.95)
+        
+        # Calculate metrics
+        metrics = calculate_performance_metrics(backtest_df, trades_df, final_capital, 100000)
+        stage['rows'] = len(backtest_df)
     
     print("\n" + "=" * 60)
     print("BACKTEST RESULTS (Training Period)")
@@ -57,19 +72,20 @@ def main():
     for key, value in metrics.items():
         print(f"{key}: {value}")
     
-    # Save backtest results
-    with open('results_summary.json', 'w') as f:
-        json.dump(metrics, f, indent=4)
-    print("\n✓ Backtest results saved to 'results_summary.json'")
-    
-    # Save trades log
-    if len(trades_df) > 0:
-        trades_df.to_csv('trades_log.csv', index=False)
-        print("✓ Trades log saved to 'trades_log.csv'")
-    else:
-        # Create empty trades log
-        pd.DataFrame(columns=['Date', 'Action', 'Price', 'Shares', 'Capital']).to_csv('trades_log.csv', index=False)
-        print("✓ Empty trades log saved to 'trades_log.csv'")
+    with profiler.stage('save_results'):
+        # Save backtest results
+        with open('results_summary.json', 'w') as f:
+            json.dump(metrics, f, indent=4)
+        print("\n✓ Backtest results saved to 'results_summary.json'")
+        
+        # Save trades log
+        if len(trades_df) > 0:
+            trades_df.to_csv('trades_log.csv', index=False)
+            print("✓ Trades log saved to 'trades_log.csv'")
+        else:
+            # Create empty trades log
+            pd.DataFrame(columns=['Date', 'Action', 'Price', 'Shares', 'Capital']).to_csv('trades_log.csv', index=False)
+            print("✓ Empty trades log saved to 'trades_log.csv'")
     
     # Step 5: Generate forward predictions (MANDATORY - NO FUTURE DATA)
     print("\n[5/6] Generating 5-day forward prediction (Jan 1-8, 2026)...")
@@ -80,7 +96,9 @@ def main():
         last_state = train_df.iloc[-1:]
         
         # Generate prediction using frozen model
-        predictions = ml_model.predict_proba(last_state)
+        with profiler.stage('predict') as stage:
+            predictions = ml_model.predict_proba(last_state)
+            stage['rows'] = len(predictions)
         
         if len(predictions) == 0:
             raise ValueError("Failed to generate prediction from last state")
@@ -154,6 +172,11 @@ def main():
     else:
         print("WARNING: Some required files missing")
     print("=" * 60)
+    
+    profiler.save('run_profile.json')
+    if profiler.enabled:
+        print("\nStage profile (saved to 'run_profile.json'):")
+        profiler.print_summary()
 
 if __name__ == "__main__":
     main()
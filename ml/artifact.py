@@ -0,0 +1,111 @@
+"""
+Versioned, memory-mappable model artifact format
+
+Layout (little-endian):
+    8 bytes   magic b'BBMODEL1'
+    8 bytes   header length (uint64)
+    N bytes   JSON header: format_version, kind, metadata, array table, data_sha256
+    ...       raw array data, every array aligned to 64 bytes
+
+Arrays are returned as read-only views into one np.memmap, so loading does
+not copy or unpickle anything and every process loading the same file
+shares a single page-cache copy.
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+
+MAGIC = b'BBMODEL1'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_artifact(filepath, kind, arrays, metadata=None):
+    """Write named NumPy arrays plus JSON metadata to one artifact file"""
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    table = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        table[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+    data_size = offset
+
+    data = bytearray(data_size)
+    for name, array in arrays.items():
+        start = table[name]['offset']
+        data[start:start + array.nbytes] = array.tobytes()
+
+    header = {
+        'format_version': FORMAT_VERSION,
+        'kind': kind,
+        'metadata': metadata or {},
+        'arrays': table,
+        'data_size': data_size,
+        'data_sha256': hashlib.sha256(data).hexdigest()
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+    header_bytes += b' ' * (data_start - len(MAGIC) - 8 - len(header_bytes))
+
+    # Write a temporary and rename over the target: processes still mapping
+    # the old file keep its inode and never see a truncated or partial file
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header_bytes)).tobytes())
+        f.write(header_bytes)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+
+def read_artifact(filepath, verify=False):
+    """
+    Map an artifact file.
+
+    Returns:
+    --------
+    header : dict (kind, metadata, array table, hash)
+    arrays : dict of read-only array views into the mapped file
+
+    With verify=True the data hash is checked, which reads every page.
+    """
+    with open(filepath, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{filepath} is not a model artifact")
+        header_length = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        header = json.loads(f.read(header_length).decode('utf-8'))
+
+    if header['format_version'] > FORMAT_VERSION:
+        raise ValueError(f"Artifact format {header['format_version']} is newer than supported "
+                         f"({FORMAT_VERSION})")
+
+    data_start = len(MAGIC) + 8 + header_length
+    if header['data_size'] == 0:
+        return header, {}
+
+    data = np.memmap(filepath, dtype=np.uint8, mode='r', offset=data_start,
+                     shape=(header['data_size'],))
+
+    if verify and hashlib.sha256(data).hexdigest() != header['data_sha256']:
+        raise ValueError(f"{filepath} failed its data hash check")
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape'], dtype=np.int64))
+        if count == 0:
+            arrays[name] = np.empty(spec['shape'], dtype=dtype)
+            continue
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=count,
+                                     offset=spec['offset']).reshape(spec['shape'])
+    return header, arrays
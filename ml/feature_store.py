@@ -0,0 +1,121 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+
+def row_hashes(df):
+    """One 64-bit hash per raw bar (timestamp and values)"""
+    return pd.util.hash_pandas_object(df, index=True).to_numpy()
+
+class FeatureStore:
+    """
+    Persisted ML features keyed by symbol and feature-config hash.
+
+    update() computes features once and, when new bars arrive, only computes
+    the new rows from a short tail of raw bars kept for rolling-window
+    warm-up. The previous last row's Target, which depends on the next
+    close, is filled in at the same time.
+
+    A hash of every stored raw bar is kept with the features. Input whose
+    bars differ from the stored ones (revised or replaced history) rebuilds
+    the entry; input that is a prefix of the stored bars gets the matching
+    slice. The result always equals FeatureEngineer.create_ml_features(df).
+    """
+
+    def __init__(self, root='data/features'):
+        self.root = root
+        self.loaded = {}
+
+    def _path(self, symbol, fe):
+        safe_symbol = re.sub(r'[^A-Za-z0-9_.-]', '_', symbol)
+        return os.path.join(self.root, f"{safe_symbol}__{fe.config_hash()}.pkl")
+
+    def _load(self, symbol, fe):
+        path = self._path(symbol, fe)
+        if path not in self.loaded and os.path.exists(path):
+            self.loaded[path] = pd.read_pickle(path)
+        return self.loaded.get(path)
+
+    def _save(self, symbol, fe, entry):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(symbol, fe)
+        tmp_path = path + '.tmp'
+        pd.to_pickle(entry, tmp_path)
+        os.replace(tmp_path, path)
+        self.loaded[path] = entry
+
+    def get(self, symbol, fe):
+        """Stored (features, feature_cols) without touching raw data, or None"""
+        entry = self._load(symbol, fe)
+        if entry is None:
+            return None
+        return entry['features'], entry['feature_cols']
+
+    def update(self, symbol, df, fe):
+        """
+        Bring the stored features up to date with raw bars in `df`.
+
+        Returns:
+        --------
+        (features DataFrame, feature_cols) as FeatureEngineer.create_ml_features
+        """
+        entry = self._load(symbol, fe)
+        hashes = row_hashes(df)
+
+        if entry is not None:
+            stored = entry.get('row_hashes')
+            n = min(len(hashes), len(stored)) if stored is not None else 0
+            if n == 0 or not np.array_equal(stored[:n], hashes[:n]):
+                print(f"Stored features for {symbol} do not match the input bars; rebuilding")
+                entry = None
+
+        if entry is None:
+            features, feature_cols = fe.create_ml_features(df)
+            entry = {
+                'features': features,
+                'feature_cols': feature_cols,
+                'tail': df.iloc[-fe.warmup_rows:],
+                'row_hashes': hashes
+            }
+            self._save(symbol, fe, entry)
+            return features, feature_cols
+
+        if len(hashes) <= len(entry['row_hashes']):
+            return self._prefix(entry, df)
+
+        tail = entry['tail']
+        new_bars = df.iloc[len(entry['row_hashes']):]
+
+        block = pd.concat([tail, new_bars])
+        block_features, feature_cols = fe.create_ml_features(block)
+        block_features = block_features[block_features.index > tail.index[-1]]
+
+        features = entry['features']
+        last = tail.index[-1]
+        if len(features) > 0 and features.index[-1] == last:
+            # The old last row's next close is now known
+            features.loc[last, 'Target'] = int(new_bars['close'].iloc[0] > features.loc[last, 'close'])
+
+        features = pd.concat([features, block_features])
+        entry = {
+            'features': features,
+            'feature_cols': feature_cols,
+            'tail': block.iloc[-fe.warmup_rows:],
+            'row_hashes': hashes
+        }
+        self._save(symbol, fe, entry)
+        return features, feature_cols
+
+    @staticmethod
+    def _prefix(entry, df):
+        """Stored features for the leading bars in df"""
+        features = entry['features']
+        if len(df) == len(entry['row_hashes']):
+            return features, entry['feature_cols']
+
+        last = df.index[-1]
+        features = features[features.index <= last].copy()
+        if len(features) > 0 and features.index[-1] == last:
+            # df has no next close for its last bar
+            features.loc[last, 'Target'] = 0
+        return features, entry['feature_cols']
@@ -1,33 +1,69 @@
+import hashlib
+import json
 import pandas as pd
 import numpy as np
+from compact import price_column
+
+# Bump when the feature definitions change so stored features are rebuilt
+FEATURE_VERSION = 1
 
 class FeatureEngineer:
     def __init__(self, window=20, num_std=2.0):
         self.window = window
         self.num_std = num_std
     
-    def calculate_bollinger_bands(self, df):
-        df = df.copy()
-        df['SMA'] = df['close'].rolling(window=self.window).mean()
-        df['STD'] = df['close'].rolling(window=self.window).std()
+    def config(self):
+        return {'window': self.window, 'num_std': self.num_std, 'version': FEATURE_VERSION}
+    
+    def config_hash(self):
+        payload = json.dumps(self.config(), sort_keys=True).encode('utf-8')
+        return hashlib.sha1(payload).hexdigest()[:12]
+    
+    @property
+    def warmup_rows(self):
+        """Raw bars needed before a new bar to compute all of its features"""
+        return self.window
+    
+    def calculate_bollinger_bands(self, df, copy=True):
+        if copy:
+            df = df.copy()
+        close = price_column(df, 'close')
+        df['SMA'] = close.rolling(window=self.window).mean()
+        df['STD'] = close.rolling(window=self.window).std()
         df['Upper_Band'] = df['SMA'] + (self.num_std * df['STD'])
         df['Lower_Band'] = df['SMA'] - (self.num_std * df['STD'])
-        df['Percent_B'] = (df['close'] - df['Lower_Band']) / (df['Upper_Band'] - df['Lower_Band'])
+        df['Percent_B'] = (close - df['Lower_Band']) / (df['Upper_Band'] - df['Lower_Band'])
         df['Bandwidth'] = (df['Upper_Band'] - df['Lower_Band']) / df['SMA']
         return df
     
-    def create_ml_features(self, df):
-        df = df.copy()
-        df = self.calculate_bollinger_bands(df)
+    def create_ml_features(self, df, copy=True):
+        """
+        Add ML features and Target. With copy=False the columns are written
+        into df itself and the warm-up rows are trimmed with a slice instead
+        of a filtered copy.
+        """
+        if copy:
+            df = df.copy()
+        df = self.calculate_bollinger_bands(df, copy=False)
         
-        df['Distance_from_SMA'] = (df['close'] - df['SMA']) / df['SMA']
-        df['Return_1d'] = df['close'].pct_change(1)
+        close = price_column(df, 'close')
+        df['Distance_from_SMA'] = (close - df['SMA']) / df['SMA']
+        df['Return_1d'] = close.pct_change(1)
         
-        df['Target'] = (df['close'].shift(-1) > df['close']).astype(int)
+        df['Target'] = (close.shift(-1) > close).astype(
+            np.int8 if df['close'].dtype == np.float32 else int)
         
         feature_cols = ['Percent_B', 'Bandwidth', 'Distance_from_SMA', 'Return_1d']
         
         # FIXED: Only drop NaN in features, not Target
-        df_clean = df.dropna(subset=feature_cols)
+        if copy:
+            df_clean = df.dropna(subset=feature_cols)
+        else:
+            valid = df[feature_cols].notna().all(axis=1).to_numpy()
+            first = int(valid.argmax()) if valid.any() else len(valid)
+            if valid[first:].all():
+                df_clean = df.iloc[first:]
+            else:
+                df_clean = df[valid]
         
         return df_clean, feature_cols
@@ -0,0 +1,126 @@
+import numpy as np
+import joblib
+from ml.artifact import write_artifact, read_artifact
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+class MLModel:
+    """Logistic Regression direction model with its own scaler"""
+    
+    def __init__(self, C=1.0, max_iter=1000):
+        self.scaler = StandardScaler()
+        self.model = LogisticRegression(C=C, max_iter=max_iter)
+        self.constant_proba = None
+    
+    def train(self, X, y):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y).astype(int)
+        
+        # A single-class window cannot fit a classifier; fall back to its base rate
+        if len(np.unique(y)) < 2:
+            self.constant_proba = float(y.mean()) if len(y) else 0.5
+            return self
+        
+        self.constant_proba = None
+        X_scaled = self.scaler.fit_transform(X)
+        self.model.fit(X_scaled, y)
+        return self
+    
+    def predict_proba(self, X):
+        """Probability of an up move for each row"""
+        X = np.asarray(X, dtype=float)
+        if self.constant_proba is not None:
+            return np.full(len(X), self.constant_proba)
+        
+        X_scaled = self.scaler.transform(X)
+        return self.model.predict_proba(X_scaled)[:, 1]
+    
+    def save(self, filepath='ml_model.pkl'):
+        joblib.dump({
+            'scaler': self.scaler,
+            'model': self.model,
+            'constant_proba': self.constant_proba
+        }, filepath)
+    
+    def load(self, filepath='ml_model.pkl'):
+        model_data = joblib.load(filepath)
+        self.scaler = model_data['scaler']
+        self.model = model_data['model']
+        self.constant_proba = model_data['constant_proba']
+        return self
+    
+    def save_artifact(self, filepath='ml_model.bbm'):
+        """Save scaler and coefficients as a memory-mappable artifact"""
+        arrays = {}
+        if self.constant_proba is None:
+            arrays = {
+                'mean': self.scaler.mean_,
+                'scale': self.scaler.scale_,
+                'var': self.scaler.var_,
+                'coef': self.model.coef_,
+                'intercept': self.model.intercept_,
+                'classes': self.model.classes_
+            }
+        write_artifact(filepath, 'logistic_regression', arrays,
+                       metadata={'constant_proba': self.constant_proba})
+    
+    def load_artifact(self, filepath='ml_model.bbm', verify=False):
+        """Rebuild the fitted scaler and model from arrays, independent of the sklearn version that saved them"""
+        header, arrays = read_artifact(filepath, verify=verify)
+        if header['kind'] != 'logistic_regression':
+            raise ValueError(f"Expected a logistic_regression artifact, got {header['kind']}")
+        
+        self.constant_proba = header['metadata']['constant_proba']
+        if self.constant_proba is None:
+            self.scaler = StandardScaler()
+            self.scaler.mean_ = arrays['mean']
+            self.scaler.scale_ = arrays['scale']
+            self.scaler.var_ = arrays['var']
+            self.scaler.n_features_in_ = len(arrays['mean'])
+            
+            self.model = LogisticRegression()
+            self.model.coef_ = arrays['coef']
+            self.model.intercept_ = arrays['intercept']
+            self.model.classes_ = arrays['classes']
+            self.model.n_features_in_ = arrays['coef'].shape[1]
+        return self
+
+
+class OnlineMLModel:
+    """
+    Logistic model updated incrementally with partial_fit.
+
+    A small constant learning rate keeps one-bar updates from swinging the
+    probabilities; sklearn's default 'optimal' schedule starts with steps
+    large enough to push them far beyond what a full refit produces.
+    """
+    
+    classes = np.array([0, 1])
+    
+    def __init__(self, alpha=1e-2, eta0=0.01, random_state=42):
+        self.alpha = alpha
+        self.eta0 = eta0
+        self.random_state = random_state
+        self.scaler = StandardScaler()
+        self.model = self._new_model()
+    
+    def _new_model(self):
+        return SGDClassifier(loss='log_loss', alpha=self.alpha, learning_rate='constant',
+                             eta0=self.eta0, random_state=self.random_state)
+    
+    def partial_fit(self, X, y):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y).astype(int)
+        
+        self.scaler.partial_fit(X)
+        self.model.partial_fit(self.scaler.transform(X), y, classes=self.classes)
+        return self
+    
+    def train(self, X, y):
+        self.scaler = StandardScaler()
+        self.model = self._new_model()
+        return self.partial_fit(X, y)
+    
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=float)
+        return self.model.predict_proba(self.scaler.transform(X))[:, 1]
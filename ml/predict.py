@@ -1,12 +1,15 @@
 import pandas as pd
 import numpy as np
 
-def generate_predictions(df, model, fe, n_days=5):
+def generate_predictions(df, model, fe, n_days=5, store=None, symbol=None):
     """
     Generate directional predictions for next N trading days.
     Does NOT fabricate price paths - outputs direction and confidence only.
     """
-    df_features, feature_cols = fe.create_ml_features(df)
+    if store is not None:
+        df_features, feature_cols = store.update(symbol, df, fe)
+    else:
+        df_features, feature_cols = fe.create_ml_features(df)
     
     # Get latest features for prediction
     latest_features = df_features[feature_cols].iloc[-1:].copy()
@@ -2,9 +2,12 @@ import pandas as pd
 from ml.features import FeatureEngineer
 from ml.model import MLModel
 
-def train_ml_model(df):
+def train_ml_model(df, store=None, symbol=None):
     fe = FeatureEngineer()
-    df_features, feature_cols = fe.create_ml_features(df)
+    if store is not None:
+        df_features, feature_cols = store.update(symbol, df, fe)
+    else:
+        df_features, feature_cols = fe.create_ml_features(df)
     
     df_features = df_features[df_features['Target'].notna()]
     
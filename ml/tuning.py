@@ -0,0 +1,205 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.metrics import accuracy_score, log_loss, roc_auc_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+from sklearn.preprocessing import StandardScaler
+from ml_model import MLTradingModel
+
+
+def expanding_window_splits(n, n_splits=5, min_train=None, gap=5):
+    """
+    (train_end, test_start, test_end) for expanding-window time-series CV.
+
+    Fold k trains on rows [0, train_end) and tests on [test_start, test_end).
+    `gap` rows are dropped between the two so targets that look `gap` bars
+    ahead never overlap the test period.
+    """
+    if min_train is None:
+        min_train = n // (n_splits + 1)
+    test_size = (n - min_train) // n_splits
+    if test_size < 1 or min_train - gap < 1:
+        raise ValueError("Not enough rows for the requested folds")
+
+    splits = []
+    for k in range(n_splits):
+        test_start = min_train + k * test_size
+        test_end = n if k == n_splits - 1 else test_start + test_size
+        splits.append((test_start - gap, test_start, test_end))
+    return splits
+
+
+def _score(scoring, y_true, proba):
+    if scoring == 'roc_auc':
+        if len(np.unique(y_true)) < 2:
+            return np.nan
+        return roc_auc_score(y_true, proba[:, 1])
+    if scoring == 'accuracy':
+        return accuracy_score(y_true, proba.argmax(axis=1))
+    if scoring == 'neg_log_loss':
+        return -log_loss(y_true, proba, labels=[0, 1])
+    raise ValueError(f"Unknown scoring: {scoring}")
+
+
+# Per-process fold data, sent once per worker by the pool initializer
+_folds = None
+
+
+def _set_folds(folds):
+    global _folds
+    _folds = folds
+
+
+def _evaluate(params, fold, scoring):
+    X_train, y_train, X_test, y_test = _folds[fold]
+    model = MLTradingModel(**params).model
+    model.fit(X_train, y_train)
+    return _score(scoring, y_test, model.predict_proba(X_test))
+
+
+class TimeSeriesTuner:
+    """
+    Hyperparameter search for MLTradingModel with expanding-window CV.
+
+    Each fold's StandardScaler is fitted on its training rows only and the
+    scaled train/test matrices are built once, then reused by every
+    candidate; workers receive them once, at pool start-up.
+
+    Candidates are evaluated fold by fold, all surviving candidates in
+    parallel. After `min_folds` folds, a candidate whose mean score trails
+    the leader's by more than `tolerance` is dropped, so clearly worse
+    settings never pay for the later (larger) folds. Scores depend only on
+    the parameters and folds, never on the number of workers.
+    """
+
+    def __init__(self, param_grid=None, param_distributions=None, n_iter=20, n_splits=5,
+                 min_train=None, gap=5, forward_days=5, scoring='roc_auc', min_folds=2,
+                 tolerance=0.02, n_workers=None, seed=42):
+        """
+        Parameters:
+        -----------
+        param_grid : dict
+            Lists of values for an exhaustive grid search
+        param_distributions : dict
+            Lists or scipy distributions for a random search of n_iter candidates
+        gap : int
+            Rows purged between train and test, at least forward_days
+        forward_days : int
+            Target horizon, as in MLTradingModel.create_target
+        scoring : str
+            'roc_auc', 'accuracy' or 'neg_log_loss' (higher is better)
+        min_folds : int
+            Folds every candidate completes before early stopping applies
+        tolerance : float
+            Score margin behind the leader beyond which a candidate is dropped
+            (None disables early stopping)
+        """
+        if (param_grid is None) == (param_distributions is None):
+            raise ValueError("Give exactly one of param_grid or param_distributions")
+        if forward_days < 1 or gap < forward_days:
+            raise ValueError("Need forward_days >= 1 and gap >= forward_days")
+
+        self.param_grid = param_grid
+        self.param_distributions = param_distributions
+        self.n_iter = n_iter
+        self.n_splits = n_splits
+        self.min_train = min_train
+        self.gap = gap
+        self.forward_days = forward_days
+        self.scoring = scoring
+        self.min_folds = min_folds
+        self.tolerance = tolerance
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.seed = seed
+
+        self.results = []
+        self.best_params = None
+        self.best_score = None
+
+    def candidates(self):
+        if self.param_grid is not None:
+            return list(ParameterGrid(self.param_grid))
+        return list(ParameterSampler(self.param_distributions, self.n_iter, random_state=self.seed))
+
+    def prepare_folds(self, X, y):
+        """Scaled (X_train, y_train, X_test, y_test) per fold, computed once"""
+        folds = []
+        for train_end, test_start, test_end in expanding_window_splits(
+                len(X), self.n_splits, self.min_train, self.gap):
+            scaler = StandardScaler()
+            X_train = scaler.fit_transform(X[:train_end])
+            X_test = scaler.transform(X[test_start:test_end])
+            folds.append((X_train, y[:train_end], X_test, y[test_start:test_end]))
+        return folds
+
+    def fit(self, df):
+        """
+        Search over a frame in MLTradingModel.train's format.
+
+        Returns:
+        --------
+        self, with results (one dict per candidate), best_params and best_score
+        """
+        X, y = MLTradingModel().training_data(df, forward_days=self.forward_days)
+        # The last forward_days rows have no future close; create_target labels them 0
+        X, y = X[:-self.forward_days], y[:-self.forward_days]
+        folds = self.prepare_folds(X, y)
+        candidates = self.candidates()
+        scores = [[] for _ in candidates]
+        alive = list(range(len(candidates)))
+
+        pool = None
+        if self.n_workers > 1:
+            pool = ProcessPoolExecutor(max_workers=self.n_workers, initializer=_set_folds,
+                                       initargs=(folds,))
+        else:
+            _set_folds(folds)
+
+        try:
+            for fold in range(len(folds)):
+                if pool is not None:
+                    futures = [pool.submit(_evaluate, candidates[c], fold, self.scoring) for c in alive]
+                    fold_scores = [future.result() for future in futures]
+                else:
+                    fold_scores = [_evaluate(candidates[c], fold, self.scoring) for c in alive]
+                for c, score in zip(alive, fold_scores):
+                    scores[c].append(score)
+
+                if self.tolerance is not None and fold + 1 >= self.min_folds and fold + 1 < len(folds):
+                    means = {c: np.nanmean(scores[c]) for c in alive if not np.all(np.isnan(scores[c]))}
+                    if means:
+                        leader = max(means.values())
+                        alive = [c for c in alive if means.get(c, leader) >= leader - self.tolerance]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            else:
+                _set_folds(None)
+
+        self.results = []
+        for c, params in enumerate(candidates):
+            self.results.append({
+                'params': params,
+                'fold_scores': scores[c],
+                'mean_score': np.nanmean(scores[c]),
+                'std_score': np.nanstd(scores[c]),
+                'folds_evaluated': len(scores[c]),
+                'stopped_early': len(scores[c]) < len(folds)
+            })
+
+        # Only candidates that completed every fold compete for best
+        complete = [r for r in self.results if not r['stopped_early']]
+        best = max(complete, key=lambda r: r['mean_score'])
+        self.best_params = best['params']
+        self.best_score = best['mean_score']
+
+        print(f"Evaluated {len(candidates)} candidates on {len(folds)} folds, "
+              f"{len(candidates) - len(complete)} stopped early")
+        print(f"Best {self.scoring}: {self.best_score:.4f} with {self.best_params}")
+        return self
+
+    def best_model(self, df):
+        """MLTradingModel trained on all of df with the best parameters"""
+        if self.best_params is None:
+            raise ValueError("Call fit() before best_model()")
+        return MLTradingModel(**self.best_params).train(df)
@@ -0,0 +1,167 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from ml.model import MLModel, OnlineMLModel
+
+class WalkForward:
+    """
+    Walk-forward probability generator with configurable retrain policy.
+
+    Row i is always predicted by a model fitted on rows strictly before i,
+    so no future data leaks in whatever the policy.
+
+    Policies:
+    - retrain_every=K : refit a fresh model every K bars (K=1 matches the
+      original per-bar refit)
+    - window=W        : fit on the last W rows only instead of the whole
+      history, bounding the per-refit cost
+    - online=True     : fit once, then update with one partial_fit per bar
+    """
+
+    def __init__(self, model_factory=None, min_train=20, retrain_every=1, window=None,
+                 online=False, default_proba=0.5):
+        if retrain_every < 1:
+            raise ValueError("retrain_every must be at least 1")
+        if window is not None and window < 1:
+            raise ValueError("window must be at least 1")
+
+        if model_factory is None:
+            model_factory = OnlineMLModel if online else MLModel
+
+        self.model_factory = model_factory
+        self.min_train = min_train
+        self.retrain_every = retrain_every
+        self.window = window
+        self.online = online
+        self.default_proba = default_proba
+
+    def _train_start(self, i):
+        if self.window is None:
+            return 0
+        return max(0, i - self.window)
+
+    def run(self, X, y):
+        """Return one out-of-sample probability per row of X"""
+        # Column-major like a pandas frame, so results are bit-identical to
+        # fitting on DataFrame slices and to ParallelWalkForward
+        X = np.asfortranarray(X, dtype=float)
+        y = np.ascontiguousarray(y)
+        n = len(X)
+
+        proba = np.full(n, self.default_proba, dtype=float)
+        if n <= self.min_train:
+            return proba
+
+        if self.online:
+            return self._run_online(X, y, proba)
+
+        for i in range(self.min_train, n, self.retrain_every):
+            start = self._train_start(i)
+            model = self.model_factory()
+            model.train(X[start:i], y[start:i])
+
+            end = min(i + self.retrain_every, n)
+            proba[i:end] = model.predict_proba(X[i:end])
+
+        return proba
+
+    def _run_online(self, X, y, proba):
+        model = self.model_factory()
+        if not hasattr(model, 'partial_fit'):
+            raise ValueError("Online walk-forward needs a model with partial_fit")
+
+        i = self.min_train
+        start = self._train_start(i)
+        model.partial_fit(X[start:i], y[start:i])
+        proba[i] = model.predict_proba(X[i:i+1])[0]
+
+        for i in range(self.min_train + 1, len(X)):
+            # Row i-1's target is known at the close of bar i
+            model.partial_fit(X[i-1:i], y[i-1:i])
+            proba[i] = model.predict_proba(X[i:i+1])[0]
+
+        return proba
+
+
+# Per-worker views onto the shared feature matrix, set by _attach_shared
+_shared = {}
+
+def _attach_shared(x_name, x_shape, y_name, y_shape, y_dtype):
+    x_shm = shared_memory.SharedMemory(name=x_name)
+    y_shm = shared_memory.SharedMemory(name=y_name)
+    _shared['handles'] = (x_shm, y_shm)
+    _shared['X'] = np.ndarray(x_shape, dtype=float, buffer=x_shm.buf, order='F')
+    _shared['y'] = np.ndarray(y_shape, dtype=y_dtype, buffer=y_shm.buf)
+
+def _run_refits(walk_forward, refit_points):
+    """Fit and predict a batch of walk-forward steps inside a worker"""
+    X = _shared['X']
+    y = _shared['y']
+    n = len(X)
+
+    results = []
+    for i in refit_points:
+        start = walk_forward._train_start(i)
+        model = walk_forward.model_factory()
+        model.train(X[start:i], y[start:i])
+
+        end = min(i + walk_forward.retrain_every, n)
+        results.append((i, model.predict_proba(X[i:end])))
+    return results
+
+
+class ParallelWalkForward(WalkForward):
+    """
+    Walk-forward runner that spreads independent refits over a process pool.
+
+    The feature matrix and targets are copied once into shared memory and
+    every worker maps them, so tasks only carry the step indices. Results
+    are written back by row index, so ML_Proba is identical whatever the
+    number of workers. The online policy is sequential by nature and is
+    not supported here.
+    """
+
+    def __init__(self, n_workers=None, tasks_per_worker=4, **kwargs):
+        if kwargs.get('online'):
+            raise ValueError("Online walk-forward cannot be parallelised")
+        super().__init__(**kwargs)
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.tasks_per_worker = tasks_per_worker
+
+    def run(self, X, y):
+        X = np.asfortranarray(X, dtype=float)
+        y = np.ascontiguousarray(y)
+        n = len(X)
+
+        proba = np.full(n, self.default_proba, dtype=float)
+        refit_points = np.arange(self.min_train, n, self.retrain_every)
+        if len(refit_points) == 0:
+            return proba
+
+        x_shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+        y_shm = shared_memory.SharedMemory(create=True, size=max(y.nbytes, 1))
+        try:
+            np.ndarray(X.shape, dtype=float, buffer=x_shm.buf, order='F')[:] = X
+            np.ndarray(y.shape, dtype=y.dtype, buffer=y_shm.buf)[:] = y
+
+            # Interleave steps so each task gets a mix of short and long histories
+            n_tasks = min(len(refit_points), self.n_workers * self.tasks_per_worker)
+            batches = [refit_points[k::n_tasks] for k in range(n_tasks)]
+
+            with ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_attach_shared,
+                initargs=(x_shm.name, X.shape, y_shm.name, y.shape, y.dtype.str)
+            ) as pool:
+                futures = [pool.submit(_run_refits, self, batch) for batch in batches]
+                for future in futures:
+                    for i, block in future.result():
+                        proba[i:i + len(block)] = block
+        finally:
+            x_shm.close()
+            x_shm.unlink()
+            y_shm.close()
+            y_shm.unlink()
+
+        return proba
@@ -3,15 +3,130 @@ import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 import pickle
+from ml.artifact import write_artifact, read_artifact
+from compact import price_column
 import warnings
 warnings.filterwarnings('ignore')
 
+class CompiledForest:
+    """
+    Trained RandomForest + StandardScaler flattened into contiguous arrays.
+    
+    All trees share one node table (feature index, threshold, child links,
+    leaf probabilities); rows are routed through every tree at once with
+    one vectorized step per tree level. Probabilities match sklearn
+    exactly: inputs are compared as float32 like sklearn's trees and the
+    per-tree results are accumulated in the same order.
+    
+    This path is for latency: a single row or a small batch (one live bar)
+    takes tens of microseconds instead of milliseconds, but per row it is
+    several times slower than sklearn on large batches. MLTradingModel
+    hands batches above compiled_max_rows back to sklearn when the fitted
+    forest is available; otherwise rows are routed chunk_rows at a time to
+    bound the (rows x trees) node arrays.
+    """
+    
+    chunk_rows = 1024
+    
+    def __init__(self, mean, scale, feature, threshold, left, right, leaf_proba, roots, depth):
+        self.mean = mean
+        self.scale = scale
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.depth = depth
+    
+    @classmethod
+    def from_model(cls, scaler, forest):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            nodes = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+            
+            # Leaves point at themselves so extra traversal steps are no-ops
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            
+            value = tree.value[:, 0, :]
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+            
+            roots.append(offset)
+            offset += n_nodes
+            depth = max(depth, tree.max_depth)
+        
+        return cls(
+            mean=np.ascontiguousarray(scaler.mean_, dtype=np.float64),
+            scale=np.ascontiguousarray(scaler.scale_, dtype=np.float64),
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+            leaf_proba=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            depth=int(depth)
+        )
+    
+    array_names = ['mean', 'scale', 'feature', 'threshold', 'left', 'right', 'leaf_proba', 'roots']
+    
+    def to_arrays(self):
+        return {name: getattr(self, name) for name in self.array_names}
+    
+    @classmethod
+    def from_arrays(cls, arrays, depth):
+        return cls(depth=depth, **{name: arrays[name] for name in cls.array_names})
+    
+    def predict_proba(self, X):
+        """Class probabilities for a 2-D array of raw (unscaled) features"""
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) > self.chunk_rows:
+            return np.concatenate([self.predict_proba(X[start:start + self.chunk_rows])
+                                   for start in range(0, len(X), self.chunk_rows)])
+        X_scaled = ((X - self.mean) / self.scale).astype(np.float32)
+        
+        n_rows, n_features = X_scaled.shape
+        flat_X = X_scaled.ravel()
+        row_offset = (np.arange(n_rows) * n_features)[:, None]
+        node = np.repeat(self.roots[None, :], n_rows, axis=0)
+        for _ in range(self.depth):
+            values = flat_X.take(row_offset + self.feature.take(node))
+            go_left = values <= self.threshold.take(node)
+            node = np.where(go_left, self.left.take(node), self.right.take(node))
+        
+        # cumsum adds trees one by one, the same order sklearn accumulates them
+        proba = np.cumsum(self.leaf_proba[node], axis=1)[:, -1]
+        return proba / len(self.roots)
+    
+    def predict_up(self, x):
+        """Probability of the up class for a single row of raw features"""
+        return float(self.predict_proba(np.asarray(x, dtype=np.float64).reshape(1, -1))[0, 1])
+
+
 class MLTradingModel:
-    def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42, max_depth=10)
+    # Above this many rows sklearn's forest beats CompiledForest (~700 rows
+    # with the default 100 trees, see benchmarks/bench_inference.py)
+    compiled_max_rows = 512
+    
+    def __init__(self, n_estimators=100, max_depth=10, random_state=42, **forest_params):
+        """Extra keyword arguments go to RandomForestClassifier (see ml/tuning.py)"""
+        self.params = dict(n_estimators=n_estimators, max_depth=max_depth,
+                           random_state=random_state, **forest_params)
+        self.model = RandomForestClassifier(**self.params)
         self.scaler = StandardScaler()
         self.feature_columns = ['Percent_B', 'Bandwidth', 'SMA', 'STD']
         self.is_trained = False
+        self.compiled = None
         
     def prepare_features(self, df):
         """Extract features from dataframe"""
@@ -22,14 +137,15 @@ class MLTradingModel:
     def create_target(self, df, forward_days=5):
         """Create target variable: 1 if 5-day forward return > 0, else 0"""
         df = df.copy()
-        df['future_close'] = df['Close'].shift(-forward_days)
-        df['forward_return'] = (df['future_close'] - df['Close']) / df['Close']
+        close = price_column(df, 'Close')
+        df['future_close'] = close.shift(-forward_days)
+        df['forward_return'] = (df['future_close'] - close) / close
         df['target'] = (df['forward_return'] > 0).astype(int)
         return df
     
-    def train(self, df):
-        """Train the model on historical data"""
-        df_with_target = self.create_target(df, forward_days=5)
+    def training_data(self, df, forward_days=5):
+        """Unscaled feature matrix and targets, in time order"""
+        df_with_target = self.create_target(df, forward_days=forward_days)
         
         # Remove rows with NaN in features or target
         df_clean = df_with_target.dropna(subset=self.feature_columns + ['target'])
@@ -37,8 +153,13 @@ class MLTradingModel:
         if len(df_clean) < 20:
             raise ValueError("Insufficient training data after cleaning")
         
-        X = df_clean[self.feature_columns].values
+        X = df_clean[self.feature_columns].to_numpy(dtype=float)
         y = df_clean['target'].values
+        return X, y
+    
+    def train(self, df):
+        """Train the model on historical data"""
+        X, y = self.training_data(df, forward_days=5)
         
         # Scale features
         X_scaled = self.scaler.fit_transform(X)
@@ -46,48 +167,89 @@ class MLTradingModel:
         # Train model
         self.model.fit(X_scaled, y)
         self.is_trained = True
+        self.compiled = None
         
         print(f"Model trained on {len(X)} samples")
         print(f"Target distribution: {np.bincount(y)}")
         
         return self
     
-    def predict_proba(self, df):
-        """Predict probability of upward movement - returns DataFrame"""
+    def predict_proba(self, df, copy=True, compact=False):
+        """
+        Predict probability of upward movement - returns DataFrame.
+        
+        compact=True returns an int8 predicted_direction (1 = UP, 0 = DOWN);
+        probabilities stay float64 as they are compared against thresholds.
+        """
         if not self.is_trained:
             raise ValueError("Model must be trained before prediction")
         
-        df = df.copy()
-        
         # Guard against NaNs at prediction time
-        df_clean = df.dropna(subset=self.feature_columns)
+        if copy:
+            df_clean = df.copy().dropna(subset=self.feature_columns)
+            X = df_clean[self.feature_columns].to_numpy(dtype=float)
+            index = df_clean.index
+        else:
+            # Only the feature columns are materialised, never the whole frame
+            X = df[self.feature_columns].to_numpy(dtype=float)
+            valid = ~np.isnan(X).any(axis=1)
+            if not valid.all():
+                X = X[valid]
+            index = df.index[valid]
         
-        if len(df_clean) == 0:
+        if len(X) == 0:
             return pd.DataFrame()
         
-        X = df_clean[self.feature_columns].values
-        X_scaled = self.scaler.transform(X)
+        if self.compiled is not None and (len(X) <= self.compiled_max_rows or not self.has_forest()):
+            proba = self.compiled.predict_proba(X)
+        else:
+            X_scaled = self.scaler.transform(X)
+            proba = self.model.predict_proba(X_scaled)
         
-        proba = self.model.predict_proba(X_scaled)
+        if compact:
+            return pd.DataFrame({
+                'prob_down': proba[:, 0],
+                'prob_up': proba[:, 1],
+                'predicted_direction': (proba[:, 1] > 0.5).astype(np.int8)
+            }, index=index)
         
         # Return DataFrame with proper columns expected by strategy
         result = pd.DataFrame({
             'prob_down': proba[:, 0],
             'prob_up': proba[:, 1],
             'predicted_direction': np.where(proba[:, 1] > 0.5, 'UP', 'DOWN')
-        }, index=df_clean.index)
+        }, index=index)
         
         return result
     
+    def has_forest(self):
+        """True when the sklearn forest is fitted (not just a loaded artifact)"""
+        return hasattr(self.model, 'estimators_')
+    
+    def compile(self):
+        """Switch predict_proba to the flattened-array fast path for small batches"""
+        if not self.is_trained:
+            raise ValueError("Model must be trained before compiling")
+        
+        # A loaded artifact is already compiled and has no forest to flatten
+        if not self.has_forest():
+            return self.compiled
+        
+        self.compiled = CompiledForest.from_model(self.scaler, self.model)
+        return self.compiled
+    
     def save_model(self, filepath='trained_model.pkl'):
         """Save trained model and scaler"""
         if not self.is_trained:
             raise ValueError("Model must be trained before saving")
+        if not self.has_forest():
+            raise ValueError("Model loaded from an artifact can only be saved with save_artifact")
         
         model_data = {
             'model': self.model,
             'scaler': self.scaler,
-            'feature_columns': self.feature_columns
+            'feature_columns': self.feature_columns,
+            'params': self.params
         }
         
         with open(filepath, 'wb') as f:
@@ -95,6 +257,43 @@ class MLTradingModel:
         
         print(f"Model saved to {filepath}")
     
+    def save_artifact(self, filepath='trained_model.bbm'):
+        """Save as a versioned, memory-mappable artifact (see ml/artifact.py)"""
+        if not self.is_trained:
+            raise ValueError("Model must be trained before saving")
+        
+        compiled = self.compiled or CompiledForest.from_model(self.scaler, self.model)
+        write_artifact(filepath, 'random_forest', compiled.to_arrays(), metadata={
+            'feature_columns': self.feature_columns,
+            'depth': compiled.depth,
+            'n_trees': len(compiled.roots),
+            # Tuned values may be NumPy scalars, which JSON cannot hold
+            'params': {k: v.item() if isinstance(v, np.generic) else v for k, v in self.params.items()}
+        })
+        
+        print(f"Model artifact saved to {filepath}")
+    
+    def load_artifact(self, filepath='trained_model.bbm', verify=False):
+        """
+        Load an artifact; predictions run on the compiled forest without a
+        fitted sklearn forest. Fresh, unfitted estimators with the stored
+        hyperparameters are kept so the model can be retrained.
+        """
+        header, arrays = read_artifact(filepath, verify=verify)
+        if header['kind'] != 'random_forest':
+            raise ValueError(f"Expected a random_forest artifact, got {header['kind']}")
+        
+        metadata = header['metadata']
+        self.compiled = CompiledForest.from_arrays(arrays, metadata['depth'])
+        self.feature_columns = metadata['feature_columns']
+        self.params = metadata.get('params', self.params)
+        self.model = RandomForestClassifier(**self.params)
+        self.scaler = StandardScaler()
+        self.is_trained = True
+        
+        print(f"Model artifact loaded from {filepath}")
+        return self
+    
     def load_model(self, filepath='trained_model.pkl'):
         """Load trained model and scaler"""
         with open(filepath, 'rb') as f:
@@ -103,7 +302,9 @@ class MLTradingModel:
         self.model = model_data['model']
         self.scaler = model_data['scaler']
         self.feature_columns = model_data['feature_columns']
+        self.params = model_data.get('params', self.params)
         self.is_trained = True
+        self.compiled = None
         
         print(f"Model loaded from {filepath}")
         return self
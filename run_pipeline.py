@@ -1,3 +1,4 @@
+import os
 import sys
 import pandas as pd
 import json
@@ -10,10 +11,12 @@ from backtest.backtest_engine import BacktestEngine
 from ml.train import train_ml_model
 from ml.predict import generate_predictions
 from ml.features import FeatureEngineer
-from ml.model import MLModel
+from ml.feature_store import FeatureStore
+from ml.walk_forward import WalkForward, ParallelWalkForward
 from fyers.auth import FyersAuth
 from fyers.data import FyersData
 from fyers.orders import FyersOrders
+from instrumentation import StageProfiler
 
 def main():
     print("="*80)
@@ -21,10 +24,14 @@ def main():
     print("ML-ENHANCED BOLLINGER BANDS STRATEGY")
     print("="*80)
     
-    df = pd.read_csv('data/sonata_software.csv')
-    df['date'] = pd.to_datetime(df['date'], dayfirst=True)
-    df.set_index('date', inplace=True)
-    df = df.sort_index()
+    profiler = StageProfiler.from_env()
+    
+    with profiler.stage('load') as stage:
+        df = pd.read_csv('data/sonata_software.csv')
+        df['date'] = pd.to_datetime(df['date'], dayfirst=True)
+        df.set_index('date', inplace=True)
+        df = df.sort_index()
+        stage['rows'] = len(df)
     
     print(f"\nData loaded: {len(df)} days")
     print(f"Period: {df.index[0].date()} to {df.index[-1].date()}")
@@ -33,8 +40,15 @@ def main():
     print("STEP 1: TRAINING ML MODEL")
     print("="*80)
     
-    ml_model, feature_engineer = train_ml_model(df)
-    ml_model.save('ml_model.pkl')
+    # Features are computed once per symbol/config and reused by every step
+    symbol = 'NSE:SONATSOFTW-EQ'
+    store = FeatureStore()
+    
+    with profiler.stage('train') as stage:
+        ml_model, feature_engineer = train_ml_model(df, store=store, symbol=symbol)
+        stage['rows'] = len(df)
+    with profiler.stage('save_model'):
+        ml_model.save('ml_model.pkl')
     print("ML model trained and saved")
     
     print("\n" + "="*80)
@@ -42,94 +56,92 @@ def main():
     print("="*80)
     
     fe = FeatureEngineer()
-    df_features, feature_cols = fe.create_ml_features(df)
-    
-    # FIXED: Walk-forward with fresh model instances
-    ml_proba = []
-    for i in range(len(df_features)):
-        if i < 20:
-            ml_proba.append(0.5)
-        else:
-            X_train = df_features[feature_cols].iloc[:i]
-            y_train = df_features['Target'].iloc[:i]
-            
-            # FIXED: Create fresh model instance each step
-            temp_model = MLModel()
-            temp_model.train(X_train, y_train)
-            
-            X_test = df_features[feature_cols].iloc[i:i+1]
-            prob = temp_model.predict_proba(X_test)[0]
-            ml_proba.append(prob)
+    with profiler.stage('features') as stage:
+        df_features, feature_cols = store.update(symbol, df, fe)
+        df_features = df_features.copy()  # signal columns are added below; keep the store clean
+        stage['rows'] = len(df_features)
+    
+    # Walk-forward: every prediction comes from a model fitted on earlier rows only
+    n_workers = int(os.getenv('WALK_FORWARD_WORKERS', '1'))
+    if n_workers > 1:
+        walk_forward = ParallelWalkForward(n_workers=n_workers, min_train=20, retrain_every=1)
+    else:
+        walk_forward = WalkForward(min_train=20, retrain_every=1)
+    with profiler.stage('walk_forward') as stage:
+        ml_proba = walk_forward.run(df_features[feature_cols], df_features['Target'])
+        stage['rows'] = len(ml_proba)
     
     df_features['ML_Proba'] = ml_proba
     
-    df_features['BB_Buy_Signal'] = (df_features['Percent_B'] < 0.1).astype(int)
-    df_features['BB_Sell_Signal'] = (df_features['Percent_B'] > 0.9).astype(int)
-    
-    df_features['Final_Buy_Signal'] = (
-        (df_features['BB_Buy_Signal'] == 1) & 
-        (df_features['ML_Proba'] > 0.55)
-    ).astype(int)
-    
-    df_features['Final_Sell_Signal'] = (
-        (df_features['BB_Sell_Signal'] == 1) | 
-        (df_features['ML_Proba'] < 0.45)
-    ).astype(int)
-    
-    capital = 100000
-    position = 0
-    position_price = 0
-    trades = []
-    
-    # FIXED: Next-day open execution
-    for i in range(len(df_features) - 1):
-        row = df_features.iloc[i]
+    with profiler.stage('backtest') as stage:
+        df_features['BB_Buy_Signal'] = (df_features['Percent_B'] < 0.1).astype(int)
+        df_features['BB_Sell_Signal'] = (df_features['Percent_B'] > 0.9).astype(int)
+        
+        df_features['Final_Buy_Signal'] = (
+            (df_features['BB_Buy_Signal'] == 1) & 
+            (df_features['ML_Proba'] > 0.55)
+        ).astype(int)
+        
+        df_features['Final_Sell_Signal'] = (
+            (df_features['BB_Sell_Signal'] == 1) | 
+            (df_features['ML_Proba'] < 0.45)
+        ).astype(int)
+        
+        capital = 100000
+        position = 0
+        position_price = 0
+        trades = []
         
-        if row['Final_Buy_Signal'] == 1 and position == 0:
-            next_open = df_features['open'].iloc[i+1]
-            shares = int((capital * 0.95) / next_open)
-            if shares > 0:
-                cost = shares * next_open
-                capital -= cost
-                position = shares
-                position_price = next_open
+        # FIXED: Next-day open execution
+        for i in range(len(df_features) - 1):
+            row = df_features.iloc[i]
+            
+            if row['Final_Buy_Signal'] == 1 and position == 0:
+                next_open = df_features['open'].iloc[i+1]
+                shares = int((capital * 0.95) / next_open)
+                if shares > 0:
+                    cost = shares * next_open
+                    capital -= cost
+                    position = shares
+                    position_price = next_open
+                    
+                    trades.append({
+                        'Date': df_features.index[i+1],
+                        'Type': 'BUY',
+                        'Price': next_open,
+                        'Shares': shares,
+                        'ML_Proba': row['ML_Proba'],
+                        'Percent_B': row['Percent_B']
+                    })
+                    print(f"BUY  | {df_features.index[i+1].date()} | {shares} shares @ Rs.{next_open:.2f} | ML_Proba: {row['ML_Proba']:.3f}")
+            
+            elif row['Final_Sell_Signal'] == 1 and position > 0:
+                next_open = df_features['open'].iloc[i+1]
+                revenue = position * next_open
+                profit = (next_open - position_price) * position
+                profit_pct = (profit / (position * position_price)) * 100
+                
+                capital += revenue
                 
                 trades.append({
                     'Date': df_features.index[i+1],
-                    'Type': 'BUY',
+                    'Type': 'SELL',
                     'Price': next_open,
-                    'Shares': shares,
+                    'Shares': position,
+                    'Profit': profit,
+                    'Profit_Pct': profit_pct,
                     'ML_Proba': row['ML_Proba'],
                     'Percent_B': row['Percent_B']
                 })
-                print(f"BUY  | {df_features.index[i+1].date()} | {shares} shares @ Rs.{next_open:.2f} | ML_Proba: {row['ML_Proba']:.3f}")
+                
+                print(f"SELL | {df_features.index[i+1].date()} | {position} shares @ Rs.{next_open:.2f} | P&L: Rs.{profit:.2f} ({profit_pct:+.2f}%)")
+                
+                position = 0
+                position_price = 0
         
-        elif row['Final_Sell_Signal'] == 1 and position > 0:
-            next_open = df_features['open'].iloc[i+1]
-            revenue = position * next_open
-            profit = (next_open - position_price) * position
-            profit_pct = (profit / (position * position_price)) * 100
-            
-            capital += revenue
-            
-            trades.append({
-                'Date': df_features.index[i+1],
-                'Type': 'SELL',
-                'Price': next_open,
-                'Shares': position,
-                'Profit': profit,
-                'Profit_Pct': profit_pct,
-                'ML_Proba': row['ML_Proba'],
-                'Percent_B': row['Percent_B']
-            })
-            
-            print(f"SELL | {df_features.index[i+1].date()} | {position} shares @ Rs.{next_open:.2f} | P&L: Rs.{profit:.2f} ({profit_pct:+.2f}%)")
-            
-            position = 0
-            position_price = 0
-    
-    final_value = capital + (position * df_features['close'].iloc[-1])
-    total_return = ((final_value - 100000) / 100000) * 100
+        final_value = capital + (position * df_features['close'].iloc[-1])
+        total_return = ((final_value - 100000) / 100000) * 100
+        stage['rows'] = len(df_features)
     
     print(f"\nFinal Portfolio Value: Rs.{final_value:,.2f}")
     print(f"Total Return: {total_return:.2f}%")
@@ -142,7 +154,9 @@ def main():
     print("STEP 3: GENERATING JAN 1-8, 2026 PREDICTIONS")
     print("="*80)
     
-    predictions = generate_predictions(df, ml_model, feature_engineer, n_days=5)
+    with profiler.stage('predict') as stage:
+        predictions = generate_predictions(df, ml_model, feature_engineer, n_days=5, store=store, symbol=symbol)
+        stage['rows'] = len(predictions)
     predictions.to_csv('predictions_jan_2026.csv', index=False)
     
     print("\nPredictions for next 5 trading days:")
@@ -160,6 +174,8 @@ def main():
     with open('ml_backtest_metrics.json', 'w') as f:
         json.dump(metrics, f, indent=2)
     
+    profiler.save('run_pipeline_profile.json')
+    
     print("\n" + "="*80)
     print("PIPELINE COMPLETE")
     print("="*80)
@@ -168,6 +184,10 @@ def main():
     print("  - ml_enhanced_trades.csv")
     print("  - predictions_jan_2026.csv")
     print("  - ml_backtest_metrics.json")
+    if profiler.enabled:
+        print("  - run_pipeline_profile.json")
+        print("\nStage profile:")
+        profiler.print_summary()
     
     print("\n" + "="*80)
     print("FYERS API INTEGRATION")
@@ -1,30 +1,87 @@
 import pandas as pd
 import numpy as np
 
-def calculate_bollinger_bands(df, window=20, num_std=2):
-    """Calculate Bollinger Bands indicators"""
-    df = df.copy()
+from backtest.backtest_engine import simulate_single_position
+from backtest.metrics import MetricsAccumulator
+from compact import price_column, widen_prices
+
+def calculate_bollinger_bands(df, window=20, num_std=2, copy=True):
+    """Calculate Bollinger Bands indicators (copy=False adds the columns to df in place)"""
+    if copy:
+        df = df.copy()
     
-    df['SMA'] = df['Close'].rolling(window=window).mean()
-    df['STD'] = df['Close'].rolling(window=window).std()
+    close = price_column(df, 'Close')
+    df['SMA'] = close.rolling(window=window).mean()
+    df['STD'] = close.rolling(window=window).std()
     
     df['Upper_Band'] = df['SMA'] + (df['STD'] * num_std)
     df['Lower_Band'] = df['SMA'] - (df['STD'] * num_std)
     
-    df['Percent_B'] = (df['Close'] - df['Lower_Band']) / (df['Upper_Band'] - df['Lower_Band'])
+    df['Percent_B'] = (close - df['Lower_Band']) / (df['Upper_Band'] - df['Lower_Band'])
     df['Bandwidth'] = (df['Upper_Band'] - df['Lower_Band']) / df['SMA']
     
     return df
 
-def generate_ml_signals(df, ml_model, buy_threshold=0.55, sell_threshold=0.45):
-    """Generate trading signals based on ML model predictions"""
-    df = df.copy()
+class BollingerBandsStrategy:
+    """Percent_B mean-reversion rules on lowercase OHLCV columns, for BacktestEngine"""
+    
+    def __init__(self, window=20, num_std=2.0, oversold=0.1, overbought=0.9):
+        self.window = window
+        self.num_std = num_std
+        self.oversold = oversold
+        self.overbought = overbought
     
+    def calculate_indicators(self, df):
+        close = price_column(df, 'close')
+        df['SMA'] = close.rolling(window=self.window).mean()
+        df['STD'] = close.rolling(window=self.window).std()
+        df['Upper_Band'] = df['SMA'] + (df['STD'] * self.num_std)
+        df['Lower_Band'] = df['SMA'] - (df['STD'] * self.num_std)
+        df['Percent_B'] = (close - df['Lower_Band']) / (df['Upper_Band'] - df['Lower_Band'])
+        df['Bandwidth'] = (df['Upper_Band'] - df['Lower_Band']) / df['SMA']
+        return df
+    
+    def generate_signals(self, df):
+        df['Signal'] = np.int8(0)
+        df.loc[df['Percent_B'] < self.oversold, 'Signal'] = 1
+        df.loc[df['Percent_B'] > self.overbought, 'Signal'] = -1
+        return df
+
+def generate_ml_signals(df, ml_model, buy_threshold=0.55, sell_threshold=0.45, copy=True, compact=False):
+    """
+    Generate trading signals based on ML model predictions (copy=False writes into df).
+    
+    compact=True stores int8 Signal / predicted_direction codes (see
+    compact.SIGNAL_CODES; direction -1 where there is no prediction).
+    Probabilities stay float64 so thresholds give the same signals.
+    """
     # Get ML predictions
-    predictions = ml_model.predict_proba(df)
+    predictions = ml_model.predict_proba(df, copy=copy, compact=compact)
+    
+    if compact:
+        if copy:
+            df = df.copy()
+        for col, fill in [('prob_up', np.nan), ('prob_down', np.nan), ('predicted_direction', -1)]:
+            if len(predictions):
+                df[col] = predictions[col].reindex(df.index, fill_value=fill)
+            else:
+                df[col] = np.full(len(df), fill, dtype=np.int8 if fill == -1 else float)
+        
+        prob_up = df['prob_up'].to_numpy()
+        signal = np.zeros(len(df), dtype=np.int8)
+        with np.errstate(invalid='ignore'):
+            signal[prob_up > buy_threshold] = 1
+            signal[prob_up < sell_threshold] = -1
+        df['Signal'] = signal
+        return df
     
     # Merge predictions with dataframe
-    df = df.join(predictions[['prob_up', 'prob_down', 'predicted_direction']], how='left')
+    if copy:
+        df = df.copy()
+        df = df.join(predictions[['prob_up', 'prob_down', 'predicted_direction']], how='left')
+    else:
+        for col in ['prob_up', 'prob_down', 'predicted_direction']:
+            df[col] = predictions[col] if len(predictions) else np.nan
     
     # Initialize signal column
     df['Signal'] = 'HOLD'
@@ -35,26 +92,38 @@ def generate_ml_signals(df, ml_model, buy_threshold=0.55, sell_threshold=0.45):
     
     return df
 
-def backtest_strategy(df, initial_capital=100000, position_size=0.95):
-    """Backtest the ML-driven trading strategy"""
-    df = df.copy()
+def backtest_strategy(df, initial_capital=100000, position_size=0.95, copy=True):
+    """Backtest the ML-driven trading strategy ('BUY'/'SELL' labels or int8 1/-1 codes)"""
+    if copy:
+        df = df.copy()
     
     capital = initial_capital
     position = 0
     entry_price = 0
     
     trades = []
-    capital_history = []
+    capital_history = np.empty(len(df))
+    
+    # Walk plain column arrays: iterrows would box the whole frame into objects
+    index = df.index
+    signals = df['Signal'].to_numpy()
+    closes = widen_prices(df['Close'].to_numpy())
+    if pd.api.types.is_numeric_dtype(df['Signal']):
+        buy, sell = 1, -1
+    else:
+        buy, sell = 'BUY', 'SELL'
+    probs = df['prob_up'].to_numpy() if 'prob_up' in df.columns else np.full(len(df), np.nan)
     
-    for idx, row in df.iterrows():
-        if pd.isna(row['Signal']):
-            capital_history.append(capital)
+    for i in range(len(df)):
+        if pd.isna(signals[i]):
+            capital_history[i] = capital
             continue
         
-        signal = row['Signal']
-        current_price = row['Close']
+        idx = index[i]
+        signal = signals[i]
+        current_price = closes[i]
         
-        if signal == 'BUY' and position == 0:
+        if signal == buy and position == 0:
             shares_to_buy = int((capital * position_size) / current_price)
             if shares_to_buy > 0:
                 position = shares_to_buy
@@ -67,10 +136,10 @@ def backtest_strategy(df, initial_capital=100000, position_size=0.95):
                     'Price': current_price,
                     'Shares': shares_to_buy,
                     'Capital': capital,
-                    'prob_up': row.get('prob_up', np.nan)
+                    'prob_up': probs[i]
                 })
         
-        elif signal == 'SELL' and position > 0:
+        elif signal == sell and position > 0:
             capital += position * current_price
             
             trades.append({
@@ -80,18 +149,18 @@ def backtest_strategy(df, initial_capital=100000, position_size=0.95):
                 'Shares': position,
                 'Capital': capital,
                 'Return': ((current_price - entry_price) / entry_price) * 100,
-                'prob_up': row.get('prob_up', np.nan)
+                'prob_up': probs[i]
             })
             
             position = 0
             entry_price = 0
         
         portfolio_value = capital + (position * current_price)
-        capital_history.append(portfolio_value)
+        capital_history[i] = portfolio_value
     
     # Close any open position at the end
     if position > 0:
-        final_price = df.iloc[-1]['Close']
+        final_price = closes[-1]
         capital += position * final_price
         
         trades.append({
@@ -101,7 +170,7 @@ def backtest_strategy(df, initial_capital=100000, position_size=0.95):
             'Shares': position,
             'Capital': capital,
             'Return': ((final_price - entry_price) / entry_price) * 100,
-            'prob_up': df.iloc[-1].get('prob_up', np.nan)
+            'prob_up': probs[-1]
         })
     
     df['Portfolio_Value'] = capital_history
@@ -112,14 +181,13 @@ def calculate_performance_metrics(df, trades_df, final_capital, initial_capital)
     """Calculate performance metrics"""
     total_return = ((final_capital - initial_capital) / initial_capital) * 100
     
+    performance = MetricsAccumulator(initial_capital)
     if 'Portfolio_Value' in df.columns:
-        returns = df['Portfolio_Value'].pct_change().dropna()
-        if len(returns) > 0:
-            sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252) if returns.std() != 0 else 0
-            max_drawdown = ((df['Portfolio_Value'].cummax() - df['Portfolio_Value']) / df['Portfolio_Value'].cummax()).max() * 100
-        else:
-            sharpe_ratio = 0
-            max_drawdown = 0
+        performance.update_many(df['Portfolio_Value'].to_numpy(dtype=float))
+    
+    if performance.n_returns > 0:
+        sharpe_ratio = performance.sharpe_ratio()
+        max_drawdown = abs(performance.max_drawdown_pct())
     else:
         sharpe_ratio = 0
         max_drawdown = 0
@@ -127,8 +195,10 @@ def calculate_performance_metrics(df, trades_df, final_capital, initial_capital)
     num_trades = len(trades_df)
     
     if num_trades > 0 and 'Return' in trades_df.columns:
-        winning_trades = trades_df[trades_df['Return'] > 0]
-        win_rate = (len(winning_trades) / len(trades_df[trades_df['Action'] == 'SELL'])) * 100 if len(trades_df[trades_df['Action'] == 'SELL']) > 0 else 0
+        for action, ret in zip(trades_df['Action'], trades_df['Return']):
+            performance.add_trade(action, ret)
+        # Winners over every SELL, as before MetricsAccumulator
+        win_rate = (performance.n_wins / performance.n_sells) * 100 if performance.n_sells else 0
     else:
         win_rate = 0
     
@@ -143,3 +213,97 @@ def calculate_performance_metrics(df, trades_df, final_capital, initial_capital)
     }
     
     return metrics
+
+def cached_prob_up(df, ml_model=None):
+    """prob_up aligned to df: the existing column if present, otherwise one predict_proba call"""
+    if 'prob_up' in df.columns:
+        return df['prob_up']
+    if ml_model is None:
+        raise ValueError("df has no prob_up column and no ml_model was given")
+    predictions = ml_model.predict_proba(df)
+    if len(predictions) == 0:
+        return pd.Series(np.nan, index=df.index)
+    return predictions['prob_up'].reindex(df.index)
+
+def optimize_thresholds(df, ml_model=None, buy_thresholds=None, sell_thresholds=None,
+                        initial_capital=100000, position_size=0.95, prob_up=None):
+    """
+    Backtest every (buy_threshold, sell_threshold) pair on one set of predictions.
+    
+    Inference runs at most once (see cached_prob_up; pass prob_up to reuse it
+    across calls). For each pair the signals of generate_ml_signals are
+    rebuilt from the cached probabilities and backtest_strategy's rules
+    (fill at the signal bar's close, close any open position on the last
+    bar) are resolved by simulate_single_position, which only loops over
+    trades. Metrics are unrounded, under calculate_performance_metrics' keys.
+    
+    Parameters:
+    -----------
+    df : DataFrame
+        Frame with 'Close' and either 'prob_up' or the model's feature columns
+    buy_thresholds, sell_thresholds : array-like
+        Grid values (default 0.50-0.70 and 0.30-0.50 in 0.01 steps); pairs
+        with sell_threshold > buy_threshold are skipped
+    
+    Returns:
+    --------
+    surface : DataFrame with one row per threshold pair
+    """
+    if buy_thresholds is None:
+        buy_thresholds = np.round(np.arange(0.50, 0.705, 0.01), 2)
+    if sell_thresholds is None:
+        sell_thresholds = np.round(np.arange(0.30, 0.505, 0.01), 2)
+    if prob_up is None:
+        prob_up = cached_prob_up(df, ml_model)
+    
+    probs = np.asarray(prob_up, dtype=float)
+    closes = widen_prices(df['Close'].to_numpy())
+    
+    with np.errstate(invalid='ignore'):
+        buy_masks = {b: probs > b for b in buy_thresholds}
+        sell_masks = {s: probs < s for s in sell_thresholds}
+    
+    rows = []
+    signals = np.empty(len(df), dtype=np.int8)
+    for buy_threshold in buy_thresholds:
+        for sell_threshold in sell_thresholds:
+            if sell_threshold > buy_threshold:
+                continue
+            
+            signals[:] = 0
+            signals[buy_masks[buy_threshold]] = 1
+            signals[sell_masks[sell_threshold]] = -1
+            
+            result = simulate_single_position(signals, closes, closes, initial_capital,
+                                              position_size, lag=0)
+            performance = MetricsAccumulator(initial_capital)
+            performance.update_many(result['total'])
+            
+            final_capital = result['total'][-1] if len(closes) else initial_capital
+            entry_price = None
+            n_trades = 0
+            for event in result['trades']:
+                n_trades += 1
+                if event['type'] == 'BUY':
+                    entry_price = event['price']
+                else:
+                    performance.add_trade('SELL', event['profit_pct'])
+            
+            # Open position closed at the last close
+            if result['trades'] and result['trades'][-1]['type'] == 'BUY':
+                n_trades += 1
+                performance.add_trade('SELL', ((closes[-1] - entry_price) / entry_price) * 100)
+            
+            rows.append({
+                'buy_threshold': buy_threshold,
+                'sell_threshold': sell_threshold,
+                'Total Return (%)': ((final_capital - initial_capital) / initial_capital) * 100,
+                'Sharpe Ratio': performance.sharpe_ratio() if performance.n_returns > 0 else 0,
+                'Max Drawdown (%)': abs(performance.max_drawdown_pct()) if performance.n_returns > 0 else 0,
+                'Number of Trades': n_trades,
+                'Win Rate (%)': (performance.n_wins / performance.n_sells) * 100 if performance.n_sells else 0,
+                'Final Capital': final_capital,
+                'Initial Capital': initial_capital
+            })
+    
+    return pd.DataFrame(rows)
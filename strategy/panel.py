@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+BAND_FIELDS = ['close', 'SMA', 'STD', 'Upper_Band', 'Lower_Band', 'Percent_B', 'Bandwidth']
+
+def cumulative_sums(values, block=1024):
+    """
+    Prefix sums used to derive rolling moments for any window in O(n).
+
+    Rows are split into blocks of `block` bars and the prefix sums restart
+    at every block, each block centred on its own mean. Sums therefore stay
+    on the scale of one block's local deviations however long or strongly
+    trending the series is. NaNs contribute nothing and are tracked by a
+    running valid count.
+    """
+    values = np.asarray(values, dtype=float)
+    squeeze = values.ndim == 1
+    if squeeze:
+        values = values[:, None]
+
+    n, n_cols = values.shape
+    n_blocks = -(-n // block)
+    padded = np.full((n_blocks * block, n_cols), np.nan)
+    padded[:n] = values
+    padded = padded.reshape(n_blocks, block, n_cols)
+
+    valid = ~np.isnan(padded)
+    count = valid.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shift = np.where(valid, padded, 0.0).sum(axis=1) / count
+    shift = np.where(count > 0, shift, 0.0)
+
+    centred = np.where(valid, padded - shift[:, None, :], 0.0)
+
+    def local(prefix):
+        return prefix.reshape(n_blocks * block, n_cols)[:n]
+
+    return {
+        'values': values,
+        'block': block,
+        'shift': shift,
+        'sum': local(np.cumsum(centred, axis=1)),
+        'sum_sq': local(np.cumsum(centred * centred, axis=1)),
+        'count': local(np.cumsum(valid, axis=1, dtype=np.int64)),
+        'squeeze': squeeze
+    }
+
+def rolling_mean_std(sums, window):
+    """
+    Rolling mean and sample standard deviation from cumulative_sums().
+
+    Matches pandas rolling(window).mean()/.std(): a value is produced only
+    when all `window` observations are present, otherwise NaN. A window
+    spans at most two blocks; the part in the previous block is moved onto
+    the current block's centre before the two are combined.
+    """
+    n, n_cols = sums['sum'].shape
+    mean = np.full((n, n_cols), np.nan)
+    std = np.full((n, n_cols), np.nan)
+    squeeze = sums['squeeze']
+
+    if window > sums['block']:
+        sums = cumulative_sums(sums['values'], block=window)
+    block = sums['block']
+
+    if window <= n:
+        end = np.arange(window - 1, n)
+        start = end - window + 1
+        current = end // block
+        block_start = current * block
+        cross = (start < block_start)[:, None]
+        head = np.maximum(start, block_start)
+        previous = np.maximum(current - 1, 0)
+        previous_end = np.maximum(block_start - 1, 0)
+
+        def before(prefix, rows):
+            # Prefix up to (not including) each row, within its own block
+            return np.where((rows % block == 0)[:, None], 0, prefix[np.maximum(rows - 1, 0)])
+
+        def part(prefix):
+            current_part = prefix[end] - before(prefix, head)
+            previous_part = np.where(cross, prefix[previous_end] - before(prefix, start), 0)
+            return current_part, previous_part
+
+        s1, s1_prev = part(sums['sum'])
+        s2, s2_prev = part(sums['sum_sq'])
+        count, count_prev = part(sums['count'])
+
+        # Re-centre the previous block's part on this block's shift
+        offset = np.where(cross, sums['shift'][previous] - sums['shift'][current], 0.0)
+        s2 = s2 + s2_prev + 2 * offset * s1_prev + count_prev * offset * offset
+        s1 = s1 + s1_prev + count_prev * offset
+        full = (count + count_prev) == window
+
+        window_mean = s1 / window
+        variance = (s2 - s1 * window_mean) / (window - 1)
+        variance = np.maximum(variance, 0.0)
+
+        mean[window - 1:] = np.where(full, window_mean + sums['shift'][current], np.nan)
+        std[window - 1:] = np.where(full, np.sqrt(variance), np.nan)
+
+    if squeeze:
+        return mean[:, 0], std[:, 0]
+    return mean, std
+
+
+class BollingerPanel:
+    """
+    Bollinger Band indicators for many symbols, stored as one block.
+
+    `values` has shape (fields, dates, symbols). panel['SMA'] is a
+    dates x symbols view and panel.symbol('X') a dates x fields frame over
+    the same memory; neither copies data. to_long() builds a tidy frame.
+    """
+
+    def __init__(self, values, dates, symbols):
+        self.values = values
+        self.dates = dates
+        self.symbols = pd.Index(symbols)
+
+    def __getitem__(self, field):
+        return self.values[BAND_FIELDS.index(field)]
+
+    def frame(self, field):
+        """Dates x symbols DataFrame for one field, without copying"""
+        return pd.DataFrame(self[field], index=self.dates, columns=self.symbols, copy=False)
+
+    def symbol(self, symbol):
+        """Dates x fields DataFrame for one symbol, without copying"""
+        column = self.symbols.get_loc(symbol)
+        return pd.DataFrame(self.values[:, :, column].T, index=self.dates, columns=BAND_FIELDS,
+                            copy=False)
+
+    def to_long(self, dropna=True):
+        """Tidy frame with one row per (date, symbol)"""
+        n_dates, n_symbols = self.values.shape[1:]
+        data = {
+            'date': np.repeat(np.asarray(self.dates), n_symbols),
+            'symbol': np.tile(np.asarray(self.symbols), n_dates)
+        }
+        for k, field in enumerate(BAND_FIELDS):
+            data[field] = self.values[k].reshape(-1)
+
+        long_df = pd.DataFrame(data)
+        if dropna:
+            long_df = long_df[long_df['close'].notna()].reset_index(drop=True)
+        return long_df
+
+
+def calculate_bollinger_panel(closes, window=20, num_std=2.0, dates=None, symbols=None):
+    """
+    Compute Bollinger Bands for every column of a dates x symbols close matrix.
+
+    Parameters:
+    -----------
+    closes : DataFrame or 2-D array
+        Close prices, one column per symbol. NaN marks bars where a symbol
+        has no data (not listed yet, delisted, suspended).
+    window : int
+        Rolling window length
+    num_std : float
+        Band width in standard deviations
+    dates, symbols : sequence, optional
+        Labels when `closes` is a plain array
+
+    Returns:
+    --------
+    BollingerPanel
+    """
+    if isinstance(closes, pd.DataFrame):
+        dates = closes.index if dates is None else dates
+        symbols = closes.columns if symbols is None else symbols
+        closes = closes.to_numpy(dtype=float)
+
+    closes = np.asarray(closes, dtype=float)
+    if closes.ndim != 2:
+        raise ValueError("closes must be a 2-D dates x symbols matrix")
+
+    n_dates, n_symbols = closes.shape
+    if dates is None:
+        dates = pd.RangeIndex(n_dates)
+    if symbols is None:
+        symbols = pd.RangeIndex(n_symbols)
+
+    values = np.empty((len(BAND_FIELDS), n_dates, n_symbols))
+    close, sma, std, upper, lower, percent_b, bandwidth = values
+
+    close[:] = closes
+    sma[:], std[:] = rolling_mean_std(cumulative_sums(closes), window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.multiply(std, num_std, out=upper)
+        np.subtract(sma, upper, out=lower)
+        np.add(sma, upper, out=upper)
+        np.subtract(upper, lower, out=bandwidth)
+        np.subtract(close, lower, out=percent_b)
+        np.divide(percent_b, bandwidth, out=percent_b)
+        np.divide(bandwidth, sma, out=bandwidth)
+
+    return BollingerPanel(values, dates, symbols)
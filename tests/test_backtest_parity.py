@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.backtest_engine import BacktestEngine
+from benchmarks.synthetic import generate_ohlcv
+from strategy.bollinger import BollingerBandsStrategy
+
+PORTFOLIO_COLUMNS = ['Position', 'Cash', 'Holdings', 'Total']
+
+
+def run_both(df, **kwargs):
+    results = {}
+    for mode in ('loop', 'vectorized'):
+        engine = BacktestEngine(BollingerBandsStrategy(window=10), mode=mode, **kwargs)
+        results[mode] = engine.run(df)
+    return results['loop'], results['vectorized']
+
+
+def assert_same(loop, vectorized):
+    loop_df, loop_trades = loop
+    vec_df, vec_trades = vectorized
+    for col in PORTFOLIO_COLUMNS:
+        np.testing.assert_array_equal(loop_df[col].to_numpy(dtype=float),
+                                      vec_df[col].to_numpy(dtype=float), err_msg=col)
+    assert len(loop_trades) == len(vec_trades)
+    for a, b in zip(loop_trades, vec_trades):
+        assert a.keys() == b.keys()
+        for key in a:
+            if isinstance(a[key], float) and np.isnan(a[key]):
+                assert np.isnan(b[key])
+            else:
+                assert a[key] == b[key], key
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_modes_match_on_synthetic_data(seed):
+    df = generate_ohlcv(600, seed=seed, volatility=0.01, freq='D')
+    loop, vectorized = run_both(df)
+    assert len(loop[1]) > 0
+    assert_same(loop, vectorized)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_modes_match_when_buys_are_unaffordable(seed):
+    # Budget of ~100 against prices around 100: some BUYs fill, others cannot afford one share
+    df = generate_ohlcv(600, seed=seed, volatility=0.01, freq='D')
+    loop, vectorized = run_both(df, initial_capital=105)
+    assert 0 < len(loop[1])
+    assert_same(loop, vectorized)
+
+
+def test_modes_match_when_no_buy_is_affordable():
+    df = generate_ohlcv(300, seed=1, volatility=0.01, freq='D')
+    loop, vectorized = run_both(df, initial_capital=50)
+    assert loop[1] == []
+    assert_same(loop, vectorized)
+
+
+@pytest.mark.parametrize('n_rows', [0, 1, 2])
+def test_modes_match_on_tiny_frames(n_rows):
+    df = generate_ohlcv(n_rows, seed=3, freq='D') if n_rows else \
+        pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'], dtype=float)
+    loop, vectorized = run_both(df)
+    assert len(loop[0]) == n_rows
+    assert_same(loop, vectorized)
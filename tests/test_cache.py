@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from fyers.cache import HistoricalDataCache
+from fyers.data import FyersData
+from fyers.fakes import FakeHistoryAPI
+
+
+def ist(text):
+    return int(pd.Timestamp(text, tz='Asia/Kolkata').timestamp())
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(tmp_path, clock):
+    api = FakeHistoryAPI(clock=clock)
+    cache = HistoricalDataCache(FyersData(fyers_instance=api), str(tmp_path), clock=clock)
+    return api, cache
+
+
+def test_second_request_is_served_from_disk(tmp_path):
+    clock = Clock(ist('2026-10-16 18:00'))
+    api, cache = make_cache(tmp_path, clock)
+    start, end = ist('2026-01-01'), ist('2026-06-30')
+
+    first = cache.get('NSE:SBIN-EQ', 'D', start, end)
+    assert len(api.calls) == 1
+    second = cache.get('NSE:SBIN-EQ', 'D', start, end)
+    assert len(api.calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_only_missing_ranges_are_fetched(tmp_path):
+    clock = Clock(ist('2026-10-16 18:00'))
+    api, cache = make_cache(tmp_path, clock)
+    cache.get('NSE:SBIN-EQ', 'D', ist('2026-03-01'), ist('2026-03-31'))
+    api.calls.clear()
+
+    df = cache.get('NSE:SBIN-EQ', 'D', ist('2026-02-01'), ist('2026-04-30'))
+    assert [(c[2], c[3]) for c in api.calls] == [
+        (ist('2026-02-01'), ist('2026-03-01') - 1),
+        (ist('2026-03-31') + 1, ist('2026-04-30'))
+    ]
+    expected = FakeHistoryAPI.timestamps('D', ist('2026-02-01'), ist('2026-04-30'))
+    np.testing.assert_array_equal(df.index.as_unit('s').asi8, expected)
+
+
+def test_forming_daily_candle_is_refetched(tmp_path):
+    # FYERS stamps the daily bar at IST midnight, i.e. 18:30 UTC the day before
+    clock = Clock(ist('2026-10-16 10:00'))
+    api, cache = make_cache(tmp_path, clock)
+    today = ist('2026-10-16')
+    api.set_candle('NSE:SBIN-EQ', 'D', today, close=101.0)
+
+    df = cache.get('NSE:SBIN-EQ', 'D', ist('2026-10-01'), ist('2026-10-16 23:59'))
+    assert df['close'].iloc[-1] == 101.0
+
+    clock.now = ist('2026-10-16 15:30')
+    api.set_candle('NSE:SBIN-EQ', 'D', today, close=105.0)
+    api.calls.clear()
+    df = cache.get('NSE:SBIN-EQ', 'D', ist('2026-10-01'), ist('2026-10-16 23:59'))
+    assert df['close'].iloc[-1] == 105.0
+    # Only the current session is requested again
+    assert api.calls[0][2] == today
+
+
+def test_failed_fetch_is_not_marked_covered(tmp_path):
+    clock = Clock(ist('2026-10-16 18:00'))
+    api, cache = make_cache(tmp_path, clock)
+    history = api.history
+    api.history = lambda data: {'s': 'error', 'code': 500}
+
+    assert cache.get('NSE:SBIN-EQ', 'D', ist('2026-01-01'), ist('2026-01-31')) is None
+    api.history = history
+    df = cache.get('NSE:SBIN-EQ', 'D', ist('2026-01-01'), ist('2026-01-31'))
+    assert len(df) == 22
@@ -0,0 +1,65 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.bench_memory import make_frame
+from compact import to_compact, widen_prices
+from ml_model import MLTradingModel
+from strategy.bollinger import (BollingerBandsStrategy, backtest_strategy, calculate_bollinger_bands,
+                                generate_ml_signals)
+
+
+@pytest.fixture(scope='module')
+def frames():
+    df = make_frame(200_000, volatility=0.001, decimals=2)
+    compact = to_compact(df)
+    assert compact['Close'].dtype == np.float32
+    return df, compact
+
+
+@pytest.fixture(scope='module')
+def model(frames):
+    df, _ = frames
+    model = MLTradingModel()
+    model.model = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=42)
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.train(calculate_bollinger_bands(df.iloc[:20_000]))
+    return model
+
+
+def test_compact_ml_pipeline_makes_the_same_decisions(frames, model):
+    df, compact = frames
+    full = generate_ml_signals(calculate_bollinger_bands(df), model)
+    small = generate_ml_signals(calculate_bollinger_bands(compact, copy=False), model,
+                                copy=False, compact=True)
+
+    expected = full['Signal'].map({'HOLD': 0, 'BUY': 1, 'SELL': -1}).to_numpy()
+    np.testing.assert_array_equal(small['Signal'].to_numpy(), expected)
+
+    _, full_trades, full_capital = backtest_strategy(full)
+    _, small_trades, small_capital = backtest_strategy(small)
+    assert len(small_trades) == len(full_trades)
+    assert small_capital == full_capital
+
+
+def test_compact_band_signals_match(frames):
+    df, compact = frames
+    strategy = BollingerBandsStrategy()
+    lower = df.rename(columns=str.lower)
+    full = strategy.generate_signals(strategy.calculate_indicators(lower.copy()))
+    small = strategy.generate_signals(strategy.calculate_indicators(compact.rename(columns=str.lower)))
+    np.testing.assert_array_equal(small['Signal'].to_numpy(), full['Signal'].to_numpy())
+
+
+def test_tick_prices_widen_back_exactly(frames):
+    df, compact = frames
+    for col in ['Open', 'High', 'Low', 'Close']:
+        np.testing.assert_array_equal(widen_prices(compact[col].to_numpy()), df[col].to_numpy())
+
+
+def test_prices_off_the_tick_grid_stay_float64():
+    df = make_frame(10_000, volatility=0.001)
+    assert to_compact(df)['Close'].dtype == np.float64
@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+
+from fyers.downloader import HistoricalDownloader, TokenBucket
+from fyers.fakes import FakeHistoryAPI
+
+
+def ist(text):
+    return int(pd.Timestamp(text, tz='Asia/Kolkata').timestamp())
+
+
+FROM_TS, TO_TS = ist('2023-01-01'), ist('2025-12-31')
+
+
+def make_downloader(api, **kwargs):
+    kwargs.setdefault('requests_per_second', 1000)
+    return HistoricalDownloader(api, sleep=lambda seconds: None, **kwargs)
+
+
+def test_chunks_are_stitched_without_duplicates():
+    api = FakeHistoryAPI(clock=lambda: TO_TS)
+    downloader = make_downloader(api)
+    frames = downloader.download(['NSE:SBIN-EQ', 'NSE:INFY-EQ'], FROM_TS, TO_TS, 'D')
+
+    expected = FakeHistoryAPI.timestamps('D', FROM_TS, TO_TS)
+    for df in frames.values():
+        assert (df.index.as_unit('s').asi8 == expected).all()
+    assert downloader.stats['requests'] == 2 * len(downloader.split_range('D', FROM_TS, TO_TS))
+
+
+def test_transport_errors_and_rate_limits_are_retried():
+    api = FakeHistoryAPI(clock=lambda: TO_TS)
+    api.queue(ConnectionError('reset'), {'s': 'error', 'code': 429}, {'s': 'error', 'code': 503})
+    downloader = make_downloader(api, max_workers=1, max_retries=3)
+
+    candles = downloader.fetch_candles('NSE:SBIN-EQ', 'D', ist('2025-01-01'), ist('2025-01-31'))
+    assert len(candles) == 23
+    assert downloader.stats['retries'] == 3
+    assert downloader.stats['failures'] == 0
+
+
+def test_client_errors_are_not_retried(capsys):
+    api = FakeHistoryAPI(clock=lambda: TO_TS)
+    api.queue({'s': 'error', 'code': -300, 'message': 'invalid symbol'})
+    downloader = make_downloader(api, max_workers=1, max_retries=3)
+
+    assert downloader.fetch_candles('NSE:BAD-EQ', 'D', ist('2025-01-01'), ist('2025-01-31')) is None
+    assert len(api.calls) == 1
+    assert downloader.stats['failures'] == 1
+    assert 'invalid symbol' in capsys.readouterr().out
+
+
+def test_retries_give_up_after_max_retries():
+    api = FakeHistoryAPI(clock=lambda: TO_TS)
+    api.queue(*[{'s': 'error', 'code': 500}] * 3)
+    downloader = make_downloader(api, max_workers=1, max_retries=2)
+
+    assert downloader.fetch_candles('NSE:SBIN-EQ', 'D', ist('2025-01-01'), ist('2025-01-31')) is None
+    assert len(api.calls) == 3
+
+
+def test_unexpected_exceptions_propagate():
+    api = FakeHistoryAPI(clock=lambda: TO_TS)
+    api.queue(KeyError('access_token'))
+    downloader = make_downloader(api, max_workers=1)
+
+    with pytest.raises(KeyError):
+        downloader.fetch_candles('NSE:SBIN-EQ', 'D', ist('2025-01-01'), ist('2025-01-31'))
+
+
+def test_token_bucket_spaces_requests():
+    now = [0.0]
+    waits = []
+    bucket = TokenBucket(rate=10, capacity=2, clock=lambda: now[0], sleep=waits.append)
+    for _ in range(4):
+        bucket.acquire()
+    assert waits == pytest.approx([0.1, 0.2])
+
+
+def test_client_rate_limit_stays_under_server_limit():
+    api = FakeHistoryAPI(clock=lambda: TO_TS, max_rps=4)
+    downloader = HistoricalDownloader(api, max_workers=4, requests_per_second=3, burst=1)
+    frames = downloader.download(['NSE:SBIN-EQ', 'NSE:INFY-EQ'], FROM_TS, TO_TS, 'D')
+
+    assert all(df is not None for df in frames.values())
+    assert downloader.stats['retries'] == 0
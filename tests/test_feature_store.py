@@ -0,0 +1,53 @@
+import pandas as pd
+
+from benchmarks.synthetic import generate_ohlcv
+from ml.feature_store import FeatureStore
+from ml.features import FeatureEngineer
+
+SYMBOL = 'NSE:TEST-EQ'
+
+
+def bars(n, seed=0):
+    return generate_ohlcv(n, seed=seed, volatility=0.01, freq='D')
+
+
+def assert_matches_fresh(store, df):
+    fe = FeatureEngineer()
+    features, cols = store.update(SYMBOL, df, fe)
+    expected, expected_cols = fe.create_ml_features(df)
+    assert cols == expected_cols
+    pd.testing.assert_frame_equal(features, expected, check_dtype=False)
+
+
+def test_appended_bars_are_computed_incrementally(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    df = bars(300)
+    assert_matches_fresh(store, df.iloc[:200])
+    assert_matches_fresh(store, df.iloc[:260])
+    assert_matches_fresh(store, df)
+
+
+def test_replaced_history_is_rebuilt(tmp_path, capsys):
+    # Same dates, different prices: the stored features must not be reused
+    store = FeatureStore(str(tmp_path))
+    assert_matches_fresh(store, bars(300, seed=0))
+    assert_matches_fresh(FeatureStore(str(tmp_path)), bars(300, seed=1))
+    assert 'rebuilding' in capsys.readouterr().out
+
+
+def test_revised_bar_is_rebuilt(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    df = bars(300)
+    assert_matches_fresh(store, df)
+    revised = df.copy()
+    revised.iloc[150, revised.columns.get_loc('close')] *= 1.05
+    assert_matches_fresh(store, revised)
+
+
+def test_shorter_input_gets_a_prefix(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    df = bars(300)
+    assert_matches_fresh(store, df)
+    assert_matches_fresh(store, df.iloc[:250])
+    # The prefix request does not shrink the store
+    assert_matches_fresh(store, df)
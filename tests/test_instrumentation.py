@@ -0,0 +1,70 @@
+import tracemalloc
+
+import pytest
+
+from instrumentation import StageProfiler
+
+
+@pytest.mark.parametrize('setting, enabled, trace_memory', [
+    (None, True, False),
+    ('time', True, False),
+    ('memory', True, True),
+    ('0', False, False),
+])
+def test_memory_tracing_is_opt_in(monkeypatch, setting, enabled, trace_memory):
+    if setting is None:
+        monkeypatch.delenv('PIPELINE_PROFILE', raising=False)
+    else:
+        monkeypatch.setenv('PIPELINE_PROFILE', setting)
+    profiler = StageProfiler.from_env()
+    try:
+        assert profiler.enabled == enabled
+        assert profiler.trace_memory == trace_memory
+        assert tracemalloc.is_tracing() == trace_memory
+    finally:
+        profiler.stop()
+
+
+def test_stage_records_timings_and_rows():
+    profiler = StageProfiler()
+    with profiler.stage('outer') as outer:
+        with profiler.stage('inner') as inner:
+            inner['rows'] = 10
+        outer['rows'] = 20
+    inner_record, outer_record = profiler.stages
+    assert (inner_record['name'], inner_record['depth'], inner_record['rows']) == ('inner', 1, 10)
+    assert (outer_record['name'], outer_record['depth'], outer_record['rows']) == ('outer', 0, 20)
+    assert 'peak_mem_mb' not in outer_record
+    assert outer_record['wall_s'] >= inner_record['wall_s']
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = StageProfiler(enabled=False)
+    with profiler.stage('work') as stage:
+        stage['rows'] = 1
+    assert profiler.stages == []
+
+
+def test_stage_reports_peak_rss_growth(monkeypatch):
+    import instrumentation
+    # Process peak RSS as sampled at each stage boundary
+    samples = iter([100.0, 100.0, 100.0, 350.0, 350.0, 350.0])
+    monkeypatch.setattr(instrumentation, '_process_peak_rss_mb', lambda: next(samples))
+    profiler = StageProfiler()
+    for name in ('small', 'large', 'after'):
+        with profiler.stage(name):
+            pass
+    growth = {r['name']: (r['peak_rss_growth_mb'], r['process_peak_rss_mb']) for r in profiler.stages}
+    # A later stage no longer inherits the earlier peak as its own
+    assert growth == {'small': (0.0, 100.0), 'large': (250.0, 350.0), 'after': (0.0, 350.0)}
+
+
+def test_rss_is_optional_without_resource(monkeypatch):
+    import instrumentation
+    monkeypatch.setattr(instrumentation, 'resource', None)
+    profiler = StageProfiler()
+    with profiler.stage('work'):
+        pass
+    record = profiler.stages[0]
+    assert record['process_peak_rss_mb'] is None and record['peak_rss_growth_mb'] is None
+    assert profiler.report()['process_peak_rss_mb'] is None
@@ -0,0 +1,88 @@
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import generate_ohlcv
+from live.engine import LiveTradingEngine, PaperOrders
+from live.feeds import ReplayFeed
+
+
+class SlowOrders(PaperOrders):
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+
+    def place_market_order(self, symbol, qty, side):
+        time.sleep(self.latency)
+        return super().place_market_order(symbol, qty, side)
+
+
+class Bullish:
+    def predict_proba(self, X):
+        return np.array([0.9])
+
+
+def test_order_latency_includes_the_broker_call():
+    df = generate_ohlcv(300, seed=2, volatility=0.01, freq='D')
+    orders = SlowOrders(latency=0.02)
+    engine = LiveTradingEngine(ReplayFeed(df), orders, 'NSE:SBIN-EQ', model=Bullish())
+    report = engine.run()
+
+    assert report['orders'] == len(orders.orders) > 0
+    assert report['order_round_trip']['count'] == report['orders']
+    assert report['order_round_trip']['p50_us'] >= 20000
+    # Submission is timed before the broker call, so it excludes the round trip
+    assert report['bar_to_order_sent']['p50_us'] < report['order_round_trip']['p50_us']
+
+
+class RejectingOrders(PaperOrders):
+    """Rejects the first `n_rejects` orders, then behaves like PaperOrders"""
+
+    def __init__(self, n_rejects, raises=False):
+        super().__init__()
+        self.n_rejects = n_rejects
+        self.raises = raises
+        self.calls = []
+
+    def place_market_order(self, symbol, qty, side):
+        self.calls.append(side)
+        if len(self.calls) <= self.n_rejects:
+            if self.raises:
+                raise ConnectionError('broker unreachable')
+            return {'s': 'error', 'code': -50, 'message': 'Insufficient funds'}
+        return super().place_market_order(symbol, qty, side)
+
+
+def run_engine(orders):
+    df = generate_ohlcv(300, seed=2, volatility=0.01, freq='D')
+    engine = LiveTradingEngine(ReplayFeed(df), orders, 'NSE:SBIN-EQ', model=Bullish())
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = engine.run()
+    return engine, report
+
+
+def test_rejected_orders_leave_the_account_unchanged():
+    orders = RejectingOrders(n_rejects=10**6)
+    engine, report = run_engine(orders)
+
+    assert len(orders.calls) > 0
+    assert set(orders.calls) == {1}  # never a SELL for shares that were not bought
+    assert engine.position == 0 and engine.cash == 100000
+    assert report['rejected'] == report['orders'] == len(orders.calls)
+    assert all(order['status'] == 'REJECTED' for order in engine.sent_orders)
+
+
+def test_broker_errors_are_recorded_and_trading_continues():
+    orders = RejectingOrders(n_rejects=1, raises=True)
+    engine, report = run_engine(orders)
+
+    assert engine.sent_orders[0]['status'] == 'REJECTED'
+    assert 'broker unreachable' in engine.sent_orders[0]['response']['message']
+    assert engine.bars_processed == 300
+    acked = [order for order in engine.sent_orders if order['status'] == 'ACKED']
+    assert len(acked) == len(orders.orders) > 0
+    assert acked[0]['side'] == 1
+    sides = [order['side'] for order in acked]
+    assert all(a != b for a, b in zip(sides, sides[1:]))
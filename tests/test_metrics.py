@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.metrics import MetricsAccumulator
+from strategy.bollinger import calculate_performance_metrics
+
+
+@pytest.fixture(scope='module')
+def equity():
+    rng = np.random.default_rng(3)
+    return 100000 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, 5000)))
+
+
+def test_update_many_matches_pandas(equity):
+    metrics = MetricsAccumulator(100000)
+    metrics.update_many(equity)
+
+    returns = pd.Series(equity).pct_change().dropna()
+    assert metrics.n_returns == len(returns)
+    assert metrics.mean == returns.mean()
+    assert metrics.return_std == returns.std()
+
+    running_max = np.maximum.accumulate(equity)
+    assert metrics.min_drawdown == ((equity - running_max) / running_max).min()
+
+
+@pytest.mark.parametrize('chunksize', [1, 7, 1000])
+def test_chunked_merge_matches_single_pass(equity, chunksize):
+    single = MetricsAccumulator(100000)
+    single.update_many(equity)
+
+    chunked = MetricsAccumulator(100000)
+    for start in range(0, len(equity), chunksize):
+        chunked.update_many(equity[start:start + chunksize])
+
+    assert chunked.n_returns == single.n_returns
+    assert chunked.bars == single.bars
+    assert chunked.mean == pytest.approx(single.mean, rel=1e-12)
+    assert chunked.return_std == pytest.approx(single.return_std, rel=1e-12)
+    assert chunked.min_drawdown == single.min_drawdown
+    assert chunked.last_value == single.last_value
+
+
+def test_update_matches_update_many(equity):
+    batch = MetricsAccumulator(100000)
+    batch.update_many(equity)
+
+    stepped = MetricsAccumulator(100000)
+    for value in equity:
+        stepped.update(value)
+
+    expected = batch.summary()
+    for key, value in stepped.summary().items():
+        assert value == pytest.approx(expected[key], rel=1e-12), key
+
+
+def test_win_rate_counts_winners_over_every_sell():
+    df = pd.DataFrame({'Portfolio_Value': [100.0, 101.0, 99.0, 102.0]})
+    trades_df = pd.DataFrame({
+        'Action': ['BUY', 'SELL', 'BUY', 'SELL', 'BUY', 'SELL'],
+        'Return': [np.nan, 2.0, np.nan, -1.0, np.nan, np.nan]
+    })
+    metrics = calculate_performance_metrics(df, trades_df, 102.0, 100.0)
+
+    # Baseline formula: winning trades / SELL trades
+    winners = len(trades_df[trades_df['Return'] > 0])
+    sells = len(trades_df[trades_df['Action'] == 'SELL'])
+    assert metrics['Win Rate (%)'] == round(winners / sells * 100, 2) == 33.33
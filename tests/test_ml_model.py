@@ -0,0 +1,94 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_ohlcv, title_case
+from ml_model import MLTradingModel
+from strategy.bollinger import calculate_bollinger_bands
+
+
+@pytest.fixture(scope='module')
+def frame():
+    return calculate_bollinger_bands(title_case(generate_ohlcv(800, volatility=0.01, freq='D')))
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def test_artifact_round_trip_predicts_the_same(tmp_path, frame):
+    model = quiet(MLTradingModel(n_estimators=20, max_depth=np.int64(6)).train, frame)
+    path = str(tmp_path / 'model.bbm')
+    quiet(model.save_artifact, path)
+
+    loaded = quiet(MLTradingModel().load_artifact, path)
+    assert loaded.params == {'n_estimators': 20, 'max_depth': 6, 'random_state': 42}
+    np.testing.assert_allclose(loaded.predict_proba(frame)['prob_up'],
+                               model.predict_proba(frame)['prob_up'], atol=1e-12)
+
+
+def test_loaded_artifact_can_be_compiled_and_retrained(tmp_path, frame):
+    model = quiet(MLTradingModel(n_estimators=20).train, frame)
+    path = str(tmp_path / 'model.bbm')
+    quiet(model.save_artifact, path)
+
+    loaded = quiet(MLTradingModel().load_artifact, path)
+    assert loaded.compile() is loaded.compiled
+    with pytest.raises(ValueError):
+        loaded.save_model(str(tmp_path / 'model.pkl'))
+
+    quiet(loaded.train, frame)
+    assert loaded.compiled is None
+    assert len(loaded.model.estimators_) == 20
+    quiet(loaded.save_model, str(tmp_path / 'model.pkl'))
+    np.testing.assert_allclose(loaded.predict_proba(frame)['prob_up'],
+                               model.predict_proba(frame)['prob_up'])
+
+
+def test_rewriting_an_artifact_leaves_existing_maps_intact(tmp_path, frame):
+    path = str(tmp_path / 'model.bbm')
+    first = quiet(MLTradingModel(n_estimators=10, random_state=1).train, frame)
+    quiet(first.save_artifact, path)
+    mapped = quiet(MLTradingModel().load_artifact, path)
+    expected = mapped.predict_proba(frame)['prob_up'].to_numpy()
+
+    second = quiet(MLTradingModel(n_estimators=30, random_state=2).train, frame)
+    quiet(second.save_artifact, path)
+
+    # The old mapping still reads the old file; a new load sees the new one
+    np.testing.assert_array_equal(mapped.predict_proba(frame)['prob_up'], expected)
+    reloaded = quiet(MLTradingModel().load_artifact, path)
+    assert reloaded.params['n_estimators'] == 30
+    assert not (tmp_path / 'model.bbm.tmp').exists()
+
+
+def test_compiled_forest_matches_sklearn(tmp_path, frame):
+    model = quiet(MLTradingModel(n_estimators=25).train, frame)
+    X = frame[model.feature_columns].dropna().to_numpy()
+    expected = model.model.predict_proba(model.scaler.transform(X))
+
+    compiled = model.compile()
+    compiled.chunk_rows = 100
+    np.testing.assert_array_equal(compiled.predict_proba(X), expected)
+    np.testing.assert_array_equal(compiled.predict_proba(X[:1]), expected[:1])
+
+    path = str(tmp_path / 'model.bbm')
+    quiet(model.save_artifact, path)
+    loaded = quiet(MLTradingModel().load_artifact, path)
+    loaded.compiled.chunk_rows = 100
+    np.testing.assert_array_equal(loaded.compiled.predict_proba(X), expected)
+
+
+def test_large_batches_fall_back_to_sklearn(frame, monkeypatch):
+    model = quiet(MLTradingModel(n_estimators=10).train, frame)
+    compiled = model.compile()
+    calls = []
+    monkeypatch.setattr(compiled, 'predict_proba', lambda X: calls.append(len(X)) or
+                        type(compiled).predict_proba(compiled, X))
+
+    model.predict_proba(frame.iloc[-model.compiled_max_rows:])
+    model.predict_proba(frame)
+    assert calls == [model.compiled_max_rows]
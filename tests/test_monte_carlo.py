@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from backtest.monte_carlo import MonteCarloAnalysis
+
+
+@pytest.fixture(scope='module')
+def returns():
+    return np.random.default_rng(5).normal(0.004, 0.03, 120)
+
+
+@pytest.mark.parametrize('method', ['bootstrap', 'shuffle'])
+def test_results_do_not_depend_on_worker_count(returns, method):
+    runs = [MonteCarloAnalysis(n_resamples=2500, method=method, batch_size=500,
+                               n_workers=n_workers).simulate(returns)
+            for n_workers in (1, 2, 3)]
+    for other in runs[1:]:
+        for expected, actual in zip(runs[0], other):
+            np.testing.assert_array_equal(actual, expected)
+
+    # A different seed really draws different paths (drawdowns depend on order)
+    reseeded = MonteCarloAnalysis(n_resamples=2500, method=method, batch_size=500,
+                                  n_workers=1, seed=7).simulate(returns)
+    assert not np.array_equal(reseeded[1], runs[0][1])
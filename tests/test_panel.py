@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from strategy.panel import calculate_bollinger_panel, cumulative_sums, rolling_mean_std
+
+
+def two_pass(values, window):
+    windows = sliding_window_view(values, window)
+    return windows.mean(axis=-1), windows.std(axis=-1, ddof=1)
+
+
+@pytest.mark.parametrize('name', ['random_walk', 'trending'])
+def test_long_series_match_two_pass_moments(name):
+    rng = np.random.default_rng(0)
+    if name == 'random_walk':
+        closes = 100 + np.cumsum(rng.normal(0, 1, 500_000))
+    else:
+        closes = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.01, 200_000)))
+
+    mean, std = rolling_mean_std(cumulative_sums(closes), 20)
+    expected_mean, expected_std = two_pass(closes, 20)
+    assert np.isnan(mean[:19]).all() and np.isnan(std[:19]).all()
+    np.testing.assert_allclose(mean[19:], expected_mean, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(std[19:], expected_std, rtol=1e-8)
+
+
+@pytest.mark.parametrize('window', [20, 1024, 1500])
+def test_panel_matches_pandas_rolling_with_gaps(window):
+    rng = np.random.default_rng(1)
+    closes = pd.DataFrame(1000 + rng.normal(0, 1, (3000, 6)).cumsum(axis=0))
+    closes.iloc[:700, 0] = np.nan
+    closes.iloc[1020:1030, 1] = np.nan
+    closes.iloc[2500:, 2] = np.nan
+
+    panel = calculate_bollinger_panel(closes, window)
+    rolling = closes.rolling(window)
+    np.testing.assert_allclose(panel['SMA'], rolling.mean().to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(panel['STD'], rolling.std().to_numpy(), rtol=1e-8)
@@ -0,0 +1,41 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from backtest.backtest_engine import BacktestEngine
+from backtest.portfolio import PortfolioBacktest
+from benchmarks.synthetic import generate_ohlcv
+from strategy.bollinger import BollingerBandsStrategy
+
+
+def test_single_symbol_matches_engine():
+    df = generate_ohlcv(2000, seed=11, start_price=800.0, volatility=0.012)
+    strategy = BollingerBandsStrategy()
+
+    engine = BacktestEngine(strategy, initial_capital=1000000, position_size_pct=0.95)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result, expected_trades = engine.run(df.copy())
+    expected = engine.calculate_metrics(result, expected_trades)
+
+    portfolio = PortfolioBacktest(strategy, initial_capital=1000000, max_positions=1,
+                                  max_position_pct=0.95)
+    equity, trades = portfolio.run(df[['open']].rename(columns={'open': 'X'}),
+                                   df[['close']].rename(columns={'close': 'X'}))
+    metrics = portfolio.calculate_metrics(equity, trades)
+
+    assert len(expected_trades) > 0
+    assert len(trades) == len(expected_trades)
+    for a, b in zip(expected_trades, trades):
+        for key in ['Signal_Date', 'Execution_Date', 'Type', 'Price', 'Shares']:
+            assert a[key] == b[key], key
+        for key in ['Value', 'Profit', 'Profit_Pct']:
+            if key in a:
+                assert b[key] == pytest.approx(a[key], rel=1e-12), key
+        # The panel's block-anchored sums differ from pandas rolling at rounding level
+        assert b['Percent_B'] == pytest.approx(a['Percent_B'], abs=1e-9)
+
+    np.testing.assert_allclose(equity['Total'], result['Total'], rtol=1e-12)
+    for key, value in expected.items():
+        assert metrics[key] == pytest.approx(value, rel=1e-9), key
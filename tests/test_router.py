@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from fyers.fakes import AsyncFakeBroker, FakeBroker
+from fyers.router import AsyncOrderRouter
+
+ORDERS = [(f"NSE:SYM{k}-EQ", 10 + k, 1 if k % 2 else -1) for k in range(20)]
+
+
+@pytest.mark.parametrize('broker_class', [FakeBroker, AsyncFakeBroker])
+def test_orders_are_sent_concurrently(broker_class):
+    broker = broker_class(latency=0.05)
+    with AsyncOrderRouter(broker, requests_per_second=1000) as router:
+        started = time.perf_counter()
+        records = router.route(ORDERS)
+        elapsed = time.perf_counter() - started
+
+    assert [r['symbol'] for r in records] == [symbol for symbol, _, _ in ORDERS]
+    assert all(r['status'] == 'ACKED' for r in records)
+    assert broker.max_in_flight > 1
+    assert elapsed < 0.05 * len(ORDERS) / 2
+    assert router.latency_summary()['count'] == len(ORDERS)
+
+
+def test_order_tag_is_the_client_id():
+    broker = FakeBroker()
+    with AsyncOrderRouter(broker, requests_per_second=1000) as router:
+        records = router.route(ORDERS)
+    sent_tags = {order['orderTag'] for order in broker.orders}
+    assert sent_tags == {r['client_id'] for r in records}
+
+
+def test_rejections_are_recorded():
+    broker = FakeBroker(reject_symbols={'NSE:SYM3-EQ'})
+    with AsyncOrderRouter(broker, requests_per_second=1000) as router:
+        records = router.route(ORDERS)
+    rejected = [r['symbol'] for r in records if r['status'] == 'REJECTED']
+    assert rejected == ['NSE:SYM3-EQ']
+
+
+def test_basket_mode_groups_orders():
+    broker = FakeBroker(reject_symbols={'NSE:SYM12-EQ'})
+    with AsyncOrderRouter(broker, requests_per_second=1000, use_basket=True, basket_size=10) as router:
+        records = router.route(ORDERS)
+    assert broker.basket_calls == 2
+    assert [r['symbol'] for r in records if r['status'] == 'REJECTED'] == ['NSE:SYM12-EQ']
+
+
+def test_client_ids_are_unique_across_routers():
+    # Routers created in the same second used to produce identical orderTags
+    ids = set()
+    for _ in range(5):
+        with AsyncOrderRouter(FakeBroker()) as router:
+            ids.update(router.next_client_id() for _ in range(100))
+    assert len(ids) == 500
+
+
+def test_close_shuts_down_the_thread_pool():
+    router = AsyncOrderRouter(FakeBroker())
+    router.close()
+    with pytest.raises(RuntimeError):
+        router.executor.submit(lambda: None)
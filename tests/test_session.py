@@ -0,0 +1,143 @@
+import base64
+import json
+import threading
+import time
+
+import pytest
+
+from fyers import session as fyers_session
+from fyers.session import FyersSession, get_session, reset_session
+
+
+def make_token(exp, name='t'):
+    payload = base64.urlsafe_b64encode(json.dumps({'exp': exp, 'sub': name}).encode()).decode().rstrip('=')
+    return f"header.{payload}.sig"
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Factory:
+    """Client factory that counts builds; each client is just (token, build number)"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.built = []
+        self.lock = threading.Lock()
+
+    def __call__(self, token):
+        time.sleep(self.delay)
+        with self.lock:
+            self.built.append(token)
+            return (token, len(self.built))
+
+
+class Tokens:
+    """Refresh source handing out whatever token is currently published"""
+
+    def __init__(self, token=None):
+        self.token = token
+
+    def __call__(self):
+        return self.token
+
+
+@pytest.fixture(autouse=True)
+def no_shared_session():
+    reset_session()
+    yield
+    reset_session()
+
+
+def test_shared_session_is_reused_and_takes_new_tokens():
+    clock = Clock()
+    factory = Factory()
+    first = make_token(clock.now + 3600, 'a')
+    shared = get_session(client_id='APP-100', token=first, client_factory=factory, clock=clock,
+                         refresh=Tokens(first))
+    assert get_session() is shared
+
+    second = make_token(clock.now + 7200, 'b')
+    assert get_session(client_id='APP-100', token=second) is shared
+    assert shared.get_client() == (second, 2)
+
+
+def test_shared_session_rejects_conflicting_arguments():
+    clock = Clock()
+    token = make_token(clock.now + 3600)
+    get_session(client_id='APP-100', token=token, client_factory=Factory(), clock=clock,
+                refresh=Tokens(token))
+    with pytest.raises(ValueError):
+        get_session(client_id='APP-200')
+    with pytest.raises(ValueError):
+        get_session(refresh_margin=5)
+
+
+def test_timer_swaps_in_the_published_token_before_expiry():
+    clock = Clock()
+    tokens = Tokens(make_token(clock.now + 600.05, 'old'))
+    factory = Factory()
+    # Refresh is due 0.05 s of real time after start
+    session = FyersSession(client_id='APP-100', refresh=tokens, refresh_margin=600,
+                           client_factory=factory, clock=clock).start()
+    try:
+        new = make_token(clock.now + 86400, 'new')
+        tokens.token = new
+        deadline = time.monotonic() + 5
+        while session.access_token != new and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert session.access_token == new
+        assert session.get_client() == (new, 2)
+    finally:
+        session.stop()
+
+
+def test_concurrent_callers_build_one_client_per_token():
+    clock = Clock()
+    tokens = Tokens(make_token(clock.now + 3600, 'old'))
+    factory = Factory(delay=0.02)
+    session = FyersSession(client_id='APP-100', refresh=tokens, refresh_margin=600,
+                           client_factory=factory, clock=clock)
+    session.refresh()
+
+    # Past refresh_at with no timer running: every caller wants to refresh inline
+    clock.now += 3100
+    new = make_token(clock.now + 86400, 'new')
+    tokens.token = new
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(session.get_client())) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert factory.built.count(new) == 1
+    assert set(results) == {(new, 2)}
+
+
+def test_expired_token_without_a_newer_one_raises():
+    clock = Clock()
+    token = make_token(clock.now + 3600)
+    session = FyersSession(client_id='APP-100', refresh=Tokens(token), client_factory=Factory(),
+                           clock=clock)
+    session.refresh()
+    clock.now += 3000  # due for refresh, still valid: keep serving
+    assert session.get_client() == (token, 1)
+
+    clock.now += 1000
+    with pytest.raises(ValueError):
+        session.get_client()
+
+
+def test_default_refresh_reads_the_token_file(tmp_path, monkeypatch):
+    clock = Clock()
+    token = make_token(clock.now + 3600)
+    (tmp_path / fyers_session.TOKEN_FILE).write_text(token + '\n')
+    monkeypatch.chdir(tmp_path)
+    session = FyersSession(client_id='APP-100', client_factory=Factory(), clock=clock)
+    assert session.refresh() == (token, 1)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.backtest_engine import BacktestEngine
+from backtest.streaming import StreamingBacktest
+from benchmarks.synthetic import generate_ohlcv
+from strategy.bollinger import BollingerBandsStrategy
+
+# pandas' rolling std depends on where the series starts, so chunked
+# indicators agree with the in-memory ones to rounding, not bit for bit
+PERCENT_B_TOLERANCE = 1e-9
+
+
+def assert_trades_match(expected, actual):
+    assert len(expected) == len(actual)
+    for a, b in zip(expected, actual):
+        assert a.keys() == b.keys()
+        for key in a:
+            if key == 'Percent_B':
+                assert b[key] == pytest.approx(a[key], abs=PERCENT_B_TOLERANCE, nan_ok=True)
+            else:
+                assert a[key] == b[key], key
+
+
+@pytest.fixture(scope='module')
+def in_memory():
+    df = generate_ohlcv(6000, seed=4, start_price=2500.0, volatility=0.002)
+    strategy = BollingerBandsStrategy()
+    engine = BacktestEngine(strategy)
+    result, trades = engine.run(df.copy())
+    return df, strategy, result, trades, engine.calculate_metrics(result, trades)
+
+
+@pytest.mark.parametrize('chunksize', [7, 20, 997, 100_000])
+def test_chunked_run_matches_in_memory_engine(in_memory, chunksize, tmp_path):
+    df, strategy, result, trades, expected = in_memory
+    equity_path = tmp_path / 'equity.csv'
+    metrics, chunk_trades = StreamingBacktest(BollingerBandsStrategy(), chunksize=chunksize).run(
+        df, equity_path=str(equity_path))
+    equity = pd.read_csv(equity_path, float_precision='round_trip')
+
+    # Signals may only differ where Percent_B is within rounding of a threshold
+    differs = equity['Signal'].to_numpy() != result['Signal'].to_numpy()
+    percent_b = result['Percent_B'].to_numpy()
+    near = np.minimum(np.abs(percent_b - strategy.oversold), np.abs(percent_b - strategy.overbought))
+    assert np.all(near[differs] < PERCENT_B_TOLERANCE)
+
+    if differs.any():
+        # A flipped signal changes the path; only the accounting must still hold
+        np.testing.assert_allclose(equity['Total'].to_numpy(dtype=float),
+                                   (equity['Cash'] + equity['Holdings']).to_numpy(dtype=float))
+        return
+
+    assert len(trades) > 0
+    assert_trades_match(trades, chunk_trades)
+    for col in ['Position', 'Cash', 'Holdings', 'Total']:
+        np.testing.assert_array_equal(equity[col].to_numpy(dtype=float),
+                                      result[col].to_numpy(dtype=float), err_msg=col)
+    for key, value in expected.items():
+        if key == 'Sharpe_Ratio':
+            assert metrics[key] == pytest.approx(value, rel=1e-12)
+        else:
+            assert metrics[key] == value, key
@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from strategy.streaming import StreamingBollingerBands
+
+
+def stream(closes, window=20, **kwargs):
+    bands = StreamingBollingerBands(window=window, **kwargs)
+    rows = [bands.update(close) for close in closes]
+    return pd.DataFrame(rows, columns=StreamingBollingerBands.columns)
+
+
+@pytest.mark.parametrize('name', ['random_walk', 'trending'])
+def test_long_stream_matches_exact_windows(name):
+    rng = np.random.default_rng(0)
+    if name == 'random_walk':
+        closes = 1000 + np.cumsum(rng.normal(0, 1, 200_000))
+    else:
+        closes = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, 200_000)))
+
+    out = stream(closes)
+    windows = sliding_window_view(closes, 20)
+    assert out.iloc[:19].isna().all().all()
+    np.testing.assert_allclose(out['SMA'].to_numpy()[19:], windows.mean(axis=-1), rtol=1e-9)
+    np.testing.assert_allclose(out['STD'].to_numpy()[19:], windows.std(axis=-1, ddof=1), rtol=1e-9)
+
+
+def test_stream_matches_pandas_to_its_rounding():
+    closes = 1000 + np.cumsum(np.random.default_rng(1).normal(0, 1, 200_000))
+    out = stream(closes)
+    rolling = pd.Series(closes).rolling(20)
+    # pandas' running sums drift on long series; the stream stays near exact windows
+    np.testing.assert_allclose(out['SMA'], rolling.mean(), rtol=1e-9)
+    np.testing.assert_allclose(out['STD'], rolling.std(), rtol=1e-6)
+
+
+def test_revise_equals_updating_with_the_final_tick():
+    closes = 100 + np.cumsum(np.random.default_rng(2).normal(0, 1, 100))
+    revised = StreamingBollingerBands(window=10)
+    for close in closes[:-1]:
+        revised.update(close)
+    revised.update(closes[-1] + 3.0)
+    last = revised.revise(closes[-1])
+
+    exact = stream(closes, window=10).iloc[-1]
+    for column in StreamingBollingerBands.columns:
+        assert last[column] == pytest.approx(exact[column], rel=1e-12)
+
+
+def test_constant_prices_give_zero_width_bands():
+    bands = StreamingBollingerBands(window=5)
+    last = bands.extend([50.0] * 10)
+    assert last['STD'] == 0.0
+    assert math.isnan(last['Percent_B'])
@@ -0,0 +1,34 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.backtest_engine import BacktestEngine
+from backtest.stress import StressTest, gbm_paths, next_bar_opens
+from strategy.bollinger import BollingerBandsStrategy
+
+
+def engine_metrics(strategy, opens, closes):
+    df = pd.DataFrame({'open': opens, 'close': closes},
+                      index=pd.date_range('2020-01-01', periods=len(closes), freq='D'))
+    engine = BacktestEngine(strategy)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result, trades = engine.run(df)
+        return engine.calculate_metrics(result, trades)
+
+
+def test_paths_match_engine():
+    strategy = BollingerBandsStrategy()
+    closes = gbm_paths(12, 800, start_price=500.0, volatility=0.015, rng=np.random.default_rng(9))
+    opens = next_bar_opens(closes)
+    metrics = StressTest(strategy, batch_size=5).run(closes, opens)
+    assert len(metrics) == 12
+
+    for path in range(closes.shape[1]):
+        expected = engine_metrics(strategy, opens[:, path], closes[:, path])
+        assert expected['Total_Trades'] > 0
+        row = metrics.loc[path]
+        for key in row.index:
+            assert row[key] == pytest.approx(expected[key], rel=1e-9, abs=1e-9), (path, key)
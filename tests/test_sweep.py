@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from backtest.backtest_engine import BacktestEngine
+from backtest.sweep import ParameterSweep
+from benchmarks.synthetic import generate_ohlcv
+from strategy.bollinger import BollingerBandsStrategy
+
+
+@pytest.fixture(scope='module')
+def df():
+    return generate_ohlcv(3000, seed=6, start_price=1500.0, volatility=0.01)
+
+
+def test_sweep_rows_match_engine(df):
+    grid = dict(windows=(10, 20), num_stds=(1.5, 2.0), oversolds=(0.1, 0.2), overboughts=(0.8, 0.9))
+    results = ParameterSweep(df).run(**grid, sort_by=None)
+    assert len(results) == 16
+
+    for row in results.to_dict('records'):
+        strategy = BollingerBandsStrategy(window=row['window'], num_std=row['num_std'],
+                                          oversold=row['oversold'], overbought=row['overbought'])
+        engine = BacktestEngine(strategy)
+        result, trades = engine.run(df.copy())
+        expected = engine.calculate_metrics(result, trades)
+        del expected['Initial_Capital']
+
+        assert expected['Total_Trades'] > 0
+        for key, value in expected.items():
+            assert row[key] == pytest.approx(value, rel=1e-12, nan_ok=True), key
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_ohlcv, title_case
+from strategy.bollinger import (backtest_strategy, calculate_performance_metrics,
+                                generate_ml_signals, optimize_thresholds)
+
+
+class StubModel:
+    """predict_proba straight from a fixed prob_up column"""
+
+    def __init__(self, prob_up):
+        self.prob_up = prob_up
+
+    def predict_proba(self, df, copy=True, compact=False):
+        return pd.DataFrame({
+            'prob_up': self.prob_up,
+            'prob_down': 1 - self.prob_up,
+            'predicted_direction': (self.prob_up > 0.5).astype(int)
+        }, index=df.index)
+
+
+@pytest.fixture(scope='module')
+def frame():
+    df = title_case(generate_ohlcv(1500, seed=8, volatility=0.01))
+    rng = np.random.default_rng(8)
+    prob_up = pd.Series(np.clip(0.5 + 0.08 * rng.standard_normal(len(df)), 0, 1), index=df.index)
+    prob_up.iloc[:20] = np.nan
+    # Bullish tail, so most pairs still hold a position on the last bar
+    prob_up.iloc[-40:] = 0.75
+    return df, prob_up
+
+
+def test_surface_matches_signals_backtest_and_metrics(frame):
+    df, prob_up = frame
+    pairs = [(0.5, 0.5), (0.55, 0.45), (0.6, 0.4), (0.7, 0.3), (0.52, 0.48)]
+    buys = sorted({b for b, _ in pairs})
+    sells = sorted({s for _, s in pairs})
+    surface = optimize_thresholds(df, buy_thresholds=buys, sell_thresholds=sells, prob_up=prob_up)
+    surface = surface.set_index(['buy_threshold', 'sell_threshold'])
+
+    forced_closes = 0
+    for buy_threshold, sell_threshold in pairs:
+        signals = generate_ml_signals(df, StubModel(prob_up), buy_threshold, sell_threshold)
+        result, trades_df, final_capital = backtest_strategy(signals)
+        expected = calculate_performance_metrics(result, trades_df, final_capital, 100000)
+
+        if signals['Signal'].iloc[-1] != 'SELL' and trades_df['Action'].iloc[-1] == 'SELL' \
+                and trades_df['Date'].iloc[-1] == df.index[-1]:
+            forced_closes += 1
+
+        row = surface.loc[(buy_threshold, sell_threshold)]
+        assert row['Number of Trades'] == expected['Number of Trades']
+        assert row['Final Capital'] == pytest.approx(final_capital, rel=1e-12)
+        for key, value in expected.items():
+            if key != 'Number of Trades':
+                assert round(row[key], 2) == value, key
+
+    assert forced_closes >= 3
@@ -0,0 +1,42 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_ohlcv, title_case
+from ml.tuning import TimeSeriesTuner, expanding_window_splits
+from ml_model import MLTradingModel
+from strategy.bollinger import calculate_bollinger_bands
+
+
+class RecordingTuner(TimeSeriesTuner):
+    def prepare_folds(self, X, y):
+        self.seen = (X, y)
+        return super().prepare_folds(X, y)
+
+
+def test_gap_must_cover_the_target_horizon():
+    with pytest.raises(ValueError):
+        TimeSeriesTuner(param_grid={'max_depth': [3]}, gap=3, forward_days=5)
+
+
+def test_splits_purge_gap_rows_before_each_test_fold():
+    for train_end, test_start, test_end in expanding_window_splits(600, n_splits=4, gap=7):
+        assert test_start - train_end == 7
+        assert test_end > test_start
+
+
+def test_unlabelled_tail_is_dropped_before_folds():
+    df = calculate_bollinger_bands(title_case(generate_ohlcv(500, volatility=0.01, freq='D')))
+    tuner = RecordingTuner(param_grid={'n_estimators': [10], 'max_depth': [3]}, n_splits=3,
+                           gap=10, forward_days=5, n_workers=1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        tuner.fit(df)
+
+    X, y = MLTradingModel().training_data(df, forward_days=5)
+    X_seen, y_seen = tuner.seen
+    assert len(X_seen) == len(X) - 5
+    np.testing.assert_array_equal(X_seen, X[:-5])
+
+    np.testing.assert_array_equal(y_seen, y[:-5])
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_ohlcv
+from ml.features import FeatureEngineer
+from ml.walk_forward import ParallelWalkForward, WalkForward
+
+
+@pytest.fixture(scope='module')
+def features():
+    df = generate_ohlcv(800, seed=0, volatility=0.01, freq='D')
+    df_features, feature_cols = FeatureEngineer().create_ml_features(df)
+    df_features = df_features[df_features['Target'].notna()]
+    return df_features[feature_cols].to_numpy(), df_features['Target'].to_numpy()
+
+
+def test_online_updates_track_the_per_bar_refit(features):
+    X, y = features
+    refit = WalkForward(min_train=20, retrain_every=1).run(X, y)
+    online = WalkForward(min_train=20, online=True).run(X, y)
+
+    # Skip the first bars, where both models have seen only a handful of rows
+    refit, online = refit[100:], online[100:]
+    assert np.mean(np.abs(online - refit)) < 0.05
+    assert online.std() <= 1.5 * refit.std()
+    assert np.mean((online > 0.5) == (refit > 0.5)) > 0.65
+
+
+@pytest.mark.parametrize('n_workers', [1, 2])
+@pytest.mark.parametrize('policy', [dict(retrain_every=25), dict(retrain_every=10, window=150)])
+def test_parallel_matches_serial(features, n_workers, policy):
+    X, y = features
+    serial = WalkForward(min_train=20, **policy).run(X, y)
+    parallel = ParallelWalkForward(n_workers=n_workers, min_train=20, **policy).run(X, y)
+    np.testing.assert_array_equal(parallel, serial)